@@ -0,0 +1,42 @@
+"""
+Compare the memory used by the block representations.
+
+Usage:
+    python -m benchmarks.bench_blocks_memory [blocks]
+"""
+
+from vpngate.util import building
+
+import sys
+import tracemalloc
+
+
+def measure(factory, count: int) -> int:
+    tracemalloc.start()
+    blocks = [factory(index=index,
+                      transactions=[],
+                      previous_hash='%064x' % index,
+                      timestamp=float(index),
+                      proof=index)
+              for index in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del blocks
+    return size
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5
+
+    print(f'blocks: {count:,}')
+    for name, factory in [('PoWBlock', building.PoWBlock),
+                          ('SlimPoWBlock', building.SlimPoWBlock),
+                          ('BlockColumns', building.BlockColumns())]:
+        size = measure(factory, count)
+        print(f'{name:>13}: {size / 2 ** 20:>8.2f} MiB'
+              f'  {size / count:>7.1f} bytes/block')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Compare the encode and hash throughput of the binary block layout against
+the legacy JSON representation.
+
+Usage:
+    python -m benchmarks.bench_encoding [blocks] [transactions]
+"""
+
+from vpngate.util import building
+
+import hashlib
+import sys
+import time
+
+
+def make_blocks(count: int, transactions: int) -> list:
+    return [building.PoWBlock(index=index,
+                              transactions=[dict(snd='a' * 44,
+                                                 dst='b' * 44,
+                                                 hsh='%064x' % tx)
+                                            for tx in range(transactions)],
+                              previous_hash='%064x' % index,
+                              timestamp=time.time(),
+                              proof=index)
+            for index in range(count)]
+
+
+def measure(encoder, blocks: list) -> tuple:
+    started = time.perf_counter()
+    for block in blocks:
+        encoder(block)
+    encoded = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for block in blocks:
+        hashlib.sha256(encoder(block)).hexdigest()
+    hashed = time.perf_counter() - started
+
+    return len(blocks) / encoded, len(blocks) / hashed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 4
+    transactions = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    blocks = make_blocks(count, transactions)
+
+    print(f'blocks: {count:,}  transactions/block: {transactions}')
+    for name, encoder in [('json', building.legacy_canonical_bytes),
+                          ('binary', building.to_bytes)]:
+        encode_rate, hash_rate = measure(encoder, blocks)
+        print(f'{name:>7}: encode {encode_rate:>10,.0f} blocks/s'
+              f'  hash {hash_rate:>10,.0f} blocks/s')
+
+
+if __name__ == '__main__':
+    main()
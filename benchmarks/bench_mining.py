@@ -0,0 +1,46 @@
+"""
+Report the proof of work search throughput against the number of workers.
+
+Usage:
+    python -m benchmarks.bench_mining [difficulty]
+"""
+
+from vpngate.util import mining
+
+import os
+import sys
+import time
+
+
+def run(difficulty: int, workers: int) -> float:
+    last_hash = 'a' * 64
+    hashes = 0
+    elapsed = 0.0
+
+    # mine a few consecutive proofs to smooth out lucky searches
+    for last_proof in range(3):
+        started = time.perf_counter()
+        if workers == 1:
+            proof = mining.search(difficulty, last_proof, last_hash)
+        else:
+            proof = mining.parallel_search(difficulty,
+                                           last_proof,
+                                           last_hash,
+                                           workers=workers)
+        elapsed += time.perf_counter() - started
+        hashes += proof + 1
+
+    return hashes / elapsed
+
+
+def main():
+    difficulty = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print(f'difficulty: {difficulty}')
+    for workers in range(1, (os.cpu_count() or 1) + 1):
+        rate = run(difficulty, workers)
+        print(f'workers: {workers:>2}  hashes/s: {rate:>12,.0f}')
+
+
+if __name__ == '__main__':
+    main()
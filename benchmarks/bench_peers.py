@@ -0,0 +1,65 @@
+"""
+Time dict and set operations over many peers, against peers which
+serialize their public key on every hash and comparison.
+
+Usage:
+    python -m benchmarks.bench_peers [peers]
+"""
+
+from vpngate.p2p import Peer
+
+from cryptography.hazmat.primitives import serialization
+import base64
+import sys
+import time
+
+
+class SerializingPeer(Peer):
+    """How peers were hashed and compared before caching the encodings."""
+
+    def __eq__(self, another_obj) -> bool:
+        if isinstance(another_obj, Peer):
+            return self.identifier == another_obj.identifier
+        return False
+
+    def __hash__(self) -> int:
+        raw = self.keys.pubkey.public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw)
+        return hash(raw)
+
+    @property
+    def identifier(self) -> str:
+        raw = self.keys.pubkey.public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw)
+        return base64.b64encode(raw).decode('utf-8')
+
+
+def run(peers: list) -> float:
+    started = time.perf_counter()
+
+    chains = {peer: [] for peer in peers}
+    children = set(peers)
+    for peer in peers:
+        assert peer in chains
+        assert peer in children
+        chains[peer].append(None)
+
+    return time.perf_counter() - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 5
+    peers = [Peer('http://127.0.0.1') for _ in range(count)]
+    serializing_peers = [SerializingPeer(peer.address, keys=peer.keys)
+                         for peer in peers]
+
+    print(f'peers: {count:,}')
+    for name, items in [('serializing', serializing_peers),
+                        ('cached', peers)]:
+        print(f'{name:>12}: {run(items):>8.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Compare the proof of work inner loop of is_valid_proof() against the
+midstate based ProofEngine.
+
+Usage:
+    python -m benchmarks.bench_proof_engine [proofs]
+"""
+
+from vpngate.util import mining
+
+import sys
+import time
+
+
+def naive_search(difficulty, last_proof, last_hash, stop):
+    for proof in range(stop):
+        mining.is_valid_proof(difficulty, proof, last_proof, last_hash)
+
+
+def engine_search(difficulty, last_proof, last_hash, stop):
+    # an impossible difficulty walks the whole range
+    mining.ProofEngine(difficulty, last_proof, last_hash).search(0, stop)
+
+
+def main():
+    proofs = int(sys.argv[1]) if len(sys.argv) > 1 else 10 ** 6
+    last_hash = 'a' * 64
+
+    results = {}
+    for name, fn in [('is_valid_proof', naive_search),
+                     ('ProofEngine', engine_search)]:
+        started = time.perf_counter()
+        fn(64, 100, last_hash, proofs)
+        elapsed = time.perf_counter() - started
+        results[name] = proofs / elapsed
+        print(f'{name:>15}: {results[name]:>12,.0f} hashes/s')
+
+    speedup = results['ProofEngine'] / results['is_valid_proof']
+    print(f'{"speedup":>15}: {speedup:>12.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Compare the save time, load time and file size of tree snapshots written
+with pickle and with the binary serializer.
+
+Usage:
+    python -m benchmarks.bench_serializers [blocks...]
+"""
+
+from vpngate import serializers
+from vpngate.chains import Tree
+from vpngate.p2p import Peer
+from vpngate.util import building, disk
+
+import os
+import sys
+import tempfile
+import time
+
+
+def make_tree(count: int, peers: int = 10) -> Tree:
+    tree = Tree()
+    owners = [Peer(address=f'http://10.0.0.{number}')
+              for number in range(peers)]
+    for index in range(count):
+        block = building.PoWBlock(index=index // peers + 1,
+                                  transactions=['user%d@mail.com' % index],
+                                  previous_hash='%064x' % index,
+                                  timestamp=time.time(),
+                                  proof=index)
+        tree.add(owners[index % peers], block)
+    return tree
+
+
+def measure(serializer, tree: Tree, path: str) -> tuple:
+    started = time.perf_counter()
+    disk.to_file(tree, path, serializer=serializer)
+    saved = time.perf_counter() - started
+
+    started = time.perf_counter()
+    disk.from_file(path, serializer=serializer)
+    loaded = time.perf_counter() - started
+
+    return saved, loaded, os.path.getsize(path)
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10 ** 4, 10 ** 5]
+
+    with tempfile.TemporaryDirectory() as directory:
+        for count in counts:
+            tree = make_tree(count)
+            print(f'blocks: {count:,}')
+
+            for name in ('pickle', 'binary'):
+                serializer = serializers.get_serializer(name)
+                path = os.path.join(directory, name)
+                saved, loaded, size = measure(serializer, tree, path)
+                print(f'{name:>7}: save {saved:>7.2f}s  load {loaded:>7.2f}s'
+                      f'  size {size / 2 ** 20:>8.2f}MiB')
+
+            # blocks are hashed when the next one is mined, so their bytes
+            # are usually known when saving
+            for _, chain in tree.items():
+                for block in chain:
+                    block.canonical
+            serializer = serializers.get_serializer('binary')
+            saved, _, _ = measure(serializer, tree, path)
+            print(f' hashed: save {saved:>7.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Report the throughput of verifying signatures one by one against the batch
+verification with threads and processes.
+
+Usage:
+    python -m benchmarks.bench_signatures [workers]
+"""
+
+from vpngate.util import crypto
+
+import sys
+import time
+
+
+def make_items(count: int, peers: int = 100) -> list:
+    pairs = [crypto.AsymmetricKeyPair() for _ in range(peers)]
+    raw_keys = [pair.public_to_bytes() for pair in pairs]
+
+    items = []
+    for index in range(count):
+        data = f'transaction {index}'.encode()
+        pair = pairs[index % peers]
+        items.append((raw_keys[index % peers], pair.sign(data), data))
+    return items
+
+
+def one_by_one(items: list, workers: int):
+    for raw_key, signature, data in items:
+        public_key = crypto.AsymmetricVerifier.b64_to_public_key(
+            crypto.base64.b64encode(raw_key))
+        crypto.AsymmetricVerifier.was_signed(public_key, signature, data)
+
+
+def threads(items: list, workers: int):
+    crypto.verify_batch(items, workers=workers)
+
+
+def processes(items: list, workers: int):
+    crypto.verify_batch(items, workers=workers, processes=True)
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    for count in [10 ** 3, 10 ** 4, 10 ** 5]:
+        items = make_items(count)
+        print(f'signatures: {count:,}')
+        for fn in [one_by_one, threads, processes]:
+            started = time.perf_counter()
+            fn(items, workers)
+            rate = count / (time.perf_counter() - started)
+            print(f'{fn.__name__:>12}: {rate:>10,.0f} signatures/s')
+
+
+if __name__ == '__main__':
+    main()
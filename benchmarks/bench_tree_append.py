@@ -0,0 +1,43 @@
+"""
+Time appending blocks to a chain, showing that the cost of each block does
+not depend on the chain length anymore.
+
+Usage:
+    python -m benchmarks.bench_tree_append
+"""
+
+from vpngate.blockchain import BlocksManager
+from vpngate.chains import Tree
+from vpngate.p2p import Peer
+
+import time
+
+
+def copying_last_block(manager: BlocksManager):
+    # how the last block was found before Tree.get returned a view
+    return list(manager.chain.get(manager.peer))[-1]
+
+
+def append(count: int, copy: bool) -> float:
+    manager = BlocksManager(name='bench', peer=Peer('http://127.0.0.1'))
+    tree: Tree = manager.chain
+
+    started = time.perf_counter()
+    for _ in range(count):
+        last_block = copying_last_block(manager) if copy else \
+            tree.last(manager.peer)
+        manager.new_block(timestamp=float(last_block.index))
+
+    return time.perf_counter() - started
+
+
+def main():
+    print(f'{"blocks":>8} {"view (us/block)":>16} {"copy (us/block)":>16}')
+    for count in [1000, 2000, 4000, 8000, 16000]:
+        view = append(count, copy=False) / count * 10 ** 6
+        copy = append(count, copy=True) / count * 10 ** 6
+        print(f'{count:>8} {view:>16.1f} {copy:>16.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Measure the memory and the false positive rate of the Bloom filter of
+chain keys against a set of the same keys.
+
+Usage:
+    python -m benchmarks.bench_bloom [keys]
+"""
+
+import sys
+import time
+
+from lib.bloom import BloomFilter
+
+
+def set_memory(keys):
+    return sys.getsizeof(keys) + sum(sys.getsizeof(key) for key in keys)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    emails = [f'user{index}@mail.com' for index in range(count)]
+    missing = [f'missing{index}@mail.com' for index in range(100_000)]
+
+    print(f'set of {count} keys: {set_memory(set(emails)) / 2 ** 20:.1f}MiB')
+
+    for error_rate in (0.1, 0.01, 0.001):
+        keys = BloomFilter(capacity=count, error_rate=error_rate)
+
+        started = time.perf_counter()
+        keys.update(emails)
+        elapsed = time.perf_counter() - started
+
+        false_positives = sum(email in keys for email in missing) / len(missing)
+        print(f'bloom {error_rate}: {keys.memory / 2 ** 20:.2f}MiB, '
+              f'{keys.hashes} hashes, built in {elapsed:.2f}s, '
+              f'measured error rate {false_positives:.4f}')
+
+
+if __name__ == '__main__':
+    main()
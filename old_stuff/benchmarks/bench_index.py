@@ -0,0 +1,63 @@
+"""
+Compare the lookup of registered emails scanning the whole chain against
+the maintained key index.
+
+Usage:
+    python -m benchmarks.bench_index [emails]
+"""
+
+import sys
+import time
+
+from lib.node import Node
+from lib.tokens import JWTRegistry
+from blueprints.blocks import MailBlockchain
+
+
+def scan(chain, email):
+    for block in chain:
+        if email in block['transactions']:
+            return True
+    return False
+
+
+def measure(fn, emails):
+    started = time.perf_counter()
+    for email in emails:
+        fn(email)
+    return (time.perf_counter() - started) / len(emails) * 1e6
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    blocks = MailBlockchain(node=Node('127.0.0.1:5000'),
+                            jwt=JWTRegistry(lambda: 'secret'))
+    blocks.chain.extend({
+        'index': index + 2,
+        'timestamp': index,
+        'transactions': [f'user{index}@mail.com'],
+        'proof': index,
+        'previous_hash': ''
+    } for index in range(count))
+
+    started = time.perf_counter()
+    blocks.email_exists('')
+    print(f'index built in {time.perf_counter() - started:.2f}s '
+          f'for {count} emails')
+
+    # the last registered emails, or missing ones, are the worst case
+    emails = [f'user{count - index - 1}@mail.com' for index in range(5)]
+    missing = [f'missing{index}@mail.com' for index in range(5)]
+
+    print(f'scan, registered: {measure(lambda e: scan(blocks.chain, e), emails):.1f}us')
+    print(f'scan, missing: {measure(lambda e: scan(blocks.chain, e), missing):.1f}us')
+
+    emails *= 20000
+    missing *= 20000
+    print(f'index, registered: {measure(blocks.email_exists, emails):.3f}us')
+    print(f'index, missing: {measure(blocks.email_exists, missing):.3f}us')
+
+
+if __name__ == '__main__':
+    main()
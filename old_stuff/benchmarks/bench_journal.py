@@ -0,0 +1,68 @@
+"""
+Compare saving a growing chain rewriting the whole file against the
+journaled storage.
+
+Usage:
+    python -m benchmarks.bench_journal [blocks]
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+from dataclasses import dataclass, field, asdict
+from typing import List
+
+from lib.journal import JournalStorage
+
+
+@dataclass
+class Chain:
+    chain: List = field(default_factory=list)
+    tokens: List = field(default_factory=list)
+
+
+def make_block(index):
+    return {
+        'index': index,
+        'timestamp': time.time(),
+        'transactions': [f'user{index}@mail.com'],
+        'proof': index,
+        'previous_hash': '0' * 64
+    }
+
+
+def rewrite(path, chain):
+    with open(path, 'w') as writer:
+        json.dump(asdict(chain), writer)
+        writer.flush()
+        os.fsync(writer.fileno())
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    chain = Chain([make_block(index) for index in range(count)])
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'rewrite.json')
+        started = time.perf_counter()
+        for index in range(20):
+            chain.chain.append(make_block(count + index))
+            rewrite(path, chain)
+        print(f'rewrite, {count} blocks: '
+              f'{(time.perf_counter() - started) / 20 * 1000:.2f}ms per save')
+
+        storage = JournalStorage(os.path.join(directory, 'journal.json'),
+                                 compact_every=1000)
+        storage.save(chain)
+        started = time.perf_counter()
+        for index in range(20):
+            chain.chain.append(make_block(count + 20 + index))
+            storage.save(chain)
+        print(f'journal, {count} blocks: '
+              f'{(time.perf_counter() - started) / 20 * 1000:.2f}ms per save')
+
+
+if __name__ == '__main__':
+    main()
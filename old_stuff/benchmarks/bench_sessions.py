@@ -0,0 +1,56 @@
+"""
+Compare the latency of requests to a local node using a new connection
+for each request against the pooled sessions.
+
+Usage:
+    python -m benchmarks.bench_sessions [requests]
+"""
+
+import sys
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import requests
+from lib.sessions import SessionRegistry
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+def measure(get, url, count):
+    started = time.perf_counter()
+    for _ in range(count):
+        get(url, timeout=10)
+    return (time.perf_counter() - started) / count * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/node'
+
+    registry = SessionRegistry()
+    print(f'requests: {count}')
+    print(f'  new connection: {measure(requests.get, url, count):.3f} ms/request')
+    print(f'  pooled session: {measure(registry.get, url, count):.3f} ms/request')
+
+    registry.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Measure looking up and expiring tokens with the token store against the
+lists of tokens formerly kept by the chains.
+
+Usage:
+    python -m benchmarks.bench_tokens [tokens]
+"""
+
+import sys
+import time
+
+from lib.auth import TokenStore
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    now = time.time() + 60
+    expirations = {f'token{index}': now + index for index in range(count)}
+    lookups = [f'token{index}' for index in range(0, count, count // 100)]
+
+    tokens = list(expirations)
+    started = time.perf_counter()
+    for token in lookups:
+        assert token in tokens
+    elapsed = (time.perf_counter() - started) / len(lookups)
+    print(f'list lookup: {elapsed * 1000:.3f}ms')
+
+    store = TokenStore(expirations)
+    started = time.perf_counter()
+    for token in lookups:
+        assert token in store
+    elapsed = (time.perf_counter() - started) / len(lookups)
+    print(f'store lookup: {elapsed * 1000:.5f}ms')
+
+    # a sweep with a tenth of the tokens expired, then with none
+    for expired in (count // 10, 0):
+        started = time.perf_counter()
+        removed = store.expire(now=now + expired - 0.5)
+        elapsed = time.perf_counter() - started
+        print(f'store expiring {len(removed)} of {count}: {elapsed * 1000:.3f}ms')
+
+    print(store.summary())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,17 @@
 import os
 import hashlib
+from time import time
 from dataclasses import dataclass
+from contextlib import contextmanager
 
-import requests
 import click
 from . import landing
 from lib.tokens import JWTRegistry
+from lib.sessions import registry
+from lib.cache import ChainCache, WriteBehind, DEFAULT_FLUSH_INTERVAL
+from lib.manifest import AssetManifest
+from lib.addresses import NodeAddresses
+from lib.maintenance import Maintenance
 from lib.node import Node, ClassStorage, simple_node_factory
 from lib.blockchain import (
     Blockchain,
@@ -21,18 +27,51 @@ def register_app(app):
     mail_storage, node_storage = create_storages(app)
     setattr(app, 'mail_storage', mail_storage)
     setattr(app, 'node_storage', node_storage)
+
+    # digests of the served files, compared by the validating nodes
+    manifest = create_manifest(app)
+    setattr(app, 'asset_manifest', manifest)
+    app.logger.info('asset manifest: %s', manifest.current()['digest'])
+
+    # chains are kept in memory, and written only when modified
+    flush_interval = get_flush_interval(app)
+    mail_cache = ChainCache(mail_storage, flush_interval)
+    node_cache = ChainCache(node_storage, flush_interval)
+    setattr(app, 'mail_cache', mail_cache)
+    setattr(app, 'node_cache', node_cache)
+
+    if flush_interval:
+        writer = WriteBehind([mail_cache, node_cache], flush_interval)
+        writer.start()
+        setattr(app, 'chain_writer', writer)
+
+    # addresses of the neighbor nodes, resolved at background
+    addresses = NodeAddresses(lambda: node_cache.get().neighbor_hosts(),
+                              allowed=[landing.LOCAL_NETWORK])
+    setattr(app, 'node_addresses', addresses)
+    if app.config['TESTING']:
+        addresses.refresh()
+    else:
+        addresses.start()
+
+    # spreading, validation and chain exchanges never run at requests
+    maintenance = create_maintenance(app, mail_cache, node_cache)
+    setattr(app, 'maintenance', maintenance)
+    if not app.config['TESTING']:
+        maintenance.start()
     
     @app.teardown_appcontext
     def save_storage(exception):
-        mail_storage.save(mail_storage.current)
-        node_storage.save(node_storage.current)
+        mail_cache.flush()
+        node_cache.flush()
 
     @app.cli.command('gen:bootstrap')
     @click.argument('proof')
     @click.argument('address')
     @click.option('--dest-file', default='myboot.json')
     def generate_boot(proof, address, dest_file):
-        boot = node_storage.current.append_node(proof, address)
+        with node_cache.transaction() as node_chain:
+            boot = node_chain.append_node(proof, address)
         BootstrapStorage(dest_file).save(boot)
         click.echo(f'Bootstrap file saved at: {dest_file}')
 
@@ -50,6 +89,47 @@ def register_app(app):
     app.logger.info('running on: %s', node_storage.current.node.host)
 
 
+def create_maintenance(app, mail_cache, node_cache):
+    """
+    Create the periodic jobs of the chains. Chains build their urls with
+    url_for(), so jobs run within a request context for the node host.
+    Jobs read and change their chain within transactions of its cache,
+    like the requests changing the chains, see
+    landing.with_chains_locked(), but reach the network outside them, so
+    requests never wait for the neighbors.
+
+    :return: <Maintenance>
+    """
+
+    def context():
+        return app.test_request_context(base_url=node_cache.get().node.host)
+
+    def chain_job(cache, get_chain, method):
+        @contextmanager
+        def transaction():
+            with cache.transaction():
+                yield get_chain()
+
+        def job():
+            with transaction() as blockchain:
+                run = getattr(blockchain, method)
+            run(transaction=transaction)
+        return job
+
+    config = node_cache.get().config
+    maintenance = Maintenance(context=context)
+    # only the node chain validates and revokes its neighbors
+    maintenance.add('node:validation', config['validation_time'],
+                    chain_job(node_cache, landing.get_node_chain, '_do_validation'))
+    maintenance.add('node:spread', config['spreading_time'],
+                    chain_job(node_cache, landing.get_node_chain, '_do_spread'))
+    maintenance.add('mail:exchange', config['exchange_time'],
+                    chain_job(mail_cache, landing.get_mail_chain, 'exchange_chains'))
+    maintenance.add('node:exchange', config['exchange_time'],
+                    chain_job(node_cache, landing.get_node_chain, 'exchange_chains'))
+    return maintenance
+
+
 def create_storages(app):
     mail_storage_path = get_config_or_environ(app, 'MAIL_CHAIN_STORAGE_PATH')
     assert mail_storage_path, 'Missing mail storage path configuration.'
@@ -61,11 +141,12 @@ def create_storages(app):
     
     if app.config['TESTING']:
         app.logger.debug('remove storage files when testing')
-        try:
-            os.unlink(mail_storage_path)
-            os.unlink(node_storage_path)
-        except FileNotFoundError as exc:
-            app.logger.error(str(exc))
+        for path in (mail_storage_path, node_storage_path):
+            for storage_file in (path, f'{path}.journal', f'{path}.lock'):
+                try:
+                    os.unlink(storage_file)
+                except FileNotFoundError as exc:
+                    app.logger.error(str(exc))
 
     algo = app.config.get('JWT_ALGO') or None
     jwt = JWTRegistry(lambda: app.config['SECRET_KEY'], algo=algo)
@@ -146,10 +227,28 @@ def parse_blockchain_config(app):
     return config
 
 
+def create_manifest(app):
+    directories = {
+        'static': app.static_folder,
+        'templates': os.path.join(os.path.dirname(__file__), 'templates')
+    }
+    return AssetManifest(directories)
+
+
+def get_flush_interval(app):
+    # written at the end of every request when testing
+    default = 0 if app.config['TESTING'] else DEFAULT_FLUSH_INTERVAL
+    return float(get_config_or_environ(app, 'CHAIN_FLUSH_INTERVAL', default=default))
+
+
 def get_config_or_environ(app, key, default=None):
     return (app.config.get(key) or os.getenv(key)) or default
 
 
+def hash_host(host):
+    return hashlib.sha256(host.encode()).hexdigest()
+
+
 def simple_bootstrap_factory(data: dict):
     return ChainBootstrap(**data)
 
@@ -180,10 +279,10 @@ class MailBlockchain(Blockchain):
         :return: <bool>
         """
 
-        for block in self.chain:
-            if email in block['transactions']:
-                return True
-        return False
+        return self.has_key(email)
+
+    def block_keys(self, block):
+        return block['transactions']
 
 
 @dataclass
@@ -223,7 +322,7 @@ class NodeBlockchain(Blockchain):
                         proof=self.proof_of_work())
 
             url = f'{bootstraper.issuer_host}/bootstrap'
-            res = requests.post(url, data=payload)
+            res = registry.post(url, data=payload)
             assert res.status_code == 201, 'Failed to bootstrap.'
             data = res.json()
             assert data and 'access_token' in data and 'self' in data, \
@@ -231,6 +330,7 @@ class NodeBlockchain(Blockchain):
 
             self.access_token = data['access_token']
             self.bootstraped = True
+            self.modified()
 
             self.node.parent = simple_node_factory(data['self'])
 
@@ -241,26 +341,31 @@ class NodeBlockchain(Blockchain):
         if self.boot_storage:
             self.boot_storage.block_storage = None
 
-    def revoke_node(self, node, clear=True):
+    def revoke_node(self, node, is_valid=None):
         """
         Remove a node from neighborhood and return wheter was revoked.
 
         :param node: <str> Address of node
-        :param clear: <bool> Indicates wheter to clear predicate cache
+        :param is_valid: <bool> Result of a validation already made, when 
+                                None the predicate is asked
         :return: <bool> 
         """
 
         status = False
         if (node in self.node.children or node in self.revokeds) and \
-                        not self.predicate.is_valid(node):
+                        not self._is_valid_node(node, is_valid):
             print(f'node revoked: {node}')
             self.node.remove_child(node)
             self.revokeds.append(node)
+            self.modified()
             status = True
-        if clear:
-            self.predicate.clear_cache()
         return status
 
+    def _is_valid_node(self, node, is_valid=None):
+        if is_valid is None:
+            return self.predicate.is_valid(node)
+        return is_valid
+
     def register_child(self, proof, token, identifier):
         """
         Add a new child of current node from registered 
@@ -271,12 +376,12 @@ class NodeBlockchain(Blockchain):
         """
 
         self.check_proof_or_fail(proof)
-        self.jwt.audience = identifier
-        data = self.jwt.decode(token)
+        data = self.decode_token(token, identifier)
 
         if token in self.pending_tokens:
             assert 'hst' in data, 'Invalid token.'
-            self.pending_tokens.remove(token)
+            self.pending_tokens.discard(token)
+            self.modified()
 
             new_node = Node(data['hst'], identifier=identifier)            
 
@@ -286,48 +391,41 @@ class NodeBlockchain(Blockchain):
             self.node.add_child(new_node)
             self.logger.debug('new node config: %s', self.node)
 
-            self.jwt.audience = None
-            new_token = self.jwt.encode(self.config['token_renew_time'])
-            self.tokens.append(new_token)
+            renew_time = self.config['token_renew_time']
+            new_token = self.encode_token(renew_time)
+            self.tokens.add(new_token, time() + renew_time)
+            self.modified()
 
             self.new_transaction(new_node)
             self.new_block(proof, self.get_last_info()[1])
             return new_token
 
-    def is_valid_token(self, token, identifier):
-        try:
-            self.jwt.audience = identifier
-            self.jwt.decode(token)
-            return token in self.tokens
-        except Exception:
-            return False
-
     def append_node(self, proof, address):
         self.check_proof_or_fail(proof)
         new_node = Node(address)
-        self.jwt.audience = new_node.identifier
 
-        token = self.jwt.encode(self.config['token_pending_time'],
-                                hst=new_node.host)
+        pending_time = self.config['token_pending_time']
+        token = self.encode_token(pending_time,
+                                  audience=new_node.identifier,
+                                  hst=new_node.host)
         
-        self.pending_tokens.append(token)
+        self.pending_tokens.add(token, time() + pending_time)
+        self.sweep_tokens()
+        self.modified()
         return ChainBootstrap(host=new_node.host,
                             issuer_host=self.node.host,
                             identifier=new_node.identifier,
                             token=token)
 
     def node_exists(self, node):
-        hash_host = hashlib.sha256(node.host.encode()).hexdigest()        
-        for block in self.chain:
-            for transaction in block['transactions']:
-                if hash_host == transaction['hsh']:
-                    return True
-        return False
+        return self.has_key(hash_host(node.host))
 
+    def block_keys(self, block):
+        return [transaction['hsh'] for transaction in block['transactions']]
 
     def new_transaction(self, dest_node):
         return super().new_transaction({
             'snd': self.node.identifier,
             'dst': dest_node.identifier,
-            'hsh': hashlib.sha256(dest_node.host.encode()).hexdigest()
+            'hsh': hash_host(dest_node.host)
         })
\ No newline at end of file
@@ -1,12 +1,12 @@
 import sqlite3
-import socket
 import ipaddress
 from urllib.parse import urlparse
 from functools import wraps
 from dataclasses import asdict
 
 from lib.node import filter_node_payload
-from flask import Blueprint, render_template, current_app, request
+from lib.sync import summarize, locate, page, iter_json_chain, iter_ndjson, DEFAULT_PAGE_SIZE
+from flask import Blueprint, Response, render_template, current_app, request
 from flask_wtf import FlaskForm
 from wtforms.validators import DataRequired, Email
 from wtforms.fields import StringField, SubmitField, TextAreaField
@@ -31,39 +31,36 @@ class RequestForm(FlaskForm):
 
 class NodeContext:
     def __init__(self):
-        self.storage = current_app.node_storage
+        self.cache = current_app.node_cache
 
     @property
     def chain(self): 
-        return self.storage.current
+        return self.cache.storage.current
 
     def __enter__(self):
-        self.storage.load()
-        return self.chain
+        return self.cache.get()
 
     def __exit__(self, *args):
-        self.storage.save(self.chain)
+        self.cache.flush()
 
 
 def get_mail_chain():
-    node_chain = get_node_chain()
-    storage = current_app.mail_storage
-    storage.load()
-    if node_chain.access_token:
-        storage.current.access_token = node_chain.access_token
-        storage.save(storage.current)
-    return storage.current
+    with current_app.mail_cache.lock:
+        node_chain = get_node_chain()
+        mail_chain = current_app.mail_cache.get()
+        if node_chain.access_token and mail_chain.access_token != node_chain.access_token:
+            with current_app.mail_cache.transaction() as mail_chain:
+                mail_chain.access_token = node_chain.access_token
+                mail_chain.modified()
+        return mail_chain
 
 
 def get_node_chain():
-    storage = current_app.node_storage
-    storage.load()
-    return storage.current
+    return current_app.node_cache.get()
 
 
 def save_node_chain():
-    storage = current_app.node_storage
-    storage.save(storage.current)
+    current_app.node_cache.flush(force=True)
 
 
 def get_remote_addr():
@@ -82,24 +79,11 @@ def has_node_address():
     address = urlparse(remote_addr).path
     current_app.logger.debug('incoming address: %s', address)
 
-    # allow localhost
-    if address in DEFAULT_ALLOWEDS:
+    # localhost is indexed too, see register_app()
+    node = current_app.node_addresses.find(address)
+    if node is not None:
+        current_app.logger.debug('node address found: %s', node)
         return True
-
-    for node in list(current_app.blocks.nodes):
-        node_address = urlparse(node).netloc.split(':', 1)[0] 
-        try:
-            ipaddress.IPv4Address(node_address)
-            # is an ip address, direct checking
-            if node_address == address:
-                current_app.logger.debug('node address found: %s', address)
-                return True
-        except ipaddress.AddressValueError:
-            # it's a hostname, resolve to IP and check 
-            node_addr_resolution = socket.gethostbyname_ex(node_address)[2]
-            if address in node_addr_resolution:
-                current_app.logger.debug('node address found: %s', address)
-                return True
     return False
 
 
@@ -127,18 +111,29 @@ def only_node_personal(fn):
     return barrier
 
 
+def with_chains_locked(fn):
+    """
+    Decorator running the function within a transaction of each chain
+    cache, so the background jobs, the writes and the other processes
+    never see the chains half changed, and the changes are written when
+    it returns. Every request changing a chain is decorated.
+
+    :param fn: <function> Function to decorate
+    """
+
+    @wraps(fn)
+    def locked(*args, **kwargs):
+        # mail before node, as the mail chain jobs read the node chain
+        with current_app.mail_cache.transaction(), current_app.node_cache.transaction():
+            return fn(*args, **kwargs)
+    return locked
+
+
 @web.route('/')
 def index(form=None):
     with_token = request.args.get('no_token', '').lower() != 'true'
     
     current_app.logger.debug('token: %s', with_token)
-    if with_token:
-        get_mail_chain().resolve_conflicts()
-    else:
-        with NodeContext() as chain:
-            chain.exchange_chains()
-        
-        get_mail_chain().exchange_chains()
 
     if form is None:
         form = RequestForm()
@@ -158,26 +153,23 @@ def mirrors():
 
 
 @web.route('/register', methods=['post'])
+@with_chains_locked
 def register():
     logger = current_app.logger
     form = RequestForm()
     
     if form.validate():
         blocks = get_mail_chain()
-        blocks.spread_neighbors()
-        blocks.exchange_chains()
-        blocks.validate_neighbors()
-
         last_proof, last_hash = blocks.get_last_info()
         email = form.data['email']
         proof = form.data['proof']
 
         if blocks.valid_proof(proof, last_proof, last_hash):
-            if blocks.is_valid(email):
+            if not blocks.email_exists(email):
                 blocks.new_transaction(email)
                 blocks.new_block(proof, last_hash)
-                replaced = blocks.exchange_chains()
-                logger.debug('chain was replaced: %s', replaced)
+                # shared with the parent at background
+                current_app.maintenance.wake('mail:exchange')
                 return render_template('success.html.j2')
             form.email.errors.append(f"This email {email} was already been registered.")
         else:
@@ -187,23 +179,55 @@ def register():
     return index(form=form)
 
 
-@web.route('/<name>/chain', methods=['get', 'put'])
+def get_chain_by_name(name):
+    if name == 'mail':
+        return get_mail_chain()
+    if name == 'node':
+        return get_node_chain()
+    return None
+
+
+def get_cache_by_name(name):
+    if name == 'mail':
+        return current_app.mail_cache
+    if name == 'node':
+        return current_app.node_cache
+    return None
+
+
+@web.route('/<name>/chain')
 @only_node_personal
 def chain(name):
-    if name == 'mail':
-        blockchain = get_mail_chain()
-    elif name == 'node':
-        blockchain = get_node_chain()
-    else:
+    cache = get_cache_by_name(name)
+    if cache is None:
         return 'Not found', 404
 
-    if request.method == 'GET':
-        response = {
-            'chain': blockchain.chain
-        }
+    from_index = request.args.get('from_index', 0, type=int)
+    limit = request.args.get('limit', None, type=int)
+    if from_index < 0 or (limit is not None and limit < 0):
+        return {'errors': 'Invalid arguments.'}, 400
+
+    # the blocks are taken while holding the chain, and sent without
+    # holding it, as the response is sent after returning
+    with cache.lock:
+        chain = get_chain_by_name(name).chain
+        end = len(chain) if limit is None else from_index + limit
+        blocks = chain[from_index:end]
+
+    # blocks are serialized while sent, never the whole chain at once
+    if request.args.get('format') == 'ndjson':
+        return Response(iter_ndjson(blocks), mimetype='application/x-ndjson')
+    return Response(iter_json_chain(blocks), mimetype='application/json')
+
+
+@web.route('/<name>/chain', methods=['put'])
+@only_node_personal
+@with_chains_locked
+def replace_chain(name):
+    blockchain = get_chain_by_name(name)
+    if blockchain is None:
+        return 'Not found', 404
 
-        return response, 200
-    
     if 'chain' in request.form:
         remote_chain = request.form.getlist('chain')
         if remote_chain:
@@ -218,8 +242,70 @@ def chain(name):
     return response, 400
 
 
+@web.route('/<name>/chain/summary')
+@only_node_personal
+def chain_summary(name):
+    blockchain = get_chain_by_name(name)
+    if blockchain is None:
+        return 'Not found', 404
+
+    return summarize(blockchain.chain, blockchain.hash), 200
+
+
+@web.route('/<name>/chain/filter')
+@only_node_personal
+def chain_filter(name):
+    blockchain = get_chain_by_name(name)
+    if blockchain is None:
+        return 'Not found', 404
+
+    response = summarize(blockchain.chain, blockchain.hash)
+    response['filter'] = blockchain.key_filter().to_dict()
+    return response, 200
+
+
+@web.route('/<name>/chain/locate', methods=['post'])
+@only_node_personal
+def chain_locate(name):
+    blockchain = get_chain_by_name(name)
+    if blockchain is None:
+        return 'Not found', 404
+
+    locator = request.form.getlist('locator')
+    if not locator:
+        return {'errors': 'Invalid arguments.'}, 400
+
+    response = {
+        'position': locate(blockchain.chain, locator, blockchain.hash)
+    }
+
+    return response, 200
+
+
+@web.route('/<name>/chain/blocks')
+@only_node_personal
+def chain_blocks(name):
+    blockchain = get_chain_by_name(name)
+    if blockchain is None:
+        return 'Not found', 404
+
+    from_index = request.args.get('from_index', 0, type=int)
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    if from_index < 0 or limit <= 0:
+        return {'errors': 'Invalid arguments.'}, 400
+
+    limit = min(limit, DEFAULT_PAGE_SIZE)
+    return page(blockchain.chain, from_index, limit), 200
+
+
+@web.route('/manifest')
+def manifest():
+    return current_app.asset_manifest.current(), 200
+
+
 @web.route('/node', methods=['get', 'delete'])
 @only_node_personal
+@with_chains_locked
 def node_action():
     logger = current_app.logger
     blockchain = get_node_chain()
@@ -248,6 +334,7 @@ def node_action():
 
 
 @web.route('/bootstrap', methods=['post'])
+@with_chains_locked
 def bootstrap_child():
     keys = list(request.form)
     if 'token' in keys and 'id' in keys and 'proof' in keys:
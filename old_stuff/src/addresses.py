@@ -0,0 +1,248 @@
+import time
+import socket
+import bisect
+import logging
+import ipaddress
+import threading
+from urllib.parse import urlparse
+
+
+# Seconds a resolved hostname is kept
+DEFAULT_TTL = 300
+
+# Seconds a hostname failing to resolve is not tried again
+DEFAULT_NEGATIVE_TTL = 60
+
+# Seconds between two rebuilds of the node addresses index
+DEFAULT_REFRESH_INTERVAL = 30
+
+
+def resolve_hostname(hostname):
+    return tuple(socket.gethostbyname_ex(hostname)[2])
+
+
+class Resolver:
+    """
+    Resolves hostnames to their IP addresses, keeping the result for a
+    time. Failed resolutions are kept too, for a shorter time, so an
+    unknown hostname is not resolved again on every call.
+
+    Usage:
+        >>> resolver = Resolver(ttl=300, negative_ttl=60)
+        >>> resolver.resolve('localhost')
+        ('127.0.0.1',)
+    """
+
+    def __init__(self,
+                ttl=DEFAULT_TTL,
+                negative_ttl=DEFAULT_NEGATIVE_TTL,
+                resolve=resolve_hostname,
+                clock=time.monotonic):
+        """
+        :param ttl: <int> Seconds a resolved hostname is kept
+        :param negative_ttl: <int> Seconds a failed resolution is kept
+        :param resolve: <callable> Get the addresses of a hostname
+        :param clock: <callable> Current time in seconds
+        """
+
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._resolve = resolve
+        self.clock = clock
+        self.logger = logging.getLogger('addresses')
+        self._entries = dict()
+        self._lock = threading.Lock()
+
+    def resolve(self, hostname):
+        """
+        Get the IP addresses of the hostname.
+
+        :param hostname: <str>
+        :return: <tuple> The addresses, empty when it can not be resolved
+        """
+
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(hostname)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        try:
+            addresses = self._resolve(hostname)
+            entry = (now + self.ttl, addresses)
+        except OSError as exc:
+            self.logger.warning('failed resolving %s: %s', hostname, exc)
+            entry = (now + self.negative_ttl, ())
+
+        with self._lock:
+            self._entries[hostname] = entry
+        return entry[1]
+
+    def forget_expired(self):
+        now = self.clock()
+        with self._lock:
+            for hostname in [hostname
+                             for hostname, entry in self._entries.items()
+                             if entry[0] <= now]:
+                del self._entries[hostname]
+
+
+class AddressIndex:
+    """
+    Finds the node owning an IP address among single addresses and CIDR
+    networks. Networks are flattened into disjoint ranges sorted by their
+    first address, so a lookup is a binary search. Nested networks are
+    looked up by the most specific one.
+
+    Usage:
+        >>> index = AddressIndex([('10.0.0.0/8', 'a'), ('10.1.2.3', 'b')])
+        >>> index.find('10.1.2.3')
+        'b'
+        >>> index.find('10.9.9.9')
+        'a'
+    """
+
+    def __init__(self, entries=()):
+        """
+        :param entries: <iterable> Pairs of an address or network and its
+                        value
+        """
+
+        ranges = {4: [], 6: []}
+        for network, value in entries:
+            network = ipaddress.ip_network(network, strict=False)
+            ranges[network.version].append((int(network.network_address),
+                                            int(network.broadcast_address),
+                                            value))
+
+        self._ranges = {version: self._flatten(items)
+                        for version, items in ranges.items()}
+
+    def __len__(self):
+        return sum(len(starts) for starts, _, _ in self._ranges.values())
+
+    def __contains__(self, address):
+        return self.find(address) is not None
+
+    def find(self, address):
+        """
+        Get the value of the most specific network with the address.
+
+        :param address: <str> IPv4 or IPv6 address
+        :return: The value, None when not found or not an address
+        """
+
+        try:
+            address = ipaddress.ip_address(address)
+        except ValueError:
+            return None
+
+        starts, ends, values = self._ranges[address.version]
+        number = int(address)
+        position = bisect.bisect_right(starts, number) - 1
+        if position >= 0 and number <= ends[position]:
+            return values[position]
+        return None
+
+    @staticmethod
+    def _flatten(ranges):
+        # networks are either nested or disjoint, so the open ones are
+        # kept at a stack and the innermost one owns the addresses
+        segments = []
+        stack = []
+        cursor = 0
+
+        def close(limit):
+            nonlocal cursor
+            while stack and stack[-1][0] < limit:
+                end, value = stack.pop()
+                if cursor <= end:
+                    segments.append((cursor, end, value))
+                    cursor = end + 1
+
+        for start, end, value in sorted(ranges, key=lambda item: (item[0], -item[1])):
+            close(start)
+            if stack and cursor < start:
+                segments.append((cursor, start - 1, stack[-1][1]))
+            stack.append((end, value))
+            cursor = start
+        close(float('inf'))
+
+        return ([start for start, _, _ in segments],
+                [end for _, end, _ in segments],
+                [value for _, _, value in segments])
+
+
+class NodeAddresses:
+    """
+    Index of the IP addresses of the nodes, rebuilt at a background
+    thread, so looking up the node of a request never waits for DNS.
+
+    Usage:
+        >>> addresses = NodeAddresses(lambda: ['http://node.com:5000'])
+        >>> addresses.refresh()
+        >>> addresses.find('93.184.216.34')
+        'http://node.com:5000'
+    """
+
+    def __init__(self,
+                hosts,
+                resolver=None,
+                interval=DEFAULT_REFRESH_INTERVAL,
+                allowed=()):
+        """
+        :param hosts: <callable> Get the hosts of the nodes
+        :param resolver: <Resolver> Resolves the hostnames of the nodes
+        :param interval: <int> Seconds between two rebuilds of the index
+        :param allowed: <iterable> Networks always found, like localhost
+        """
+
+        self.hosts = hosts
+        self.resolver = resolver or Resolver()
+        self.interval = interval
+        self.allowed = list(allowed)
+        self.index = AddressIndex((network, network) for network in self.allowed)
+        self.logger = logging.getLogger('addresses')
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def find(self, address):
+        """
+        Get the host of the node with the address.
+
+        :param address: <str> IP address
+        :return: <str> The host, None when not found
+        """
+
+        return self.index.find(address)
+
+    def refresh(self):
+        """Resolve the hosts of the nodes and rebuild the index."""
+
+        entries = [(network, network) for network in self.allowed]
+        for host in self.hosts():
+            hostname = urlparse(host).hostname or host
+            try:
+                entries.append((ipaddress.ip_network(hostname, strict=False), host))
+            except ValueError:
+                entries.extend((address, host)
+                               for address in self.resolver.resolve(hostname))
+
+        self.resolver.forget_expired()
+        # replaced at once, readers see either index
+        self.index = AddressIndex(entries)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.refresh()
+            except Exception:
+                # try again at the next interval
+                self.logger.exception('failed refreshing the node addresses')
+            self._stopped.wait(self.interval)
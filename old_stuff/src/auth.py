@@ -0,0 +1,235 @@
+import time
+import heapq
+import threading
+
+
+# Maximum tokens remembered as verified
+DEFAULT_MAX_SIZE = 10000
+
+
+class VerifiedTokens:
+    """
+    Remembers the tokens already verified for a node until they expire,
+    so a token is decoded and its signature checked once, and every other
+    request only costs a dictionary lookup.
+
+    Usage:
+        >>> verified = VerifiedTokens()
+        >>> verified.add(token, node_id, expires_at=claims['exp'])
+        >>> verified.get(token, node_id)
+        True
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, clock=time.time):
+        """
+        :param max_size: <int> Maximum tokens remembered
+        :param clock: <callable> Current time in seconds since the epoch
+        """
+
+        self.max_size = max_size
+        self.clock = clock
+        self._entries = dict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, token, node_id):
+        """
+        Check the token was verified for the node and did not expire.
+
+        :param token: <str> JWT token
+        :param node_id: <str> Identifier of the node sending the token
+        :return: <bool>
+        """
+
+        key = (token, node_id)
+        expires_at = self._entries.get(key)
+        if expires_at is None:
+            return False
+
+        if expires_at <= self.clock():
+            with self._lock:
+                self._entries.pop(key, None)
+            return False
+        return True
+
+    def add(self, token, node_id, expires_at):
+        """
+        Remember the token as verified for the node.
+
+        :param token: <str> JWT token
+        :param node_id: <str> Identifier of the node sending the token
+        :param expires_at: <float> Expiration of the token, seconds
+                           since the epoch
+        """
+
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._evict()
+            self._entries[(token, node_id)] = expires_at
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _evict(self):
+        now = self.clock()
+        expired = [key for key, expires_at in self._entries.items()
+                   if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+
+        if len(self._entries) >= self.max_size:
+            # still full, forget the oldest one
+            del self._entries[next(iter(self._entries))]
+
+
+class TokenStore:
+    """
+    Tokens by their expiration. Tokens are indexed at a heap ordered by
+    expiration, so removing the expired ones costs O(log n) per expired
+    token and never scans the live ones. Expired tokens are never found,
+    even before being removed, and only live tokens are stored, see
+    to_dict().
+
+    Usage:
+        >>> tokens = TokenStore()
+        >>> tokens.add(token, expires_at=time.time() + 120)
+        >>> token in tokens
+        True
+        >>> tokens.expire()
+        []
+    """
+
+    def __init__(self, tokens=None, clock=time.time):
+        """
+        :param tokens: <dict> Expiration of the tokens by token, or a
+                       <list> of tokens never expiring
+        :param clock: <callable> Current time in seconds since the epoch
+        """
+
+        self.clock = clock
+        self.added = 0
+        self.evicted = 0
+        self._expirations = dict()
+        self._heap = []
+        self._lock = threading.RLock()
+
+        if isinstance(tokens, dict):
+            for token, expires_at in tokens.items():
+                self.add(token, expires_at)
+        elif tokens:
+            for token in tokens:
+                self.add(token)
+
+    def __contains__(self, token):
+        if token not in self._expirations:
+            return False
+        expires_at = self._expirations[token]
+        return expires_at is None or expires_at > self.clock()
+
+    def __len__(self):
+        return len(self._expirations)
+
+    def __iter__(self):
+        return iter(list(self._expirations))
+
+    def __deepcopy__(self, memo):
+        return TokenStore(self.to_dict(), clock=self.clock)
+
+    def add(self, token, expires_at=None):
+        """
+        Add a token.
+
+        :param token: <str> JWT token
+        :param expires_at: <float> Expiration of the token, seconds since
+                           the epoch, or None when it never expires
+        """
+
+        with self._lock:
+            self._expirations[token] = expires_at
+            if expires_at is not None:
+                heapq.heappush(self._heap, (expires_at, token))
+            self.added += 1
+
+    def discard(self, token):
+        """
+        Remove a token.
+
+        :param token: <str> JWT token
+        :return: <bool> Wheter the token was found
+        """
+
+        with self._lock:
+            if token not in self._expirations:
+                return False
+            del self._expirations[token]
+
+            # left at the heap until expired, unless too many are left
+            if len(self._heap) > 2 * len(self._expirations) + 16:
+                self._rebuild()
+            return True
+
+    def expiration(self, token):
+        """
+        :param token: <str> JWT token
+        :return: <float> Expiration of the token, None when it never expires
+        """
+
+        return self._expirations.get(token)
+
+    def expire(self, now=None):
+        """
+        Remove the expired tokens.
+
+        :param now: <float> Current time, seconds since the epoch
+        :return: <list> The removed tokens
+        """
+
+        now = self.clock() if now is None else now
+        expired = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                expires_at, token = heapq.heappop(self._heap)
+                # skip entries of tokens removed or added again
+                if token in self._expirations and \
+                        self._expirations[token] == expires_at:
+                    del self._expirations[token]
+                    expired.append(token)
+            self.evicted += len(expired)
+        return expired
+
+    def to_dict(self):
+        """
+        Get the live tokens and their expiration.
+
+        :return: <dict>
+        """
+
+        now = self.clock()
+        with self._lock:
+            return {token: expires_at
+                    for token, expires_at in self._expirations.items()
+                    if expires_at is None or expires_at > now}
+
+    def summary(self):
+        """
+        Get the count of stored tokens, and of the tokens added and
+        evicted since created.
+
+        :return: <dict>
+        """
+
+        with self._lock:
+            return {
+                'count': len(self._expirations),
+                'added': self.added,
+                'evicted': self.evicted
+            }
+
+    def _rebuild(self):
+        self._heap = [(expires_at, token)
+                      for token, expires_at in self._expirations.items()
+                      if expires_at is not None]
+        heapq.heapify(self._heap)
@@ -1,46 +1,42 @@
 import hashlib
 import json
+import random
 import logging
-from time import time
+import threading
+from time import time, monotonic
 from traceback import print_tb
+from contextlib import nullcontext
 from dataclasses import dataclass, field
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Set
 
-import requests
 import blueprints
-from .node import Node, ClassStorage, simple_node_factory, filter_node_payload
+from .node import Node, simple_node_factory, filter_node_payload
 from .tokens import JWTRegistry
 from .timers import Scheduler
-from flask import url_for
+from .validation import NeighborValidator, fetch_manifest_digest, DEFAULT_DEADLINE
+from .sessions import registry, DEFAULT_TIMEOUT
+from .broadcast import broadcaster
+from .sync import sync_chain, read_ndjson
+from .journal import JournalStorage
+from .bloom import BloomFilter, DEFAULT_CAPACITY, DEFAULT_ERROR_RATE
+from .auth import VerifiedTokens, TokenStore
+from flask import url_for, current_app
 
 
-# Maximum time for http connection
-DEFAULT_TIMEOUT = 10
-
 DEFAULT_CONFIG = {
     'difficulty': 4, 
     'validation_time': 30,
     'spreading_time': 60,
+    'exchange_time': 30,
     'token_pending_time': 120,
-    'token_renew_time': (60 * 60) * 2 
+    'token_renew_time': (60 * 60) * 2,
+    'bloom_capacity': DEFAULT_CAPACITY,
+    'bloom_error_rate': DEFAULT_ERROR_RATE
 }
 
-
-def send_to_nodes(target, node_list, method='post'):
-    payload = dict(nodes=target)
-    caller = getattr(requests, method)
-    assert caller is not None, 'Invalid method'
-    relative_url = url_for('requsts.node') 
-    for node in node_list:
-        try:
-            response = caller(f'{node}{relative_url}', 
-                            data=payload,
-                            timeout=DEFAULT_TIMEOUT)
-
-            if response.status_code != 201:
-                print(response.text)
-        except Exception as exc:
-            print_exception(exc)
+# The JWT registry is shared by every chain and request, so its audience
+# is only changed while holding this lock
+_jwt_lock = threading.Lock()
 
 
 def get_json(url):
@@ -51,16 +47,9 @@ def get_json(url):
             return response.json()
 
 
-def hash_http_response(url, default=''):
-    response = http_get(url, default=default)
-    if response != default:
-        return hashlib.sha256(response.content).hexdigest()
-    return default
-
-
 def http_get(url, default=None):
     try:
-        return requests.get(url, timeout=DEFAULT_TIMEOUT)
+        return registry.get(url, timeout=DEFAULT_TIMEOUT)
     except Exception as exc:
         print_exception(exc)
     return default
@@ -86,11 +75,16 @@ def filter_blockchain_payload(payload: dict):
     del payload['jwt']
     del payload['schedule']
     del payload['predicate']
+    # only live tokens are stored
+    payload['tokens'] = payload['tokens'].to_dict()
+    payload['pending_tokens'] = payload['pending_tokens'].to_dict()
+    if payload['key_index'] is not None:
+        payload['key_index'] = list(payload['key_index'])
     return payload
 
 
 @dataclass
-class BlockchainStorage(ClassStorage):
+class BlockchainStorage(JournalStorage):
     output_filter: callable = filter_blockchain_payload
 
 
@@ -106,8 +100,8 @@ class Blockchain:
     name: str
 
     config: Dict = None
-    tokens: List = field(default_factory=list)
-    pending_tokens: List = field(default_factory=list)
+    tokens: TokenStore = field(default_factory=TokenStore)
+    pending_tokens: TokenStore = field(default_factory=TokenStore)
     
     transactions: List = field(default_factory=list)
     chain: List = field(default_factory=list)
@@ -118,8 +112,26 @@ class Blockchain:
 
     access_token: str = None
 
+    # keys of the chain blocks, see block_keys()
+    key_index: Set = None
+    key_index_length: int = 0
+
     def __post_init__(self):
         self.logger = logging.getLogger('blockchain')
+        self.generation = 0
+        self._filter = None
+        self._filter_length = 0
+        self.verified_tokens = VerifiedTokens()
+
+        # stored as dicts, or formerly as lists without expiration
+        if not isinstance(self.tokens, TokenStore):
+            self.tokens = TokenStore(self.tokens)
+        if not isinstance(self.pending_tokens, TokenStore):
+            self.pending_tokens = TokenStore(self.pending_tokens)
+
+        if self.key_index is not None:
+            # stored as a list
+            self.key_index = set(self.key_index)
 
         if self.predicate is None:
             self.predicate = NodePredicate(self)
@@ -143,15 +155,48 @@ class Blockchain:
         if not len(self.chain):
             self.new_block(previous_hash='1', timestamp=1, proof=100)    
 
-    def request_with_auth(self, url, method='get'):
+    def auth_headers(self):
         assert self.access_token, 'Any access token available.'
-        kwargs = dict()
-        kwargs['headers'] = {
+        return {
             'Authorization': f'Bearer {self.access_token}',
             'X-Node-Id': self.node.identifier
         }
-        kwargs['timeout'] = 10
-        return getattr(requests, method)(url, **kwargs)
+
+    def request_with_auth(self, url, method='get', **kwargs):
+        kwargs['headers'] = self.auth_headers()
+        kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+        return registry.request(method, url, **kwargs)
+
+    def send_to_nodes(self, target, node_list, method='post', retry=False, headers=None):
+        """
+        Send the target nodes to every node of the list, concurrently,
+        authenticated just like request_with_auth().
+
+        :param target: <list> Nodes to send
+        :param node_list: <list> Nodes receiving the target
+        :param method: <str> HTTP method
+        :param retry: <bool> Wheter to queue failed deliveries for retrying
+        :param headers: <dict> Authentication headers, by default the
+                        ones of auth_headers()
+        :return: <list> A DeliveryResult for each node
+        """
+
+        payload = dict(nodes=target)
+        assert hasattr(registry, method), 'Invalid method'
+        relative_url = url_for('requests.node_action')
+        results = broadcaster.broadcast(node_list,
+                                        method,
+                                        relative_url,
+                                        retry=retry,
+                                        data=payload,
+                                        headers=headers or self.auth_headers(),
+                                        timeout=DEFAULT_TIMEOUT)
+
+        for result in results:
+            if not result.ok:
+                self.logger.warning('failed sending to %s: %s',
+                                    result.node, result.error or result.status)
+        return results
     
     def check_proof_or_fail(self, proof):
         if not self.valid_proof(proof, *self.get_last_info()):
@@ -160,6 +205,80 @@ class Blockchain:
     def assign_jwt_issuer(self):
         self.jwt.issuer = self.node.identifier
 
+    def encode_token(self, expire_seconds, audience=None, **claims):
+        """
+        Create a JWT token for the audience.
+
+        :param expire_seconds: <int> Seconds until the token expires
+        :param audience: <str> Identifier of the node using the token
+        :return: <str>
+        """
+
+        with _jwt_lock:
+            self.jwt.audience = audience
+            try:
+                return self.jwt.encode(expire_seconds, **claims)
+            finally:
+                self.jwt.audience = None
+
+    def decode_token(self, token, audience=None):
+        """
+        Decode a JWT token, failing when it is not valid for the audience.
+
+        :param token: <str> JWT token
+        :param audience: <str> Identifier of the node using the token
+        :return: <dict> Claims of the token
+        """
+
+        with _jwt_lock:
+            self.jwt.audience = audience
+            try:
+                return self.jwt.decode(token)
+            finally:
+                self.jwt.audience = None
+
+    def is_valid_token(self, token, identifier):
+        """
+        Check the token was issued by this node to the node with the
+        identifier. Tokens are only decoded the first time, then they are
+        looked up at the verified tokens until they expire.
+
+        :param token: <str> JWT token
+        :param identifier: <str> Identifier of the node sending the token
+        :return: <bool>
+        """
+
+        self.sweep_tokens()
+        if token not in self.tokens:
+            return False
+
+        if self.verified_tokens.get(token, identifier):
+            return True
+
+        try:
+            data = self.decode_token(token, identifier)
+        except Exception:
+            return False
+
+        expires_at = data.get('exp') or self.tokens.expiration(token)
+        if expires_at is not None:
+            self.verified_tokens.add(token, identifier, expires_at)
+        return True
+
+    def sweep_tokens(self):
+        """
+        Remove the expired tokens. Costs nothing while no token expired.
+
+        :return: <int> Number of tokens removed
+        """
+
+        # verified tokens expire by themselves at the same time
+        removed = len(self.tokens.expire()) + len(self.pending_tokens.expire())
+        if removed:
+            # not a modification, expired tokens are never written
+            self.logger.debug('expired tokens: %s', removed)
+        return removed
+
     def get_last_info(self):
         """
         Get the last proof of work and the hash of the last
@@ -171,29 +290,25 @@ class Blockchain:
         last_block = self.last_block
         return last_block['proof'], self.hash(last_block)
 
-    def valid_chain(self, chain):
+    def valid_chain(self, chain, start=1):
         """
         Determine if a given blockchain is valid
 
         :param chain: A blockchain
+        :param start: <int> Position of the first block to check, the
+                      blocks before it are already trusted
         :return: Wheter is valid
         """
 
-        last_block = chain[0]
-        current_index = 1
+        last_block = chain[start - 1]
+        current_index = start
 
         while current_index < len(chain):
             block = chain[current_index]
             self.logger.debug('last block on chain: %s', last_block)
             self.logger.debug('current block: %s', block)
 
-            # Check that the hash of the block is correct
-            last_block_hash = self.hash(last_block)
-            if block['previous_hash'] != last_block_hash:
-                return False
-
-            # Check that the Proof of Work is correct
-            if not self.valid_proof(block['proof'], last_block['proof'], last_block_hash):
+            if not self.valid_link(last_block, block):
                 return False
 
             last_block = block
@@ -201,31 +316,65 @@ class Blockchain:
 
         return True
 
+    def valid_link(self, last_block, block):
+        """
+        Determine if a block is a valid successor of the last block.
+
+        :param last_block: <dict> Previous block
+        :param block: <dict> Block to check
+        :return: Wheter is valid
+        """
+
+        # Check that the hash of the block is correct
+        last_block_hash = self.hash(last_block)
+        if block['previous_hash'] != last_block_hash:
+            return False
+
+        # Check that the Proof of Work is correct
+        return self.valid_proof(block['proof'], last_block['proof'], last_block_hash)
+
     def resolve_conflicts(self):
         self.validate_neighbors()
         self.spread_neighbors()
         return self.exchange_chains()
         
-    def exchange_chains(self):
+    def exchange_chains(self, transaction=None):
         """
         This is our consensus algorithm, it resolves conflicts
         by replacing our chain with the longest one in the network.
 
+        The parent is reached without holding the chain, a ChainSnapshot
+        is synchronized instead, and the chain is held again only to
+        accept the received blocks.
+
+        :param transaction: <callable> Context manager factory holding
+                            the chain and giving its current object, like
+                            ChainCache.transaction(), by default the chain
+                            is not held
         :return: Wheter current chain was replaced
         """
 
-        if not self.node.is_root:
-            path = url_for('requests.chain', name=self.name)
+        transaction = transaction or self._unheld
+        with transaction() as blockchain:
+            if blockchain.node.is_root:
+                return False
+            if not blockchain.access_token:
+                self.logger.warning('parent chain not synced without an access token')
+                return False
+            snapshot = ChainSnapshot(blockchain)
 
-            # Grab and verify the chains from all the nodes in our network
-            response = self.request_with_auth(f'{self.node.parent.host}{path}')
-            data = response.json()
-            if response.status_code == 200 and data:
-                if self.accept_chain(data['chain']):
-                    return True
-                self.logger.debug('our chain is longer')
-                self.logger.debug('preparing to sync parent')
-        return False
+        # only the blocks after the common ancestor are transferred
+        if not sync_chain(snapshot, snapshot.fetch, stream=snapshot.stream):
+            self.logger.debug('our chain is longer')
+            self.logger.debug('preparing to sync parent')
+            return False
+
+        with transaction() as blockchain:
+            # validated again, the chain may have changed meanwhile
+            return blockchain.accept_suffix(*snapshot.received)
+
+    def _unheld(self):
+        return nullcontext(self)
 
     def accept_chain(self, chain):
         """
@@ -241,10 +390,54 @@ class Blockchain:
 
         # Check if the length is longer and the chain is valid
         if len(chain) > max_length and self.valid_chain(chain):
-            self.chain = chain
+            self._replace_chain(chain, -1)
+            return True
+        return False
+
+    def accept_suffix(self, position, blocks):
+        """
+        Replace the blocks after the position with the received ones, when
+        the resulting chain is longer. Only the received blocks are
+        validated, as the blocks until the position are ours, see
+        valid_suffix().
+
+        :param position: <int> Position of the last block shared with
+                         the remote chain
+        :param blocks: <iterable> Remote blocks after the position
+        :return: Wheter our chain was replaced
+        """
+
+        suffix = self.valid_suffix(self.chain, position, blocks)
+        if suffix is not None and position + 1 + len(suffix) > len(self.chain):
+            self._replace_chain(self.chain[:position + 1] + suffix, position)
             return True
         return False
 
+    def valid_suffix(self, chain, position, blocks):
+        """
+        Validate the blocks received after the position of the chain.
+        Blocks may come from a stream, and they are validated as they
+        arrive, stopping at the first invalid one.
+
+        :param chain: <list> A blockchain
+        :param position: <int> Position of the last block shared with
+                         the remote chain
+        :param blocks: <iterable> Remote blocks after the position
+        :return: <list> The received blocks, None when any is invalid
+        """
+
+        if not 0 <= position < len(chain):
+            return None
+
+        last_block = chain[position]
+        suffix = []
+        for block in blocks:
+            if not self.valid_link(last_block, block):
+                return None
+            suffix.append(block)
+            last_block = block
+        return suffix
+
     def new_block(self, proof, previous_hash, timestamp=None):
         """
         Create a new Block in the Blockchain
@@ -266,8 +459,88 @@ class Blockchain:
         self.transactions = []
 
         self.chain.append(block)
+        self._index_blocks([block])
+        self.modified()
         return block
 
+    def modified(self):
+        """
+        Count a modification of the chain state, so caches know it must
+        be written again.
+        """
+
+        self.generation += 1
+
+    def block_keys(self, block):
+        """
+        Get the keys of a block kept at the index, so has_key() does not
+        scan the chain. Subclasses define their keys.
+
+        :param block: <dict> A block
+        :return: <iterable>
+        """
+
+        return ()
+
+    def has_key(self, key):
+        """
+        Defines wheter a block of the chain has the key, rebuilding the
+        index when it is out of date.
+
+        :param key: Key of a block
+        :return: <bool>
+        """
+
+        if self.key_index is None or self.key_index_length != len(self.chain):
+            self.key_index = {key for block in self.chain
+                              for key in self.block_keys(block)}
+            self.key_index_length = len(self.chain)
+        return key in self.key_index
+
+    def key_filter(self):
+        """
+        Get a Bloom filter of the keys of the chain blocks, so other nodes
+        may check keys without downloading the chain. It is built again
+        when out of date or too full for the configured error rate.
+
+        :return: <BloomFilter>
+        """
+
+        if self._filter is None or self._filter_length != len(self.chain):
+            keys = [key for block in self.chain for key in self.block_keys(block)]
+            capacity = max(int(self.config['bloom_capacity']), 2 * len(keys))
+            self._filter = BloomFilter(capacity, float(self.config['bloom_error_rate']))
+            self._filter.update(keys)
+            self._filter_length = len(self.chain)
+        return self._filter
+
+    def _index_blocks(self, blocks):
+        # missing indexes are only built when needed
+        for block in blocks:
+            keys = list(self.block_keys(block))
+            if self.key_index is not None:
+                self.key_index.update(keys)
+                self.key_index_length += 1
+            if self._filter is not None:
+                self._filter.update(keys)
+                self._filter_length += 1
+
+        if self._filter is not None and len(self._filter) > self._filter.capacity:
+            self._filter = None
+
+    def _replace_chain(self, chain, position):
+        self.modified()
+
+        # blocks after the position are new, the others are ours
+        if position == len(self.chain) - 1:
+            blocks = chain[position + 1:]
+            self.chain = chain
+            self._index_blocks(blocks)
+        else:
+            self.chain = chain
+            self.key_index = None
+            self._filter = None
+
     def new_transaction(self, content):
         """
         Creates a new transaction to go into the next mined Block
@@ -277,6 +550,7 @@ class Blockchain:
         """
         
         self.transactions.append(content)
+        self.modified()
         return self.last_block['index'] + 1
 
     @property
@@ -357,6 +631,18 @@ class Blockchain:
         if self.schedule.check('validation'):
             self._do_validation()
 
+    def neighbor_hosts(self):
+        """
+        Get the hosts of the parent, children and siblings of the node.
+
+        :return: <list>
+        """
+
+        neighbors = list(self.node.children) + list(self.node.siblings)
+        if self.node.parent:
+            neighbors.append(self.node.parent)
+        return [getattr(neighbor, 'host', neighbor) for neighbor in neighbors]
+
     def _has_own_server(self, nodes):
         """
         Defines wheter the current node is inside
@@ -371,28 +657,37 @@ class Blockchain:
                 return True
         return False
 
-    def _do_spread(self):
+    def _do_spread(self, transaction=None):
         """
         Share node information with all registered nodes from this chain
-        and the remote chain.
+        and the remote chain. The parent is reached without holding the
+        chain, see exchange_chains().
 
-        :param node: <str> Current node
+        :param transaction: <callable> Context manager factory holding
+                            the chain and giving its current object
         """
 
         self.logger.info('starting spread...')
-        if not self.node.is_root:
-            data = get_json(f'{self.node.parent.host}/node')
-            if data:
-                self.revokeds.extend(data['revokeds'])
-                
-                for node_data in data['children']:
-                    node = simple_node_factory(node_data)
-                    if self.is_remote(node):
-                        self.node.add_sibling(node)
-                    
-                self.logger.debug('new siblings: %s', self.node.siblings)
-
-        min_votes = round((len(self.node.children) + 1 ) / 2)
+        transaction = transaction or self._unheld
+        with transaction() as blockchain:
+            parent = None if blockchain.node.is_root else blockchain.node.parent.host
+
+        data = get_json(f'{parent}/node') if parent else None
+        with transaction() as blockchain:
+            blockchain._apply_spread(data)
+
+    def _apply_spread(self, data):
+        if data:
+            self.revokeds.extend(data['revokeds'])
+
+            for node_data in data['children']:
+                node = simple_node_factory(node_data)
+                if self.is_remote(node):
+                    self.node.add_sibling(node)
+
+            self.logger.debug('new siblings: %s', self.node.siblings)
+
+        min_votes = round((len(self.node.children) + 1) / 2)
 
         for node in set(self.revokeds):
             self.logger.debug('revokeds count: %d', self.revokeds.count(node))
@@ -402,69 +697,189 @@ class Blockchain:
             else:
                 self.logger.debug(f'node was removed: {node}')
         self.revokeds = []
+        self.modified()
 
-    def _do_validation(self):
+    def _do_validation(self, transaction=None):
         """
         Compute a hash function with each node endpoint that
-        matches the own server endpoint.
+        matches the own server endpoint. Nodes are validated, and the
+        invalid ones sent, without holding the chain, see
+        exchange_chains().
+
+        :param transaction: <callable> Context manager factory holding
+                            the chain and giving its current object
         """
 
         self.logger.info('starting validation...')
-        invalids = []
-        
-        for node in list(self.node.children):
-            # try to revoke without clearing predicate's cache
-            if self.revoke_node(node, clear=False):
-                invalids.append(node)
-        
-        # clear predicate's cache
-        self.predicate.clear_cache()
+        transaction = transaction or self._unheld
+
+        if broadcaster.retry_queue:
+            results = broadcaster.retry_failed()
+            self.logger.debug('retried deliveries: %s', results)
 
-        if invalids:
+        with transaction() as blockchain:
+            children = list(blockchain.node.children)
+
+        # all children are validated concurrently, results come as they end
+        results = list(self.predicate.validate_all(children))
+
+        with transaction() as blockchain:
+            invalids = [node for node, is_valid in results
+                        if blockchain.revoke_node(node, is_valid=is_valid)]
+            hosts = blockchain.neighbor_hosts()
+            headers = blockchain.auth_headers() if blockchain.access_token else None
+
+        if invalids and not headers:
+            self.logger.warning('nodes invalid, but not sent without an access token: %s', invalids)
+        elif invalids:
             self.logger.debug('nodes invalid: %s', invalids)
-            send_to_nodes(invalids, self.nodes, method='delete')
+            results = self.send_to_nodes(invalids, hosts, method='delete', retry=True, headers=headers)
+            self.logger.debug('revoking deliveries: %s', results)
 
 
+class ChainSnapshot:
+    """
+    Copy of what syncing a chain with its parent needs, the blocks, the
+    parent host and the credentials. It is taken while holding the chain
+    and synced without holding it. Received blocks are validated as they
+    arrive and kept, to be accepted by the chain held again, see
+    Blockchain.exchange_chains().
+    """
+
+    def __init__(self, blockchain: Blockchain):
+        self.chain = list(blockchain.chain)
+        self.hash = blockchain.hash
+        self.name = blockchain.name
+        self.host = blockchain.node.parent.host
+        self.headers = blockchain.auth_headers()
+        self.valid_suffix = blockchain.valid_suffix
+        self.received = None
+
+    def accept_suffix(self, position, blocks):
+        suffix = self.valid_suffix(self.chain, position, blocks)
+        if suffix is not None and position + 1 + len(suffix) > len(self.chain):
+            self.received = (position, suffix)
+            return True
+        return False
+
+    def fetch(self, endpoint, method, **kwargs):
+        path = url_for(f'requests.chain_{endpoint}', name=self.name)
+        try:
+            response = self._request(path, method, **kwargs)
+            if response.status_code == 200:
+                return response.json()
+        except Exception as exc:
+            print_exception(exc)
+        return None
+
+    def stream(self, from_index):
+        path = url_for('requests.chain', name=self.name)
+        params = {'from_index': from_index, 'format': 'ndjson'}
+        try:
+            response = self._request(path, 'get', params=params, stream=True)
+            with response:
+                if response.status_code == 200:
+                    yield from read_ndjson(response.iter_lines())
+        except Exception as exc:
+            # the blocks received until the failure are still accepted
+            print_exception(exc)
+
+    def _request(self, path, method, **kwargs):
+        kwargs.setdefault('timeout', DEFAULT_TIMEOUT)
+        return registry.request(method, f'{self.host}{path}',
+                                headers=self.headers,
+                                **kwargs)
+
+
+# static assets compared when the manifests of two nodes differ
+JS_ASSETS = ['crypto-js/core.js', 'miner.js', 'crypto-js/sha256.js']
+
+# static assets randomly compared when the manifests of two nodes match
+SAMPLED_ASSETS = 1
+
 
 class NodePredicate:
     def __init__(self, chain: Blockchain):
         self.chain = chain
-        self.chain_hashes = None
-        self.hashes = [
-            self.get_home_hash, 
-            self.get_core_js_hash,
-            self.get_miner_js_hash,
-            self.get_sha256_js_hash
-        ]
+        self.logger = chain.logger
+        self.manifest_validator = NeighborValidator(self.manifest_urls,
+                                                    fetch=fetch_manifest_digest)
+        self.validator = NeighborValidator(self.asset_urls)
+
+    def __deepcopy__(self, memo):
+        # asdict() copies the blockchain fields, but the predicate is never
+        # stored, see filter_blockchain_payload()
+        return self
 
     def is_valid(self, node):
-        if self.chain_hashes is None:
-            self.chain_hashes = list(map(lambda fn: fn(self.chain.server_name), self.hashes))
-        print(f'own hashes: {self.chain_hashes}')
-        for index, pred in enumerate(self.hashes):
-            own_hash = self.chain_hashes[index]
-            node_hash = pred(node)
-            print(f'node hash: {node_hash}')
-            if own_hash != node_hash:
-                return False
-        return True
-    
-    def clear_cache(self):
-        self.chain_hashes = None
+        return dict(self.validate_all([node])).get(node, False)
+
+    def validate_all(self, nodes):
+        """
+        Validate the nodes concurrently. The manifest digest of each node
+        is compared with ours, a single request per node, then the home
+        page and the JS assets of each node are fetched and compared, see
+        NeighborValidator.validate().
+
+        Manifests are served to anyone, so a node may copy ours. The
+        rendered home page is always compared, and nodes with our digest
+        have a random sample of their JS assets compared, so altered
+        assets are found within a few rounds. Nodes with another digest
+        have every JS asset compared. Every round shares a single
+        deadline.
+
+        :param nodes: <list> Nodes' urls
+        :return: <generator> Pairs of (node, is_valid)
+        """
+
+        until = monotonic() + DEFAULT_DEADLINE
+        manifest = current_app.asset_manifest.current()
+        home = self.home_hash()
+        self.logger.debug('own manifest: %s, home: %s', manifest['digest'], home)
+
+        matched, mismatched = [], []
+        for node, is_valid in self.manifest_validator.validate([manifest['digest']], nodes, until):
+            (matched if is_valid else mismatched).append(node)
+
+        if matched:
+            sample = random.sample(JS_ASSETS, SAMPLED_ASSETS)
+            validator = NeighborValidator(lambda node: self.asset_urls(node, sample))
+            yield from validator.validate(self._reference(home, manifest, sample), matched, until)
+
+        if mismatched:
+            reference = self._reference(home, manifest, JS_ASSETS)
+            yield from self.validator.validate(reference, mismatched, until)
 
-    def get_home_hash(self, node):
-        node_url = url_wihout_csrf(node)
-        return hash_http_response(node_url)
+    def home_hash(self):
+        """
+        Hash our home page rendered without the CSRF token, the same one
+        the nodes serve.
+
+        :return: <str>
+        """
 
-    def get_core_js_hash(self, node):
-        return self._hash_js_asset(node, 'crypto-js/core.js')
+        response = current_app.test_client().get(url_wihout_csrf('/'))
+        return hashlib.sha256(response.data).hexdigest()
+
+    @staticmethod
+    def _reference(home, manifest, names):
+        return [home] + [manifest['assets'][f'static/js/{name}'] for name in names]
 
-    def get_miner_js_hash(self, node):
-        return self._hash_js_asset(node, 'miner.js')
+    def manifest_urls(self, node):
+        return [f'{node}{url_for("requests.manifest")}']
+
+    def asset_urls(self, node, names=JS_ASSETS):
+        """
+        Get the urls of the node's home page and JS assets, in the same
+        order of the names.
+
+        :param node: <str> Node's url
+        :param names: <list> Assets at the static js folder
+        :return: <list>
+        """
 
-    def get_sha256_js_hash(self, node):
-        return self._hash_js_asset(node, 'crypto-js/sha256.js')
+        return [url_wihout_csrf(node)] + [self._js_asset_url(node, name) for name in names]
 
-    def _hash_js_asset(self, node, name):
+    def _js_asset_url(self, node, name):
         relative_path = url_for('static', filename=f'js/{name}')
-        return hash_http_response(f'{node}{relative_path}')
\ No newline at end of file
+        return f'{node}{relative_path}'
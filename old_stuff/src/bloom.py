@@ -0,0 +1,132 @@
+import math
+import base64
+import hashlib
+
+
+DEFAULT_CAPACITY = 100000
+
+# Probability of a key not added being reported as added
+DEFAULT_ERROR_RATE = 0.01
+
+
+class BloomFilter:
+    """
+    Compact summary of a set of keys. Added keys are always found, while
+    keys never added are found with a probability near the error rate,
+    until more keys than the capacity are added. Keys can not be removed.
+
+    Usage:
+        >>> keys = BloomFilter(capacity=1000, error_rate=0.01)
+        >>> keys.add('foo@bar.com')
+        >>> 'foo@bar.com' in keys
+        True
+        >>> 'bar@foo.com' in keys
+        False
+    """
+
+    def __init__(self,
+                capacity=DEFAULT_CAPACITY,
+                error_rate=DEFAULT_ERROR_RATE,
+                size=None,
+                hashes=None,
+                bits=None,
+                count=0):
+        assert capacity > 0, 'Invalid capacity.'
+        assert 0 < error_rate < 1, 'Invalid error rate.'
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = size or self.optimal_size(capacity, error_rate)
+        self.hashes = hashes or self.optimal_hashes(self.size, capacity)
+        self.bits = bits or bytearray((self.size + 7) // 8)
+        self.count = count
+
+    def __contains__(self, key):
+        return all(self.bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+    def __len__(self):
+        return self.count
+
+    def add(self, key):
+        """
+        Add a key to the filter.
+
+        :param key: <str> Key to add
+        """
+
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, keys):
+        """
+        Add many keys to the filter.
+
+        :param keys: <iterable> Keys to add
+        """
+
+        for key in keys:
+            self.add(key)
+
+    @property
+    def memory(self):
+        """Bytes used by the bits of the filter."""
+
+        return len(self.bits)
+
+    @property
+    def estimated_error_rate(self):
+        """Probability of false positives with the keys added so far."""
+
+        return (1 - math.exp(-self.hashes * self.count / self.size)) ** self.hashes
+
+    def to_dict(self):
+        """
+        Get a JSON serializable representation of the filter.
+
+        :return: <dict>
+        """
+
+        return {
+            'capacity': self.capacity,
+            'error_rate': self.error_rate,
+            'size': self.size,
+            'hashes': self.hashes,
+            'count': self.count,
+            'bits': base64.b64encode(bytes(self.bits)).decode()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a filter from its representation, see to_dict().
+
+        :param data: <dict>
+        :return: <BloomFilter>
+        """
+
+        bits = bytearray(base64.b64decode(data['bits']))
+        assert len(bits) == (data['size'] + 7) // 8, 'Invalid filter size.'
+        return cls(capacity=data['capacity'],
+                   error_rate=data['error_rate'],
+                   size=data['size'],
+                   hashes=data['hashes'],
+                   bits=bits,
+                   count=data['count'])
+
+    @staticmethod
+    def optimal_size(capacity, error_rate):
+        return math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+
+    @staticmethod
+    def optimal_hashes(size, capacity):
+        return max(1, round(size / capacity * math.log(2)))
+
+    def _positions(self, key):
+        # double hashing, every position comes from a single digest
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + index * second) % self.size
+                for index in range(self.hashes)]
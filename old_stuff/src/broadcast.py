@@ -0,0 +1,149 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from .sessions import registry
+
+
+# Maximum simultaneous deliveries of a broadcast
+DEFAULT_CONCURRENCY = 16
+
+# Maximum time for a whole broadcast
+DEFAULT_BROADCAST_TIMEOUT = 30
+
+# Maximum times a failed delivery is sent again from the retry queue
+DEFAULT_MAX_ATTEMPTS = 3
+
+SUCCESS_STATUSES = (200, 201)
+
+
+@dataclass
+class DeliveryResult:
+    """
+    What happened when sending a message to one node.
+    """
+
+    node: str
+    status: int = None
+    latency: float = None
+    error: str = None
+
+    @property
+    def ok(self):
+        return self.error is None and self.status in SUCCESS_STATUSES
+
+
+@dataclass
+class Delivery:
+    """
+    A message waiting at the retry queue.
+    """
+
+    node: str
+    method: str
+    path: str
+    kwargs: Dict = field(default_factory=dict)
+    attempts: int = 1
+
+
+@dataclass
+class Broadcaster:
+    """
+    Send the same request to many nodes concurrently, returning the
+    result of each delivery. The whole broadcast must finish before a
+    global timeout. Failed deliveries may be kept at a retry queue to be
+    sent again later with retry_failed().
+
+    Usage:
+        >>> broadcaster = Broadcaster(concurrency=4)
+        >>> results = broadcaster.broadcast(nodes, 'post', '/node', data=payload)
+        >>> [result.node for result in results if not result.ok]
+        ['http://1.2.3.4']
+    """
+
+    concurrency: int = DEFAULT_CONCURRENCY
+    timeout: float = DEFAULT_BROADCAST_TIMEOUT
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    retry_queue: List[Delivery] = field(default_factory=list)
+    request: Any = None
+
+    def __post_init__(self):
+        if self.request is None:
+            self.request = registry.request
+        self._lock = threading.Lock()
+
+    def broadcast(self, nodes, method, path, retry=False, **kwargs):
+        """
+        Send the request to every node.
+
+        :param nodes: <list> Nodes' urls
+        :param method: <str> HTTP method
+        :param path: <str> Path appended to each node url
+        :param retry: <bool> Wheter to queue failed deliveries
+        :return: <list> A DeliveryResult for each node, in order
+        """
+
+        deliveries = [Delivery(node, method, path, kwargs) for node in nodes]
+        return self._deliver(deliveries, retry)
+
+    def retry_failed(self):
+        """
+        Send again the deliveries at the retry queue. Those failing again
+        are kept until they reach the maximum attempts.
+
+        :return: <list> A DeliveryResult for each retried delivery
+        """
+
+        with self._lock:
+            deliveries, self.retry_queue = self.retry_queue, []
+
+        for delivery in deliveries:
+            delivery.attempts += 1
+        return self._deliver(deliveries, retry=True)
+
+    def _deliver(self, deliveries, retry):
+        results = dict()
+        futures = dict()
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            futures = {executor.submit(self._send, delivery): delivery
+                       for delivery in deliveries}
+            for future in as_completed(futures, timeout=self.timeout):
+                results[id(futures[future])] = future.result()
+        except TimeoutError:
+            pass
+        finally:
+            executor.shutdown(wait=False)
+            for future in futures:
+                future.cancel()
+
+        ordered = []
+        for delivery in deliveries:
+            result = results.get(id(delivery))
+            if result is None:
+                result = DeliveryResult(delivery.node, error='timeout')
+            if retry and not result.ok and delivery.attempts < self.max_attempts:
+                with self._lock:
+                    self.retry_queue.append(delivery)
+            ordered.append(result)
+        return ordered
+
+    def _send(self, delivery):
+        started = time.perf_counter()
+        try:
+            response = self.request(delivery.method,
+                                    f'{delivery.node}{delivery.path}',
+                                    **delivery.kwargs)
+            return DeliveryResult(delivery.node,
+                                status=response.status_code,
+                                latency=time.perf_counter() - started)
+        except Exception as exc:
+            return DeliveryResult(delivery.node,
+                                latency=time.perf_counter() - started,
+                                error=str(exc))
+
+
+# broadcaster shared by every node gossip
+broadcaster = Broadcaster()
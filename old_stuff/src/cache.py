@@ -0,0 +1,223 @@
+import os
+import time
+import fcntl
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+
+
+# Minimum seconds between two writes of the same chain
+DEFAULT_FLUSH_INTERVAL = 5
+
+
+class ChainCache:
+    """
+    Keeps the chain of a storage in memory between requests. The chain is
+    only written when it was modified, at most once per flush interval,
+    and only loaded again when its file was changed by another process.
+
+    Chains are changed within transactions, which hold a lock file shared
+    by every process. The chain is loaded again when another process
+    changed it, then changed, and written before the file is unlocked, so
+    the changes of many processes are applied one after another and none
+    is lost. Chains count their modifications at a generation number, see
+    Blockchain.modified(). Changes made out of a transaction are written
+    at the flush interval, while holding the lock file, unless another
+    process changed the chain first: then they are dropped and the chain
+    loaded again.
+
+    Usage:
+        >>> cache = ChainCache(storage, flush_interval=5)
+        >>> with cache.transaction() as chain:
+        ...     chain.new_block(proof, last_hash)
+        >>> cache.get().last_block
+    """
+
+    def __init__(self, storage, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.storage = storage
+        self.flush_interval = flush_interval
+        self.lock = threading.RLock()
+        self.lock_path = f'{storage.path}.lock'
+        self.logger = logging.getLogger('cache')
+        self._lock_file = None
+        self._file_state = self._stat()
+        self._flushed = self._generation()
+        self._flushed_at = time.monotonic()
+
+    @property
+    def dirty(self):
+        """Wheter the chain was modified since the last write."""
+
+        return self._generation() != self._flushed
+
+    def get(self):
+        """
+        Get the cached chain, loading it again when its file was changed
+        by another process.
+
+        :return: <Blockchain>
+        """
+
+        with self.lock:
+            return self._refresh()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Change the chain while no other process changes it. The chain is
+        written when the transaction ends, even when it fails, as the
+        changes made until the failure are kept in memory. Transactions
+        may be nested, only the outermost one writes.
+
+        :return: <Blockchain>
+        """
+
+        with self.lock:
+            outermost = self._lock_file is None
+            with self._file_locked():
+                try:
+                    yield self._refresh()
+                finally:
+                    if outermost:
+                        self._write()
+
+    def flush(self, force=False, sync=False):
+        """
+        Write the chain when it was modified and the flush interval has
+        passed since the last write.
+
+        :param force: <bool> Write without waiting for the interval
+        :param sync: <bool> Wheter to wait the file to reach the disk
+        :return: <bool> Wheter the chain was written
+        """
+
+        with self.lock:
+            if not self.dirty:
+                return False
+
+            if not force and time.monotonic() - self._flushed_at < self.flush_interval:
+                return False
+
+            with self._file_locked():
+                self._refresh()
+                return self._write(sync)
+
+    def reload(self):
+        """
+        Load the chain from its file again, dropping our changes not
+        written.
+
+        :return: <Blockchain>
+        """
+
+        with self.lock:
+            self.storage.load()
+            self._flushed = self._generation()
+            self._file_state = self._stat()
+            return self.storage.current
+
+    def _refresh(self):
+        if self._stat() == self._file_state:
+            return self.storage.current
+
+        if self.dirty:
+            # only changes made out of a transaction, the other process
+            # wrote its changes first, and they are kept
+            self.logger.error('%s changed by another process, dropping our '
+                              'changes not written', self.storage.path)
+        return self.reload()
+
+    def _write(self, sync=False):
+        if not self.dirty:
+            return False
+
+        generation = self._generation()
+        self.storage.save(self.storage.current)
+        if sync:
+            self._fsync()
+
+        self._flushed = generation
+        self._flushed_at = time.monotonic()
+        self._file_state = self._stat()
+        return True
+
+    @contextmanager
+    def _file_locked(self):
+        # the lock belongs to the open file, so nested holders share it
+        if self._lock_file is not None:
+            yield
+            return
+
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._lock_file = lock_file
+            try:
+                yield
+            finally:
+                self._lock_file = None
+
+    def _generation(self):
+        current = self.storage.current
+        return id(current), getattr(current, 'generation', 0)
+
+    def _files(self):
+        # journaled storages keep the changes at another file
+        return getattr(self.storage, 'files', (self.storage.path,))
+
+    def _stat(self):
+        states = []
+        for path in self._files():
+            try:
+                stat = os.stat(path)
+                states.append((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                states.append(None)
+        return states
+
+    def _fsync(self):
+        for path in self._files():
+            if not os.path.exists(path):
+                continue
+
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+
+class WriteBehind:
+    """
+    Flushes the modified chains of many caches at a background thread,
+    so requests never wait for the disk. Every chain is written and
+    synced to disk when stopped, or at the interpreter exit.
+    """
+
+    def __init__(self, caches, interval=DEFAULT_FLUSH_INTERVAL):
+        self.caches = caches
+        self.interval = interval
+        self.logger = logging.getLogger('cache')
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        if self._stopped.is_set():
+            return
+
+        self._stopped.set()
+        for cache in self.caches:
+            cache.flush(force=True, sync=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            for cache in self.caches:
+                try:
+                    cache.flush()
+                except Exception:
+                    # try again at the next interval
+                    self.logger.exception('failed writing %s', cache.storage.path)
@@ -0,0 +1,275 @@
+import os
+import json
+import copy
+from dataclasses import dataclass, fields, is_dataclass, asdict
+from typing import Any
+
+
+# Journal records written before the snapshot is rewritten
+DEFAULT_COMPACT_EVERY = 100
+
+# Field journaled by appending its new items
+APPENDED_FIELD = 'chain'
+
+# Fields only written with the snapshot, as they are rebuilt when stale
+SNAPSHOT_FIELDS = ('key_index', 'key_index_length')
+
+
+def _replay_blocks(payload, record):
+    payload.setdefault(APPENDED_FIELD, [])
+    del payload[APPENDED_FIELD][record['from']:]
+    payload[APPENDED_FIELD].extend(record['blocks'])
+    # the stored index does not match the chain anymore
+    payload.pop('key_index', None)
+
+
+def _replay_update(payload, record):
+    value = payload.setdefault(record['field'], dict())
+    value.update(record['set'])
+    for key in record['del']:
+        value.pop(key, None)
+
+
+def _replay_extend(payload, record):
+    payload.setdefault(record['field'], []).extend(record['items'])
+
+
+def _replay_set(payload, record):
+    payload[record['field']] = record['value']
+
+
+def _replay_state(payload, record):
+    # whole states, written before fields were journaled by their changes
+    payload.update(record['state'])
+
+
+_REPLAYS = {
+    'blocks': _replay_blocks,
+    'update': _replay_update,
+    'extend': _replay_extend,
+    'set': _replay_set,
+    'state': _replay_state,
+}
+
+
+@dataclass
+class JournalStorage:
+    """
+    Stores a dataclass as a JSON snapshot plus a journal of changes. Each
+    save appends only the new chain blocks and the changes of the other
+    fields to the journal: the changed keys of dicts, the new items of
+    lists only appended to, and the whole value of any other changed
+    field. Unchanged values are compared but never copied nor written, so
+    the size of each save follows the size of the change.
+    The snapshot is rewritten from time to time through a temporary file
+    and a rename, so a crash never leaves a torn snapshot, and the journal
+    is replayed over the snapshot when loading.
+
+    Usage:
+        >>> storage = JournalStorage('chain.json', input_factory=factory)
+        >>> storage.save(blockchain)
+        >>> storage.load()
+        >>> storage.current.chain == blockchain.chain
+        True
+    """
+
+    path: str
+    input_factory: callable = None
+    output_filter: callable = None
+    compact_every: int = DEFAULT_COMPACT_EVERY
+    current: Any = None
+
+    def __post_init__(self):
+        self._records = 0
+        self._stored_blocks = []
+        self._state = dict()
+
+        if any(os.path.exists(path) for path in self.files):
+            self.load()
+
+    @property
+    def journal_path(self):
+        return f'{self.path}.journal'
+
+    @property
+    def files(self):
+        return (self.path, self.journal_path)
+
+    def load(self):
+        """Read the snapshot and replay the journal over it."""
+
+        payload = self._read_snapshot()
+        records = self._read_journal()
+        for record in records:
+            _REPLAYS[record['op']](payload, record)
+
+        self._records = len(records)
+        if not payload:
+            self.current = None
+            return
+
+        blocks = list(payload.get(APPENDED_FIELD, []))
+        factory = self.input_factory or (lambda data: data)
+        self.current = factory(payload)
+        self._stored_blocks = blocks
+        self._state = copy.deepcopy(self._filtered_state(self.current))
+
+    def save(self, obj):
+        """
+        Append the changes since the last save to the journal.
+
+        :param obj: Dataclass to store
+        """
+
+        self.current = obj
+        records = []
+
+        chain = getattr(obj, APPENDED_FIELD, [])
+        start = self._common_length(chain)
+        if start < len(chain) or start < len(self._stored_blocks):
+            records.append({
+                'op': 'blocks',
+                'from': start,
+                'blocks': chain[start:]
+            })
+
+        changes = self._state_changes(self._filtered_state(obj))
+        records.extend(changes)
+
+        if records:
+            self._append(records)
+            self._stored_blocks[start:] = chain[start:]
+            for record in changes:
+                # copied, so later changes of the object are still found
+                _REPLAYS[record['op']](self._state, copy.deepcopy(record))
+            self._records += len(records)
+
+        if self._records >= self.compact_every or not os.path.exists(self.path):
+            self.compact()
+
+    def compact(self):
+        """
+        Write the whole object to a new snapshot and empty the journal.
+        """
+
+        if self.current is None:
+            return
+
+        payload = self._filtered_state(self.current, snapshot=True)
+        payload[APPENDED_FIELD] = list(getattr(self.current, APPENDED_FIELD, []))
+
+        temp_path = f'{self.path}.tmp'
+        with open(temp_path, 'w') as writer:
+            json.dump(payload, writer)
+            writer.flush()
+            os.fsync(writer.fileno())
+        os.replace(temp_path, self.path)
+        self._fsync_directory()
+
+        # the journal is only emptied after the snapshot has it all
+        with open(self.journal_path, 'w') as writer:
+            os.fsync(writer.fileno())
+
+        self._stored_blocks = list(payload[APPENDED_FIELD])
+        self._state = copy.deepcopy(self._filtered_state(self.current))
+        self._records = 0
+
+    def _common_length(self, chain):
+        # blocks are linked by hash, so the chains share every block
+        # before the last equal one
+        length = min(len(chain), len(self._stored_blocks))
+        while length:
+            block, stored = chain[length - 1], self._stored_blocks[length - 1]
+            if block is stored or block == stored:
+                break
+            length -= 1
+        return length
+
+    def _state_changes(self, state):
+        changes = []
+        for name, value in state.items():
+            stored = self._state.get(name)
+            if name in self._state and stored == value:
+                continue
+
+            if isinstance(value, dict) and isinstance(stored, dict):
+                changes.append({
+                    'op': 'update',
+                    'field': name,
+                    'set': {key: item for key, item in value.items()
+                            if key not in stored or stored[key] != item},
+                    'del': [key for key in stored if key not in value]
+                })
+            elif isinstance(value, list) and isinstance(stored, list) and \
+                    value[:len(stored)] == stored:
+                changes.append({
+                    'op': 'extend',
+                    'field': name,
+                    'items': value[len(stored):]
+                })
+            else:
+                changes.append({'op': 'set', 'field': name, 'value': value})
+        return changes
+
+    def _filtered_state(self, obj, snapshot=False):
+        # values are not copied, the filter must not change them
+        state = dict()
+        skipped = [APPENDED_FIELD] + ([] if snapshot else list(SNAPSHOT_FIELDS))
+
+        for item in fields(obj):
+            value = getattr(obj, item.name)
+            if item.name in skipped:
+                state[item.name] = None
+            elif is_dataclass(value):
+                state[item.name] = asdict(value)
+            else:
+                state[item.name] = value
+
+        if self.output_filter:
+            state = self.output_filter(state)
+
+        for name in skipped:
+            state.pop(name, None)
+        return state
+
+    def _append(self, records):
+        lines = ''.join(json.dumps(record) + '\n' for record in records)
+        with open(self.journal_path, 'a') as writer:
+            writer.write(lines)
+            writer.flush()
+            os.fsync(writer.fileno())
+
+    def _read_snapshot(self):
+        try:
+            with open(self.path) as reader:
+                return json.load(reader)
+        except FileNotFoundError:
+            return dict()
+
+    def _read_journal(self):
+        records = []
+        offset = 0
+        try:
+            with open(self.journal_path, 'rb') as reader:
+                for line in reader:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # torn by a crash, drop it and what follows
+                        break
+                    offset += len(line)
+        except FileNotFoundError:
+            return records
+
+        if offset < os.path.getsize(self.journal_path):
+            with open(self.journal_path, 'r+b') as writer:
+                writer.truncate(offset)
+        return records
+
+    def _fsync_directory(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
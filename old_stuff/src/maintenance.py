@@ -0,0 +1,177 @@
+import time
+import random
+import threading
+from traceback import print_tb
+
+
+# Intervals are randomly moved up to this fraction, so nodes started
+# together do not reach their neighbors at the same time
+DEFAULT_JITTER = 0.1
+
+
+class Job:
+    """
+    A function run every interval by the maintenance worker.
+    """
+
+    def __init__(self, name, interval, target):
+        self.name = name
+        self.interval = interval
+        self.target = target
+        self.next_run = 0
+        self.woken = False
+        self.runs = 0
+        self.failures = 0
+        self.last_duration = None
+        self._running = threading.Lock()
+
+    def run(self):
+        """
+        Run the job, unless it is already running.
+
+        :return: <bool> Wheter the job was run
+        """
+
+        # single flight, a running job is never run twice at once
+        if not self._running.acquire(blocking=False):
+            return False
+
+        started = time.monotonic()
+        try:
+            self.target()
+        except Exception as exc:
+            self.failures += 1
+            print(f'maintenance job {self.name} failed')
+            print_tb(exc.__traceback__)
+            print(str(exc))
+        finally:
+            self.runs += 1
+            self.last_duration = time.monotonic() - started
+            self._running.release()
+        return True
+
+
+class Maintenance:
+    """
+    Runs the periodic jobs of the chains, like spreading, validating
+    neighbors and exchanging chains, at a worker thread, so requests
+    never wait for the network. Each job runs every interval, moved by a
+    random jitter, and never twice at once.
+
+    Usage:
+        >>> maintenance = Maintenance(context=app.app_context)
+        >>> maintenance.add('spread', 60, chain._do_spread)
+        >>> maintenance.start()
+        >>> maintenance.wake('spread')
+    """
+
+    def __init__(self,
+                context=None,
+                jitter=DEFAULT_JITTER,
+                clock=time.monotonic):
+        """
+        :param context: <callable> Context manager factory the jobs
+                        run within, like a Flask context
+        :param jitter: <float> Fraction of the interval randomly added
+                       or removed to each wait
+        :param clock: <callable> Current time in seconds
+        """
+
+        self.context = context
+        self.jitter = jitter
+        self.clock = clock
+        self.jobs = dict()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def add(self, name, interval, target):
+        """
+        Add a job, first run after its interval.
+
+        :param name: <str> Name of the job
+        :param interval: <int> Seconds between two runs
+        :param target: <callable> Function run by the job
+        """
+
+        job = Job(name, interval, target)
+        job.next_run = self.clock() + self._delay(interval)
+        self.jobs[name] = job
+        self._wakeup.set()
+        return job
+
+    def wake(self, name):
+        """
+        Run the job as soon as possible, like when a new block must be
+        shared.
+
+        :param name: <str> Name of the job
+        """
+
+        self.jobs[name].woken = True
+        self._wakeup.set()
+
+    def run_pending(self):
+        """
+        Run the jobs whose time has come.
+
+        :return: <list> Names of the jobs run
+        """
+
+        ran = []
+        for job in list(self.jobs.values()):
+            if not job.woken and job.next_run > self.clock():
+                continue
+
+            job.woken = False
+            if self.context is None:
+                ran_job = job.run()
+            else:
+                with self.context():
+                    ran_job = job.run()
+
+            job.next_run = self.clock() + self._delay(job.interval)
+            if ran_job:
+                ran.append(job.name)
+        return ran
+
+    def summary(self):
+        """
+        Get the runs, failures and duration of the last run per job.
+
+        :return: <dict>
+        """
+
+        return {
+            name: {
+                'runs': job.runs,
+                'failures': job.failures,
+                'last_duration': job.last_duration
+            }
+            for name, job in self.jobs.items()
+        }
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._wakeup.set()
+
+    def _delay(self, interval):
+        return max(0, interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.clear()
+            try:
+                self.run_pending()
+            except Exception as exc:
+                # like a failing context, try again at the next interval
+                print_tb(exc.__traceback__)
+                print(str(exc))
+
+            next_run = min((job.next_run for job in self.jobs.values()),
+                           default=None)
+            timeout = None if next_run is None else max(0, next_run - self.clock())
+            self._wakeup.wait(timeout)
@@ -0,0 +1,79 @@
+import os
+import json
+import hashlib
+import threading
+
+
+class AssetManifest:
+    """
+    Digests of the files a node serves, like its static assets and page
+    templates, plus a single digest of them all. Files are hashed once,
+    and again only when their inode, size or mtime change.
+
+    The manifest is served to anyone, so a node may report the digest of
+    another one. Digests are trusted as reported only to skip fetching
+    every asset, see NodePredicate.validate_all().
+
+    Usage:
+        >>> manifest = AssetManifest({'static': 'static/'})
+        >>> manifest.current()
+        {'digest': '1f2e...', 'assets': {...}}
+    """
+
+    def __init__(self, directories):
+        """
+        :param directories: <dict> Directories by the name prefixing their
+                            files at the manifest
+        """
+
+        self.directories = directories
+        self._files = dict()
+        self._manifest = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        """
+        Get the manifest, hashing again the files changed since the last
+        call.
+
+        :return: <dict> With the 'digest' and the 'assets' digests by path
+        """
+
+        with self._lock:
+            files = dict()
+            changed = False
+            for path, full_path in self._walk():
+                stat = os.stat(full_path)
+                state = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+                known = self._files.get(path)
+                if known is None or known[0] != state:
+                    known = (state, self._hash_file(full_path))
+                    changed = True
+                files[path] = known
+
+            if changed or files.keys() != self._files.keys() or \
+                    self._manifest is None:
+                self._files = files
+                self._manifest = self._build()
+            return self._manifest
+
+    def _build(self):
+        assets = {path: digest for path, (_, digest) in sorted(self._files.items())}
+        digest = hashlib.sha256(json.dumps(assets, sort_keys=True).encode()).hexdigest()
+        return {
+            'digest': digest,
+            'assets': assets
+        }
+
+    def _walk(self):
+        for name, directory in sorted(self.directories.items()):
+            for root, _, filenames in os.walk(directory):
+                for filename in filenames:
+                    full_path = os.path.join(root, filename)
+                    relative = os.path.relpath(full_path, directory)
+                    yield f'{name}/{relative}', full_path
+
+    @staticmethod
+    def _hash_file(path):
+        with open(path, 'rb') as reader:
+            return hashlib.sha256(reader.read()).hexdigest()
@@ -0,0 +1,165 @@
+import time
+import threading
+from collections import defaultdict
+from functools import partial
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# Maximum time for http connection
+DEFAULT_TIMEOUT = 10
+
+# Maximum connections kept alive to the same host
+DEFAULT_POOL_SIZE = 4
+
+DEFAULT_RETRIES = 2
+
+# Retries wait {backoff factor} * (2 ** {retry number}) seconds
+DEFAULT_BACKOFF = 0.2
+
+RETRY_STATUSES = (502, 503, 504)
+
+
+class RequestMetrics:
+    """
+    Counts the requests made to each host and how long they took.
+    """
+
+    def __init__(self):
+        self.requests = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.elapsed = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def record(self, host, elapsed, error=False):
+        """
+        Add a finished request.
+
+        :param host: <str> Host of the request
+        :param elapsed: <float> Seconds the request took
+        :param error: <bool> Wheter the request failed
+        """
+
+        with self._lock:
+            self.requests[host] += 1
+            self.elapsed[host] += elapsed
+            if error:
+                self.errors[host] += 1
+
+    def summary(self):
+        """
+        Get the requests count, errors count and mean latency per host.
+
+        :return: <dict>
+        """
+
+        with self._lock:
+            return {
+                host: {
+                    'requests': count,
+                    'errors': self.errors[host],
+                    'mean_latency': self.elapsed[host] / count
+                }
+                for host, count in self.requests.items()
+            }
+
+
+class SessionRegistry:
+    """
+    Keeps one session for each host, so connections to the same parent or
+    child are kept alive and reused instead of opening a new TCP and TLS
+    connection on every request. Idempotent requests are retried with
+    backoff, and the latency of every request is recorded at metrics.
+
+    Usage:
+        >>> registry = SessionRegistry()
+        >>> response = registry.get('http://127.0.0.1:5000/node')
+        >>> registry.metrics.summary()
+        {'127.0.0.1:5000': {'requests': 1, 'errors': 0, ...}}
+    """
+
+    def __init__(self,
+                pool_size=DEFAULT_POOL_SIZE,
+                retries=DEFAULT_RETRIES,
+                backoff=DEFAULT_BACKOFF,
+                timeout=DEFAULT_TIMEOUT):
+        self.pool_size = pool_size
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.metrics = RequestMetrics()
+        self._sessions = dict()
+        self._lock = threading.Lock()
+
+        self.get = partial(self.request, 'get')
+        self.post = partial(self.request, 'post')
+        self.put = partial(self.request, 'put')
+        self.delete = partial(self.request, 'delete')
+
+    def session(self, url):
+        """
+        Get the session of the url's host, creating it when needed.
+
+        :param url: <str> Any url of the host
+        :return: <requests.Session>
+        """
+
+        parsed = urlparse(url)
+        key = f'{parsed.scheme}://{parsed.netloc}'
+
+        with self._lock:
+            if key not in self._sessions:
+                self._sessions[key] = self._make_session(key)
+            return self._sessions[key]
+
+    def request(self, method, url, **kwargs):
+        """
+        Make a request with the session of the url's host.
+
+        :param method: <str> HTTP method
+        :param url: <str> Url to request
+        :return: <requests.Response>
+        """
+
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlparse(url).netloc
+        started = time.perf_counter()
+
+        try:
+            response = self.session(url).request(method, url, **kwargs)
+        except Exception:
+            self.metrics.record(host, time.perf_counter() - started, error=True)
+            raise
+
+        self.metrics.record(host, time.perf_counter() - started)
+        return response
+
+    def close(self):
+        """Close every session and its connections."""
+
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def _make_session(self, prefix):
+        retry = Retry(total=self.retries,
+                    backoff_factor=self.backoff,
+                    status_forcelist=RETRY_STATUSES,
+                    raise_on_status=False)
+
+        adapter = HTTPAdapter(pool_connections=1,
+                            pool_maxsize=self.pool_size,
+                            pool_block=True,
+                            max_retries=retry)
+
+        session = requests.Session()
+        session.mount(prefix, adapter)
+        return session
+
+
+# registry shared by every inter-node request
+registry = SessionRegistry()
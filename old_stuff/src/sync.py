@@ -0,0 +1,209 @@
+"""
+Delta synchronization of chains between a node and its parent.
+
+Instead of transferring the whole chain, the nodes first exchange the
+length and the hash of the last block. When the remote chain is longer,
+the common ancestor is found from a block locator: the hashes of our
+blocks at exponentially spaced positions from the tip. Only the blocks
+after the ancestor are then transferred, in pages or streamed.
+
+Streamed chains are either a chunked JSON document or NDJSON, one block
+per line, so neither side holds the whole serialized chain in memory.
+"""
+
+import json
+from itertools import islice
+
+# Maximum blocks transferred at each request
+DEFAULT_PAGE_SIZE = 100
+
+# Blocks serialized at each chunk of a streamed chain
+STREAM_BATCH = 64
+
+
+def summarize(chain, hasher):
+    """
+    Get the length of the chain and the hash of its last block.
+
+    :param chain: <list> A blockchain
+    :param hasher: <callable> Function hashing a block
+    :return: <dict>
+    """
+
+    return {
+        'length': len(chain),
+        'tip': hasher(chain[-1]) if chain else None
+    }
+
+
+def block_locator(chain, hasher):
+    """
+    Get the hashes of the blocks at the positions 1, 2, 4, 8... from the
+    tip, always including the first block.
+
+    :param chain: <list> A blockchain
+    :param hasher: <callable> Function hashing a block
+    :return: <list> Strings formatted as '{position}:{hash}'
+    """
+
+    locator = []
+    step = 1
+    position = len(chain) - 1
+    while position > 0:
+        locator.append(f'{position}:{hasher(chain[position])}')
+        position -= step
+        step *= 2
+
+    if chain:
+        locator.append(f'0:{hasher(chain[0])}')
+    return locator
+
+
+def locate(chain, locator, hasher):
+    """
+    Find the highest position of the locator where our chain has the
+    same block.
+
+    :param chain: <list> A blockchain
+    :param locator: <list> The block locator of another chain
+    :param hasher: <callable> Function hashing a block
+    :return: <int> The position, or -1 when no block is shared
+    """
+
+    for item in locator:
+        position, block_hash = item.split(':', 1)
+        position = int(position)
+        if 0 <= position < len(chain) and hasher(chain[position]) == block_hash:
+            return position
+    return -1
+
+
+def page(chain, from_index=0, limit=DEFAULT_PAGE_SIZE):
+    """
+    Get some blocks of the chain.
+
+    :param chain: <list> A blockchain
+    :param from_index: <int> Position of the first block
+    :param limit: <int> Maximum number of blocks
+    :return: <dict>
+    """
+
+    return {
+        'blocks': chain[from_index:from_index + limit],
+        'length': len(chain)
+    }
+
+
+def _stream_range(chain, from_index, limit):
+    # the end is fixed now, as blocks may be appended while streaming
+    end = len(chain) if limit is None else min(len(chain), from_index + limit)
+    return islice(chain, from_index, end)
+
+
+def iter_ndjson(chain, from_index=0, limit=None):
+    """
+    Serialize the blocks of the chain as NDJSON, in chunks.
+
+    :param chain: <list> A blockchain
+    :param from_index: <int> Position of the first block
+    :param limit: <int> Maximum number of blocks, or None until the end
+    :return: <generator> Chunks of text
+    """
+
+    lines = []
+    for block in _stream_range(chain, from_index, limit):
+        lines.append(json.dumps(block) + '\n')
+        if len(lines) >= STREAM_BATCH:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def iter_json_chain(chain, from_index=0, limit=None):
+    """
+    Serialize the blocks of the chain as the JSON document
+    {"chain": [...]}, in chunks.
+
+    :param chain: <list> A blockchain
+    :param from_index: <int> Position of the first block
+    :param limit: <int> Maximum number of blocks, or None until the end
+    :return: <generator> Chunks of text
+    """
+
+    yield '{"chain": ['
+    separator = ''
+    for chunk in iter_ndjson(chain, from_index, limit):
+        yield separator + ', '.join(chunk.splitlines())
+        separator = ', '
+    yield ']}'
+
+
+def read_ndjson(lines):
+    """
+    Parse the blocks of a NDJSON stream, one at a time.
+
+    :param lines: <iterable> Lines of the stream, as str or bytes
+    :return: <generator> Blocks
+    """
+
+    for line in lines:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_pages(fetch, from_index, length, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Fetch the remote blocks page by page, as they are consumed.
+
+    :param fetch: <callable> Function requesting the remote node
+    :param from_index: <int> Position of the first block
+    :param length: <int> Length of the remote chain
+    :param page_size: <int> Maximum blocks transferred at each request
+    :return: <generator> Blocks
+    """
+
+    while from_index < length:
+        params = {'from_index': from_index, 'limit': page_size}
+        data = fetch('blocks', 'get', params=params)
+        if not data or not data['blocks']:
+            break
+        yield from data['blocks']
+        from_index += len(data['blocks'])
+
+
+def sync_chain(blockchain, fetch, page_size=DEFAULT_PAGE_SIZE, stream=None):
+    """
+    Replace the blockchain chain with the remote one, transferring only
+    the blocks after the common ancestor.
+
+    The fetch function receives the endpoint name ('summary', 'locate' or
+    'blocks'), the HTTP method and the request arguments, returning the
+    JSON response or None when the request fails. When a stream function
+    is given, it receives the position of the first missing block and
+    returns the remote blocks from it, instead of fetching pages.
+
+    :param blockchain: <Blockchain> Local blockchain
+    :param fetch: <callable> Function requesting the remote node
+    :param page_size: <int> Maximum blocks transferred at each request
+    :param stream: <callable> Function streaming the remote blocks
+    :return: <bool> Wheter our chain was replaced
+    """
+
+    chain = blockchain.chain
+    summary = fetch('summary', 'get')
+    if not summary or summary['length'] <= len(chain):
+        return False
+
+    locator = block_locator(chain, blockchain.hash)
+    located = fetch('locate', 'post', data={'locator': locator})
+    if not located or located['position'] < 0:
+        return False
+
+    # blocks are validated as they arrive
+    position = located['position']
+    if stream is not None:
+        blocks = stream(position + 1)
+    else:
+        blocks = iter_pages(fetch, position + 1, summary['length'], page_size)
+    return blockchain.accept_suffix(position, blocks)
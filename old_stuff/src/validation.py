@@ -0,0 +1,185 @@
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from traceback import print_tb
+from urllib.parse import urlparse
+
+from .sessions import registry, DEFAULT_TIMEOUT
+
+
+# Maximum time for a whole validation round
+DEFAULT_DEADLINE = 30
+
+DEFAULT_MAX_WORKERS = 16
+
+# Maximum simultaneous requests to the same host
+DEFAULT_PER_HOST = 2
+
+
+def fetch_hash(url, timeout=DEFAULT_TIMEOUT):
+    """
+    Get the SHA-256 hash of the content at the url, or an empty string
+    when the request fails.
+
+    :param url: <str> Url to fetch
+    :param timeout: <int> Maximum time for the request
+    :return: <str>
+    """
+
+    try:
+        response = registry.get(url, timeout=timeout)
+        return hashlib.sha256(response.content).hexdigest()
+    except Exception as exc:
+        print_tb(exc.__traceback__)
+        print(str(exc))
+    return ''
+
+
+def fetch_manifest_digest(url, timeout=DEFAULT_TIMEOUT):
+    """
+    Get the digest of the asset manifest at the url, or an empty string
+    when the request fails.
+
+    :param url: <str> Url of the manifest
+    :param timeout: <int> Maximum time for the request
+    :return: <str>
+    """
+
+    try:
+        response = registry.get(url, timeout=timeout)
+        return response.json()['digest']
+    except Exception as exc:
+        print_tb(exc.__traceback__)
+        print(str(exc))
+    return ''
+
+
+class NeighborValidator:
+    """
+    Validate many nodes at once, fetching the assets of every node
+    concurrently. The requests to each host are limited, and the whole
+    round must finish before a deadline. A node is decided as soon as one
+    of its assets does not match the reference hashes, without waiting
+    for the others.
+
+    Usage:
+        >>> validator = NeighborValidator(asset_urls)
+        >>> for node, is_valid in validator.validate(reference, nodes):
+        ...     print(node, is_valid)
+    """
+
+    def __init__(self,
+                asset_urls,
+                fetch=fetch_hash,
+                max_workers=DEFAULT_MAX_WORKERS,
+                per_host=DEFAULT_PER_HOST,
+                deadline=DEFAULT_DEADLINE):
+        self.asset_urls = asset_urls
+        self.fetch = fetch
+        self.max_workers = max_workers
+        self.per_host = per_host
+        self.deadline = deadline
+        self._host_limits = dict()
+        self._lock = threading.Lock()
+
+    def reference_hashes(self, node):
+        """
+        Fetch the hashes of the node assets, concurrently.
+
+        :param node: <str> Node's url
+        :return: <list>
+        """
+
+        urls = self.asset_urls(node)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self._fetch_limited, urls))
+
+    def validate(self, reference, nodes, until=None):
+        """
+        Compare the assets of each node with the reference hashes, yielding
+        the result of each node as soon as it is known. Nodes not decided
+        until the deadline are invalid.
+
+        :param reference: <list> Hashes of the assets, in order
+        :param nodes: <list> Nodes' urls
+        :param until: <float> Monotonic time the round must end by, shared
+                      by many rounds, by default the validator deadline
+                      after starting
+        :return: <generator> Pairs of (node, is_valid)
+        """
+
+        if until is None:
+            until = time.monotonic() + self.deadline
+        decided = set()
+        mismatched = set()
+        remaining = dict()
+        futures = dict()
+
+        # the urls are built here, as it may need the caller context
+        jobs = [(node, list(zip(self.asset_urls(node), reference)))
+                for node in nodes]
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for node, assets in jobs:
+                remaining[node] = len(assets)
+                for url, expected in assets:
+                    future = executor.submit(self._check, mismatched, node, url, expected)
+                    futures[future] = node
+
+            for node in [node for node, count in remaining.items() if not count]:
+                decided.add(node)
+                yield node, True
+
+            timeout = until - time.monotonic()
+            for future in as_completed(futures, timeout=max(timeout, 0)):
+                node = futures[future]
+                if node in decided:
+                    continue
+
+                remaining[node] -= 1
+                if not future.result():
+                    decided.add(node)
+                    self._cancel(futures, node)
+                    yield node, False
+                elif not remaining[node]:
+                    decided.add(node)
+                    yield node, True
+        except TimeoutError:
+            for node in remaining:
+                if node not in decided:
+                    decided.add(node)
+                    yield node, False
+        finally:
+            # do not wait for requests after the deadline
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def _check(self, mismatched, node, url, expected):
+        if node in mismatched:
+            # another asset of the node already mismatched
+            return False
+
+        matches = self._fetch_limited(url) == expected
+        if not matches:
+            mismatched.add(node)
+        return matches
+
+    def _fetch_limited(self, url):
+        with self._host_limit(url):
+            return self.fetch(url)
+
+    def _host_limit(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_limits[host]
+
+    @staticmethod
+    def _cancel(futures, node):
+        for future, future_node in futures.items():
+            if future_node == node:
+                future.cancel()
@@ -0,0 +1,94 @@
+import ipaddress
+
+from lib.addresses import Resolver, AddressIndex, NodeAddresses
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100
+
+    def __call__(self):
+        return self.now
+
+
+class FakeDNS:
+    def __init__(self, records):
+        self.records = records
+        self.calls = []
+
+    def __call__(self, hostname):
+        self.calls.append(hostname)
+        if hostname not in self.records:
+            raise OSError('unknown host')
+        return self.records[hostname]
+
+
+def test_resolved_hostnames_are_kept_until_expired():
+    clock = Clock()
+    dns = FakeDNS({'node.com': ('10.0.0.1',)})
+    resolver = Resolver(ttl=10, resolve=dns, clock=clock)
+    assert resolver.resolve('node.com') == ('10.0.0.1',)
+    assert resolver.resolve('node.com') == ('10.0.0.1',)
+    assert dns.calls == ['node.com']
+
+    clock.now = 110
+    resolver.resolve('node.com')
+    assert dns.calls == ['node.com', 'node.com']
+
+
+def test_failed_resolutions_are_kept():
+    clock = Clock()
+    dns = FakeDNS({})
+    resolver = Resolver(negative_ttl=5, resolve=dns, clock=clock)
+    assert resolver.resolve('missing.com') == ()
+    assert resolver.resolve('missing.com') == ()
+    assert len(dns.calls) == 1
+
+    clock.now = 105
+    resolver.resolve('missing.com')
+    assert len(dns.calls) == 2
+
+
+def test_index_finds_addresses_and_networks():
+    index = AddressIndex([('10.0.0.0/8', 'a'),
+                          ('192.168.1.7', 'b'),
+                          ('fd00::/8', 'c')])
+    assert index.find('10.200.0.1') == 'a'
+    assert index.find('192.168.1.7') == 'b'
+    assert index.find('fd00::1') == 'c'
+    assert index.find('192.168.1.8') is None
+    assert index.find('11.0.0.0') is None
+    assert index.find('not an address') is None
+
+
+def test_index_finds_most_specific_network():
+    index = AddressIndex([('10.0.0.0/8', 'wide'),
+                          ('10.1.0.0/16', 'narrow'),
+                          ('10.1.2.3', 'single'),
+                          ('10.2.0.0/16', 'other')])
+    assert index.find('10.0.0.1') == 'wide'
+    assert index.find('10.1.9.9') == 'narrow'
+    assert index.find('10.1.2.3') == 'single'
+    assert index.find('10.1.2.4') == 'narrow'
+    assert index.find('10.2.0.1') == 'other'
+    assert index.find('10.3.0.1') == 'wide'
+    assert index.find('10.255.255.255') == 'wide'
+
+
+def test_node_addresses_index_resolved_hosts():
+    dns = FakeDNS({'node.com': ('10.0.0.1', '10.0.0.2')})
+    hosts = ['http://node.com:5000', 'http://192.168.1.7:5000', 'http://gone.com']
+    addresses = NodeAddresses(lambda: hosts,
+                              resolver=Resolver(resolve=dns),
+                              allowed=[ipaddress.ip_network('127.0.0.0/8')])
+    assert addresses.find('127.0.0.1')
+    assert addresses.find('10.0.0.1') is None
+
+    addresses.refresh()
+    assert addresses.find('10.0.0.2') == 'http://node.com:5000'
+    assert addresses.find('192.168.1.7') == 'http://192.168.1.7:5000'
+    assert addresses.find('127.0.0.1')
+
+    # lookups never resolve
+    addresses.find('10.9.9.9')
+    assert sorted(dns.calls) == ['gone.com', 'node.com']
@@ -0,0 +1,95 @@
+import copy
+
+from lib.auth import VerifiedTokens, TokenStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100
+
+    def __call__(self):
+        return self.now
+
+
+def test_verified_token_is_found_for_its_node():
+    verified = VerifiedTokens()
+    verified.add('token', 'node', expires_at=float('inf'))
+    assert verified.get('token', 'node')
+    assert not verified.get('token', 'other node')
+    assert not verified.get('other token', 'node')
+
+
+def test_verified_token_is_forgotten_when_expired():
+    clock = Clock()
+    verified = VerifiedTokens(clock=clock)
+    verified.add('token', 'node', expires_at=110)
+    assert verified.get('token', 'node')
+    clock.now = 110
+    assert not verified.get('token', 'node')
+    assert len(verified) == 0
+
+
+def test_full_cache_drops_expired_tokens_first():
+    clock = Clock()
+    verified = VerifiedTokens(max_size=2, clock=clock)
+    verified.add('live', 'node', expires_at=200)
+    verified.add('expired', 'node', expires_at=150)
+    clock.now = 160
+    verified.add('new', 'node', expires_at=200)
+    assert verified.get('live', 'node')
+    assert verified.get('new', 'node')
+
+
+def test_full_cache_drops_oldest_token():
+    verified = VerifiedTokens(max_size=2)
+    for token in ('first', 'second', 'third'):
+        verified.add(token, 'node', expires_at=float('inf'))
+    assert not verified.get('first', 'node')
+    assert verified.get('third', 'node')
+    assert len(verified) == 2
+
+
+def test_expired_token_is_not_found_before_removed():
+    clock = Clock()
+    tokens = TokenStore(clock=clock)
+    tokens.add('token', expires_at=110)
+    assert 'token' in tokens
+    clock.now = 110
+    assert 'token' not in tokens
+    assert len(tokens) == 1
+
+
+def test_expire_removes_only_expired_tokens():
+    clock = Clock()
+    tokens = TokenStore(clock=clock)
+    tokens.add('late', expires_at=300)
+    tokens.add('early', expires_at=150)
+    tokens.add('never')
+    assert tokens.expire(now=200) == ['early']
+    assert set(tokens) == {'late', 'never'}
+    assert tokens.summary() == {'count': 2, 'added': 3, 'evicted': 1}
+
+
+def test_discarded_or_renewed_tokens_are_not_expired_twice():
+    tokens = TokenStore(clock=Clock())
+    tokens.add('discarded', expires_at=150)
+    tokens.discard('discarded')
+    tokens.add('renewed', expires_at=150)
+    tokens.add('renewed', expires_at=300)
+    assert tokens.expire(now=200) == []
+    assert 'renewed' in tokens
+    assert tokens.summary()['evicted'] == 0
+
+
+def test_only_live_tokens_are_stored():
+    clock = Clock()
+    tokens = TokenStore({'live': 200, 'expired': 50, 'never': None},
+                        clock=clock)
+    assert tokens.to_dict() == {'live': 200, 'never': None}
+    assert copy.deepcopy(tokens).to_dict() == tokens.to_dict()
+
+
+def test_tokens_stored_as_a_list_never_expire():
+    tokens = TokenStore(['token'])
+    assert tokens.expire(now=float('inf')) == []
+    assert 'token' in tokens
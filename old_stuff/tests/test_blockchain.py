@@ -1,5 +1,6 @@
 import pytest
-from blueprints.landing import get_node_chain
+from lib.node import Node
+from blueprints.landing import get_node_chain, get_mail_chain
 from .util import mock_proof
 
 
@@ -46,3 +47,46 @@ def test_exchange_chains(reg_get_clients):
         }
 
 
+def test_email_index(reg_client):
+    mail_chain = get_mail_chain()
+
+    mail_chain.new_transaction('foo@bar.com')
+    mail_chain.new_block(123, None)
+    assert mail_chain.email_exists('foo@bar.com')
+    assert not mail_chain.email_exists('bar@foo.com')
+
+    # incrementally updated
+    mail_chain.new_transaction('bar@foo.com')
+    mail_chain.new_block(123, None)
+    assert mail_chain.email_exists('bar@foo.com')
+
+    # lazily rebuilt after the chain is replaced
+    mail_chain.chain = mail_chain.chain[:2]
+    assert not mail_chain.email_exists('bar@foo.com')
+    assert mail_chain.email_exists('foo@bar.com')
+    assert mail_chain.key_index == {'foo@bar.com'}
+
+
+def test_node_index(reg_client):
+    node_chain = get_node_chain()
+    node = Node('1.2.3.4')
+
+    assert not node_chain.node_exists(node)
+    node_chain.new_transaction(node)
+    node_chain.new_block(123, None)
+    assert node_chain.node_exists(node)
+
+
+def test_key_filter(reg_client):
+    mail_chain = get_mail_chain()
+    key_filter = mail_chain.key_filter()
+    assert 'foo@bar.com' not in key_filter
+
+    # incrementally updated
+    mail_chain.new_transaction('foo@bar.com')
+    mail_chain.new_block(123, None)
+    assert mail_chain.key_filter() is key_filter
+    assert 'foo@bar.com' in key_filter
+
+    res = reg_client.get('/mail/chain/filter')
+    assert res.status_code == 401
@@ -0,0 +1,46 @@
+import json
+
+import pytest
+from lib.bloom import BloomFilter
+
+
+def test_added_keys_are_found():
+    keys = BloomFilter(capacity=1000)
+    emails = [f'user{index}@mail.com' for index in range(1000)]
+    keys.update(emails)
+
+    assert len(keys) == 1000
+    assert all(email in keys for email in emails)
+
+
+@pytest.mark.parametrize('error_rate', [0.1, 0.01, 0.001])
+def test_false_positive_rate(error_rate):
+    keys = BloomFilter(capacity=5000, error_rate=error_rate)
+    keys.update(f'user{index}@mail.com' for index in range(5000))
+
+    missing = [f'missing{index}@mail.com' for index in range(20000)]
+    false_positives = sum(email in keys for email in missing)
+
+    assert false_positives / len(missing) < error_rate * 2
+    assert keys.estimated_error_rate == pytest.approx(error_rate, rel=0.2)
+
+
+def test_memory_follows_error_rate():
+    loose = BloomFilter(capacity=10000, error_rate=0.1)
+    strict = BloomFilter(capacity=10000, error_rate=0.001)
+
+    assert loose.memory < strict.memory
+    assert strict.memory < 10000 * 2
+
+
+def test_round_trip():
+    keys = BloomFilter(capacity=100)
+    keys.update(['foo@bar.com', 'bar@foo.com'])
+
+    data = json.loads(json.dumps(keys.to_dict()))
+    received = BloomFilter.from_dict(data)
+
+    assert 'foo@bar.com' in received
+    assert 'bar@foo.com' in received
+    assert len(received) == 2
+    assert received.bits == keys.bits
@@ -0,0 +1,106 @@
+import time
+from unittest.mock import Mock
+
+from flask import current_app
+from lib.broadcast import Broadcaster
+from lib import blockchain
+from blueprints.landing import get_node_chain
+
+
+def fake_request(statuses):
+    def request(method, url, **kwargs):
+        status = statuses[url]
+        if isinstance(status, Exception):
+            raise status
+        if isinstance(status, float):
+            time.sleep(status)
+            status = 201
+        return Mock(status_code=status)
+    return request
+
+
+def test_broadcast_returns_a_result_for_each_node():
+    request = fake_request({
+        'http://1.2.3.4/node': 201,
+        'http://4.3.2.1/node': 500,
+        'http://7.4.3.1/node': ConnectionError('refused'),
+    })
+    broadcaster = Broadcaster(request=request)
+
+    nodes = ['http://1.2.3.4', 'http://4.3.2.1', 'http://7.4.3.1']
+    results = broadcaster.broadcast(nodes, 'post', '/node')
+
+    assert [result.node for result in results] == nodes
+    assert [result.ok for result in results] == [True, False, False]
+    assert results[1].status == 500
+    assert results[2].error == 'refused'
+    assert all(result.latency is not None for result in results)
+
+
+def test_broadcast_sends_to_nodes_concurrently():
+    request = fake_request({f'http://1.2.3.{i}/node': 0.5 for i in range(4)})
+    broadcaster = Broadcaster(request=request, concurrency=4)
+
+    started = time.monotonic()
+    results = broadcaster.broadcast([f'http://1.2.3.{i}' for i in range(4)], 'post', '/node')
+
+    assert time.monotonic() - started < 1
+    assert all(result.ok for result in results)
+
+
+def test_deliveries_not_finished_before_timeout_fail():
+    request = fake_request({'http://1.2.3.4/node': 2.0, 'http://4.3.2.1/node': 201})
+    broadcaster = Broadcaster(request=request, timeout=0.5)
+
+    results = broadcaster.broadcast(['http://1.2.3.4', 'http://4.3.2.1'], 'post', '/node')
+    assert results[0].error == 'timeout'
+    assert results[1].ok
+
+
+def test_failed_deliveries_are_retried():
+    statuses = {'http://1.2.3.4/node': 503, 'http://4.3.2.1/node': 201}
+    broadcaster = Broadcaster(request=fake_request(statuses), max_attempts=2)
+
+    broadcaster.broadcast(['http://1.2.3.4', 'http://4.3.2.1'], 'post', '/node', retry=True)
+    assert [delivery.node for delivery in broadcaster.retry_queue] == ['http://1.2.3.4']
+
+    statuses['http://1.2.3.4/node'] = 201
+    results = broadcaster.retry_failed()
+    assert [result.ok for result in results] == [True]
+    assert broadcaster.retry_queue == []
+
+
+def test_deliveries_are_dropped_after_max_attempts():
+    request = fake_request({'http://1.2.3.4/node': 503})
+    broadcaster = Broadcaster(request=request, max_attempts=2)
+
+    broadcaster.broadcast(['http://1.2.3.4'], 'post', '/node', retry=True)
+    broadcaster.retry_failed()
+    assert broadcaster.retry_queue == []
+
+
+def test_send_to_nodes_delivers_to_the_node_endpoint(reg_client, monkeypatch):
+    node_chain = get_node_chain()
+    monkeypatch.setattr(node_chain, 'access_token', 'foo')
+    deliver = fake_request({
+        'http://1.2.3.4/node': 201,
+        'http://4.3.2.1/node': 500,
+    })
+
+    def request(method, url, headers=None, **kwargs):
+        # the node endpoint only accepts authenticated nodes
+        if headers != node_chain.auth_headers():
+            return Mock(status_code=401)
+        return deliver(method, url, **kwargs)
+
+    monkeypatch.setattr(blockchain, 'broadcaster', Broadcaster(request=request))
+
+    with current_app.test_request_context():
+        results = node_chain.send_to_nodes(['http://7.4.3.1'],
+                                           ['http://1.2.3.4', 'http://4.3.2.1'],
+                                           method='delete')
+
+    assert [result.node for result in results] == ['http://1.2.3.4', 'http://4.3.2.1']
+    assert [result.ok for result in results] == [True, False]
+    assert 200 <= results[0].status < 300
+    assert results[1].status == 500
@@ -0,0 +1,179 @@
+import os
+import json
+import threading
+
+import pytest
+
+from lib.cache import ChainCache, WriteBehind
+
+
+class FakeChain:
+    def __init__(self, blocks):
+        self.blocks = blocks
+        self.generation = 0
+
+    def modified(self):
+        self.generation += 1
+
+
+class FakeStorage:
+    def __init__(self, path):
+        self.path = path
+        self.current = None
+        self.loads = 0
+        self.saves = 0
+
+    def load(self):
+        with open(self.path) as reader:
+            self.current = FakeChain(json.load(reader))
+        self.loads += 1
+
+    def save(self, chain):
+        with open(self.path, 'w') as writer:
+            json.dump(chain.blocks, writer)
+        self.current = chain
+        self.saves += 1
+
+
+@pytest.fixture(autouse=True)
+def remove_lock_file(temp_file):
+    yield
+    if os.path.exists(f'{temp_file}.lock'):
+        os.unlink(f'{temp_file}.lock')
+
+
+def make_cache(temp_file, flush_interval=0):
+    storage = FakeStorage(temp_file)
+    storage.save(FakeChain([1]))
+    return ChainCache(storage, flush_interval)
+
+
+def test_reads_are_not_loaded_nor_written(temp_file):
+    cache = make_cache(temp_file)
+
+    for _ in range(10):
+        cache.get()
+        assert not cache.flush()
+
+    assert cache.storage.loads == 0
+    assert cache.storage.saves == 1
+
+
+def test_writes_only_modified_chain(temp_file):
+    cache = make_cache(temp_file)
+    chain = cache.get()
+    chain.blocks.append(2)
+    chain.modified()
+
+    assert cache.dirty
+    assert cache.flush()
+    assert not cache.dirty
+    assert not cache.flush()
+    with open(temp_file) as reader:
+        assert json.load(reader) == [1, 2]
+
+
+def test_writes_are_coalesced(temp_file):
+    cache = make_cache(temp_file, flush_interval=60)
+    chain = cache.get()
+
+    for block in range(10):
+        chain.blocks.append(block)
+        chain.modified()
+        assert not cache.flush()
+
+    assert cache.flush(force=True, sync=True)
+    assert cache.storage.saves == 2
+
+
+def test_reloads_chain_changed_by_another_process(temp_file):
+    cache = make_cache(temp_file)
+    other = make_cache(temp_file)
+
+    chain = other.get()
+    chain.blocks.append(2)
+    chain.modified()
+    other.flush()
+    # make sure the mtime changes on coarse filesystems
+    os.utime(temp_file, ns=(0, 0))
+
+    assert cache.get().blocks == [1, 2]
+    assert cache.storage.loads == 1
+    assert not cache.dirty
+
+
+def test_transactions_of_two_processes_keep_both_changes(temp_file):
+    cache = make_cache(temp_file)
+    other = make_cache(temp_file)
+    cache.get()
+    other.get()
+
+    with cache.transaction() as chain:
+        chain.blocks.append(2)
+        chain.modified()
+    os.utime(temp_file, ns=(0, 0))
+
+    with other.transaction() as chain:
+        chain.blocks.append(3)
+        chain.modified()
+    os.utime(temp_file, ns=(0, 0))
+
+    with open(temp_file) as reader:
+        assert json.load(reader) == [1, 2, 3]
+    assert cache.get().blocks == [1, 2, 3]
+    assert not cache.dirty and not other.dirty
+
+
+def test_concurrent_transactions_are_serialized(temp_file):
+    caches = [make_cache(temp_file), make_cache(temp_file)]
+
+    def append(cache, first):
+        for block in range(first, first + 20):
+            with cache.transaction() as chain:
+                chain.blocks.append(block)
+                chain.modified()
+
+    threads = [threading.Thread(target=append, args=(cache, number * 100))
+               for number, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with open(temp_file) as reader:
+        assert sorted(json.load(reader)) == sorted([1, *range(20), *range(100, 120)])
+
+
+def test_changes_out_of_transactions_never_overwrite_another_process(temp_file):
+    cache = make_cache(temp_file)
+    other = make_cache(temp_file)
+
+    ours = cache.get()
+    ours.blocks.append(3)
+    ours.modified()
+
+    with other.transaction() as theirs:
+        theirs.blocks.append(2)
+        theirs.modified()
+    os.utime(temp_file, ns=(0, 0))
+
+    assert not cache.flush(force=True)
+    with open(temp_file) as reader:
+        assert json.load(reader) == [1, 2]
+    assert cache.get().blocks == [1, 2]
+    assert not cache.dirty
+
+
+def test_write_behind_flushes_on_stop(temp_file):
+    cache = make_cache(temp_file, flush_interval=60)
+    writer = WriteBehind([cache], interval=60)
+    writer.start()
+
+    chain = cache.get()
+    chain.blocks.append(2)
+    chain.modified()
+    writer.stop()
+
+    assert not cache.dirty
+    with open(temp_file) as reader:
+        assert json.load(reader) == [1, 2]
@@ -0,0 +1,147 @@
+import os
+import json
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import pytest
+from lib.journal import JournalStorage
+
+
+@dataclass
+class FakeChain:
+    chain: List = field(default_factory=list)
+    tokens: List = field(default_factory=list)
+    expirations: Dict = field(default_factory=dict)
+
+
+def factory(data):
+    return FakeChain(**data)
+
+
+def block(index, fork=''):
+    return {'index': index, 'fork': fork}
+
+
+@pytest.fixture
+def storage_path(temp_file):
+    yield temp_file
+    for suffix in ('.journal', '.tmp'):
+        if os.path.exists(f'{temp_file}{suffix}'):
+            os.unlink(f'{temp_file}{suffix}')
+
+
+def read_journal(path):
+    with open(f'{path}.journal') as reader:
+        return [json.loads(line) for line in reader]
+
+
+def test_save_appends_only_changes(storage_path):
+    storage = JournalStorage(storage_path, input_factory=factory)
+    blocks = FakeChain([block(1)])
+    storage.save(blocks)
+    assert read_journal(storage_path) == []
+
+    blocks.chain.append(block(2))
+    storage.save(blocks)
+    blocks.tokens.append('foo')
+    storage.save(blocks)
+    storage.save(blocks)
+
+    assert read_journal(storage_path) == [
+        {'op': 'blocks', 'from': 1, 'blocks': [block(2)]},
+        {'op': 'extend', 'field': 'tokens', 'items': ['foo']},
+    ]
+
+
+def test_save_appends_only_changed_keys(storage_path):
+    storage = JournalStorage(storage_path, input_factory=factory)
+    blocks = FakeChain(expirations={f'token{index}': index for index in range(100)})
+    storage.save(blocks)
+
+    blocks.expirations['foo'] = 1
+    del blocks.expirations['token0']
+    blocks.tokens = ['bar']
+    storage.save(blocks)
+    blocks.tokens.remove('bar')
+    storage.save(blocks)
+
+    assert read_journal(storage_path) == [
+        {'op': 'extend', 'field': 'tokens', 'items': ['bar']},
+        {'op': 'update', 'field': 'expirations', 'set': {'foo': 1}, 'del': ['token0']},
+        {'op': 'set', 'field': 'tokens', 'value': []},
+    ]
+    assert JournalStorage(storage_path, input_factory=factory).current == blocks
+
+
+def test_load_replays_whole_states(storage_path):
+    storage = JournalStorage(storage_path, input_factory=factory)
+    blocks = FakeChain([block(1)])
+    storage.save(blocks)
+
+    with open(f'{storage_path}.journal', 'a') as writer:
+        writer.write(json.dumps({'op': 'state', 'state': {'tokens': ['foo']}}) + '\n')
+
+    loaded = JournalStorage(storage_path, input_factory=factory).current
+    assert loaded == FakeChain([block(1)], ['foo'])
+
+
+def test_load_replays_journal(storage_path):
+    storage = JournalStorage(storage_path, input_factory=factory)
+    blocks = FakeChain([block(1)])
+    storage.save(blocks)
+    for index in range(2, 10):
+        blocks.chain.append(block(index))
+        storage.save(blocks)
+    blocks.tokens.append('foo')
+    storage.save(blocks)
+
+    loaded = JournalStorage(storage_path, input_factory=factory).current
+    assert loaded == blocks
+
+
+def test_replaced_chain_keeps_shared_blocks(storage_path):
+    storage = JournalStorage(storage_path, input_factory=factory)
+    blocks = FakeChain([block(index) for index in range(10)])
+    storage.save(blocks)
+
+    blocks.chain = blocks.chain[:6] + [block(index, 'b') for index in range(6, 12)]
+    storage.save(blocks)
+
+    assert read_journal(storage_path)[0]['from'] == 6
+    assert JournalStorage(storage_path, input_factory=factory).current == blocks
+
+
+def test_compaction(storage_path):
+    storage = JournalStorage(storage_path, input_factory=factory, compact_every=5)
+    blocks = FakeChain([block(0)])
+    storage.save(blocks)
+    for index in range(1, 8):
+        blocks.chain.append(block(index))
+        storage.save(blocks)
+
+    assert len(read_journal(storage_path)) == 2
+    assert not os.path.exists(f'{storage_path}.tmp')
+
+    with open(storage_path) as reader:
+        assert len(json.load(reader)['chain']) == 6
+    assert JournalStorage(storage_path, input_factory=factory).current == blocks
+
+
+def test_torn_journal_is_dropped(storage_path):
+    storage = JournalStorage(storage_path, input_factory=factory)
+    blocks = FakeChain([block(1)])
+    storage.save(blocks)
+    blocks.chain.append(block(2))
+    storage.save(blocks)
+
+    with open(f'{storage_path}.journal', 'a') as writer:
+        writer.write('{"op": "blocks", "from": 2, "blo')
+
+    loaded = JournalStorage(storage_path, input_factory=factory)
+    assert loaded.current == blocks
+    assert len(read_journal(storage_path)) == 1
+
+    # new changes are appended after the dropped record
+    loaded.current.chain.append(block(3))
+    loaded.save(loaded.current)
+    assert len(JournalStorage(storage_path, input_factory=factory).current.chain) == 3
@@ -0,0 +1,89 @@
+import threading
+
+from lib.maintenance import Maintenance
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100
+
+    def __call__(self):
+        return self.now
+
+
+def test_jobs_run_every_interval():
+    clock = Clock()
+    calls = []
+    maintenance = Maintenance(jitter=0, clock=clock)
+    maintenance.add('spread', 10, lambda: calls.append('spread'))
+    maintenance.add('validation', 30, lambda: calls.append('validation'))
+
+    assert maintenance.run_pending() == []
+    clock.now = 110
+    assert maintenance.run_pending() == ['spread']
+    clock.now = 130
+    assert maintenance.run_pending() == ['spread', 'validation']
+    assert calls == ['spread', 'spread', 'validation']
+
+
+def test_jitter_moves_the_next_run():
+    clock = Clock()
+    maintenance = Maintenance(jitter=0.5, clock=clock)
+    runs = {maintenance.add(f'job{index}', 10, lambda: None).next_run
+            for index in range(20)}
+    assert all(105 <= run <= 115 for run in runs)
+    assert len(runs) > 1
+
+
+def test_woken_job_runs_before_its_interval():
+    clock = Clock()
+    maintenance = Maintenance(jitter=0, clock=clock)
+    maintenance.add('exchange', 30, lambda: None)
+    maintenance.wake('exchange')
+    assert maintenance.run_pending() == ['exchange']
+    assert maintenance.run_pending() == []
+
+
+def test_running_job_is_not_run_again():
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_job():
+        started.set()
+        release.wait(5)
+
+    maintenance = Maintenance(jitter=0)
+    job = maintenance.add('exchange', 0, slow_job)
+    worker = threading.Thread(target=job.run)
+    worker.start()
+    started.wait(5)
+
+    assert maintenance.run_pending() == []
+    release.set()
+    worker.join()
+    assert job.runs == 1
+
+
+def test_failing_job_is_counted_and_run_again():
+    def failing_job():
+        raise ValueError('unreachable parent')
+
+    maintenance = Maintenance(jitter=0)
+    maintenance.add('exchange', 0, failing_job)
+    maintenance.run_pending()
+    maintenance.run_pending()
+    summary = maintenance.summary()['exchange']
+    assert summary['runs'] == 2
+    assert summary['failures'] == 2
+
+
+def test_worker_runs_woken_jobs():
+    done = threading.Event()
+    maintenance = Maintenance()
+    maintenance.add('exchange', 60, done.set)
+    maintenance.start()
+    try:
+        maintenance.wake('exchange')
+        assert done.wait(5)
+    finally:
+        maintenance.stop()
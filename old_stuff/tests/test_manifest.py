@@ -0,0 +1,67 @@
+import os
+import hashlib
+
+import pytest
+from lib.manifest import AssetManifest
+
+
+@pytest.fixture
+def assets(tmp_path):
+    static = tmp_path / 'static'
+    (static / 'js').mkdir(parents=True)
+    (static / 'js' / 'miner.js').write_bytes(b'miner')
+    (static / 'js' / 'core.js').write_bytes(b'core')
+    return static
+
+
+def test_manifest_has_asset_digests(assets):
+    manifest = AssetManifest({'static': str(assets)}).current()
+
+    assert manifest['assets'] == {
+        'static/js/core.js': hashlib.sha256(b'core').hexdigest(),
+        'static/js/miner.js': hashlib.sha256(b'miner').hexdigest(),
+    }
+
+
+def test_same_files_give_same_digest(assets, tmp_path):
+    copy = tmp_path / 'copy'
+    (copy / 'js').mkdir(parents=True)
+    (copy / 'js' / 'miner.js').write_bytes(b'miner')
+    (copy / 'js' / 'core.js').write_bytes(b'core')
+
+    first = AssetManifest({'static': str(assets)}).current()
+    second = AssetManifest({'static': str(copy)}).current()
+    assert first['digest'] == second['digest']
+
+
+def test_files_are_hashed_again_only_when_changed(assets, monkeypatch):
+    manifest = AssetManifest({'static': str(assets)})
+    first = manifest.current()
+
+    hashed = []
+    original = AssetManifest._hash_file
+    monkeypatch.setattr(AssetManifest, '_hash_file',
+                        staticmethod(lambda path: hashed.append(path) or original(path)))
+
+    assert manifest.current() is first
+    assert hashed == []
+
+    miner = assets / 'js' / 'miner.js'
+    miner.write_bytes(b'changed miner')
+    os.utime(miner, ns=(0, 0))
+    changed = manifest.current()
+
+    assert hashed == [str(miner)]
+    assert changed['digest'] != first['digest']
+
+
+def test_added_and_removed_files_change_digest(assets):
+    manifest = AssetManifest({'static': str(assets)})
+    first = manifest.current()['digest']
+
+    (assets / 'js' / 'sha256.js').write_bytes(b'sha256')
+    added = manifest.current()['digest']
+    assert added != first
+
+    (assets / 'js' / 'sha256.js').unlink()
+    assert manifest.current()['digest'] == first
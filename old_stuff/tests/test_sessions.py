@@ -0,0 +1,72 @@
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+from lib.sessions import SessionRegistry
+
+
+@pytest.fixture
+def server():
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            self.server.clients.append(self.client_address)
+            status = self.server.statuses.pop(0) if self.server.statuses else 200
+            self.send_response(status)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'ok')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.clients = []
+    server.statuses = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def server_url(server):
+    return f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def test_requests_to_the_same_host_reuse_the_connection(server):
+    registry = SessionRegistry()
+    for _ in range(3):
+        assert registry.get(f'{server_url(server)}/node').status_code == 200
+
+    assert len(set(server.clients)) == 1
+
+
+def test_same_host_shares_the_session(server):
+    registry = SessionRegistry()
+    url = server_url(server)
+    assert registry.session(f'{url}/node') is registry.session(f'{url}/chain')
+    assert registry.session(url) is not registry.session('http://127.0.0.1:1')
+
+
+def test_unavailable_responses_are_retried(server):
+    server.statuses = [503]
+    registry = SessionRegistry(backoff=0)
+
+    assert registry.get(server_url(server)).status_code == 200
+    assert len(server.clients) == 2
+
+
+def test_requests_are_recorded_at_metrics(server):
+    registry = SessionRegistry(retries=0)
+    registry.get(server_url(server))
+
+    with pytest.raises(Exception):
+        registry.get('http://127.0.0.1:1')
+
+    summary = registry.metrics.summary()
+    assert summary[f'127.0.0.1:{server.server_address[1]}']['requests'] == 1
+    assert summary['127.0.0.1:1']['errors'] == 1
@@ -0,0 +1,150 @@
+import json
+import hashlib
+
+from lib.sync import (summarize, block_locator, locate, page, sync_chain,
+                      iter_ndjson, iter_json_chain, read_ndjson)
+
+
+def hash_block(block):
+    return hashlib.sha256(json.dumps(block, sort_keys=True).encode()).hexdigest()
+
+
+def make_chain(length, fork=None, fork_at=10):
+    return [{'index': index + 1, 'fork': fork if index >= fork_at else None}
+            for index in range(length)]
+
+
+class FakeBlockchain:
+    hash = staticmethod(hash_block)
+
+    def __init__(self, chain):
+        self.chain = chain
+        self.accepted = None
+
+    def accept_suffix(self, position, blocks):
+        blocks = list(blocks)
+        self.accepted = (position, blocks)
+        self.chain = self.chain[:position + 1] + blocks
+        return True
+
+
+def make_fetch(remote_chain, page_size):
+    requests = []
+
+    def fetch(endpoint, method, data=None, params=None):
+        requests.append(endpoint)
+        if endpoint == 'summary':
+            return summarize(remote_chain, hash_block)
+        if endpoint == 'locate':
+            return {'position': locate(remote_chain, data['locator'], hash_block)}
+        limit = min(params['limit'], page_size)
+        return page(remote_chain, params['from_index'], limit)
+    return fetch, requests
+
+
+def test_block_locator_is_logarithmic():
+    chain = make_chain(1000)
+    locator = block_locator(chain, hash_block)
+
+    positions = [int(item.split(':')[0]) for item in locator]
+    assert positions[:4] == [999, 998, 996, 992]
+    assert positions[-1] == 0
+    assert len(locator) <= 12
+
+
+def test_locate_finds_fork_point():
+    local = make_chain(50, fork='a', fork_at=45)
+    remote = make_chain(80, fork='b', fork_at=45)
+
+    # the closest locator entry before the fork
+    position = locate(remote, block_locator(local, hash_block), hash_block)
+    assert position == 42
+
+
+def test_locate_without_shared_blocks():
+    local = [{'index': 1, 'genesis': 'a'}]
+    remote = [{'index': 1, 'genesis': 'b'}]
+
+    assert locate(remote, block_locator(local, hash_block), hash_block) == -1
+
+
+def test_sync_transfers_only_missing_suffix():
+    remote = make_chain(500)
+    blockchain = FakeBlockchain(remote[:480])
+    fetch, requests = make_fetch(remote, page_size=8)
+
+    assert sync_chain(blockchain, fetch, page_size=8)
+    assert blockchain.chain == remote
+
+    position, blocks = blockchain.accepted
+    assert position == 479
+    assert len(blocks) == 20
+    assert requests == ['summary', 'locate', 'blocks', 'blocks', 'blocks']
+
+
+def test_sync_replaces_forked_blocks():
+    remote = make_chain(60, fork='b', fork_at=30)
+    blockchain = FakeBlockchain(make_chain(40, fork='a', fork_at=30))
+    fetch, _ = make_fetch(remote, page_size=100)
+
+    assert sync_chain(blockchain, fetch)
+    assert blockchain.chain == remote
+    assert blockchain.accepted[0] == 24
+
+
+def test_sync_skips_shorter_remote():
+    blockchain = FakeBlockchain(make_chain(30))
+    fetch, requests = make_fetch(make_chain(30), page_size=100)
+
+    assert not sync_chain(blockchain, fetch)
+    assert requests == ['summary']
+    assert blockchain.accepted is None
+
+
+def test_json_chain_stream_is_valid_json():
+    chain = make_chain(150)
+
+    body = ''.join(iter_json_chain(chain))
+    assert json.loads(body) == {'chain': chain}
+
+    body = ''.join(iter_json_chain(chain, from_index=140, limit=5))
+    assert json.loads(body) == {'chain': chain[140:145]}
+
+    assert json.loads(''.join(iter_json_chain([]))) == {'chain': []}
+
+
+def test_ndjson_round_trip():
+    chain = make_chain(150)
+
+    chunks = list(iter_ndjson(chain, from_index=10))
+    assert len(chunks) == 3
+
+    lines = ''.join(chunks).encode().splitlines()
+    assert list(read_ndjson(lines)) == chain[10:]
+
+
+def test_ndjson_stream_ignores_appended_blocks():
+    chain = make_chain(10)
+    stream = iter_ndjson(chain)
+
+    first = next(stream)
+    chain.append({'index': 11})
+    assert list(read_ndjson(first.splitlines())) == chain[:10]
+    assert list(stream) == []
+
+
+def test_sync_streams_missing_suffix():
+    remote = make_chain(500)
+    blockchain = FakeBlockchain(remote[:300])
+    fetch, requests = make_fetch(remote, page_size=8)
+    streamed = []
+
+    def stream(from_index):
+        streamed.append(from_index)
+        lines = ''.join(iter_ndjson(remote, from_index)).splitlines()
+        return read_ndjson(lines)
+
+    assert sync_chain(blockchain, fetch, stream=stream)
+    assert blockchain.chain == remote
+    assert streamed == [300]
+    assert requests == ['summary', 'locate']
@@ -0,0 +1,161 @@
+import time
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+from lib.validation import NeighborValidator, fetch_hash, fetch_manifest_digest
+
+
+ASSETS = {
+    '/': b'home page',
+    '/core.js': b'core',
+    '/miner.js': b'miner',
+}
+
+
+def make_handler(assets, delay=0):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            content = assets.get(self.path, b'')
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, *args):
+            pass
+    return Handler
+
+
+@pytest.fixture
+def start_server():
+    servers = []
+
+    def start(assets=ASSETS, delay=0):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(assets, delay))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_address[1]}'
+
+    yield start
+
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def asset_urls(node):
+    return [f'{node}{path}' for path in ASSETS]
+
+
+def reference_hashes():
+    return [hashlib.sha256(content).hexdigest() for content in ASSETS.values()]
+
+
+def test_reference_hashes_of_own_node(start_server):
+    validator = NeighborValidator(asset_urls)
+    assert validator.reference_hashes(start_server()) == reference_hashes()
+
+
+def test_nodes_with_same_assets_are_valid(start_server):
+    nodes = [start_server() for _ in range(3)]
+    validator = NeighborValidator(asset_urls)
+
+    results = dict(validator.validate(reference_hashes(), nodes))
+    assert results == dict.fromkeys(nodes, True)
+
+
+def test_node_with_changed_asset_is_invalid(start_server):
+    changed = dict(ASSETS, **{'/miner.js': b'evil miner'})
+    good_node, bad_node = start_server(), start_server(assets=changed)
+    validator = NeighborValidator(asset_urls)
+
+    results = dict(validator.validate(reference_hashes(), [good_node, bad_node]))
+    assert results == {good_node: True, bad_node: False}
+
+
+def test_offline_node_is_invalid(start_server):
+    validator = NeighborValidator(asset_urls)
+    results = dict(validator.validate(reference_hashes(), ['http://127.0.0.1:1']))
+    assert results == {'http://127.0.0.1:1': False}
+
+
+def test_results_are_streamed_as_nodes_finish(start_server):
+    slow_node = start_server(delay=1)
+    fast_node = start_server()
+    validator = NeighborValidator(asset_urls)
+
+    results = list(validator.validate(reference_hashes(), [slow_node, fast_node]))
+    assert results == [(fast_node, True), (slow_node, True)]
+
+
+def test_nodes_not_finished_before_deadline_are_invalid(start_server):
+    slow_node = start_server(delay=2)
+    fast_node = start_server()
+    validator = NeighborValidator(asset_urls, deadline=1)
+
+    started = time.monotonic()
+    results = dict(validator.validate(reference_hashes(), [slow_node, fast_node]))
+    assert time.monotonic() - started < 2
+    assert results == {fast_node: True, slow_node: False}
+
+
+def test_rounds_share_the_given_deadline(start_server):
+    slow_node = start_server(delay=2)
+    validator = NeighborValidator(asset_urls)
+
+    until = time.monotonic() + 1
+    first = dict(validator.validate(reference_hashes(), [slow_node], until))
+    second = dict(validator.validate(reference_hashes(), [slow_node], until))
+    assert time.monotonic() < until + 0.5
+    assert first == second == {slow_node: False}
+
+
+def test_node_is_decided_on_first_mismatch(start_server):
+    fetched = []
+
+    def fetch(url):
+        fetched.append(url)
+        return fetch_hash(url)
+
+    changed = dict(ASSETS, **{'/': b'evil home'})
+    node = start_server(assets=changed)
+    validator = NeighborValidator(asset_urls, fetch=fetch, max_workers=1)
+
+    results = dict(validator.validate(reference_hashes(), [node]))
+    assert results == {node: False}
+    assert fetched == [f'{node}/']
+
+
+def test_requests_to_the_same_host_are_limited(start_server):
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def fetch(url):
+        with lock:
+            running.append(url)
+            peak.append(len(running))
+        time.sleep(0.1)
+        with lock:
+            running.remove(url)
+        return fetch_hash(url)
+
+    node = start_server()
+    validator = NeighborValidator(asset_urls, fetch=fetch, per_host=1)
+
+    results = dict(validator.validate(reference_hashes(), [node]))
+    assert results == {node: True}
+    assert max(peak) == 1
+
+
+def test_manifest_digest_is_one_request_per_node(start_server):
+    manifest = {'/manifest': b'{"digest": "abc", "assets": {}}'}
+    nodes = [start_server(manifest), start_server({'/manifest': b'{}'})]
+    validator = NeighborValidator(lambda node: [f'{node}/manifest'],
+                                  fetch=fetch_manifest_digest)
+
+    results = dict(validator.validate(['abc'], nodes))
+    assert results == {nodes[0]: True, nodes[1]: False}
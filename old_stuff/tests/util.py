@@ -1,6 +1,6 @@
 from unittest.mock import MagicMock, Mock
 
-import requests
+from lib.sessions import registry
 from blueprints.landing import get_node_chain, get_mail_chain
 
 
@@ -54,8 +54,8 @@ def mock_http_get(url_mapping):
                 response.json = lambda: recv_res.json
                 return response
 
-    requests.get = MagicMock(side_effect=handle_req)
-    return requests.get
+    registry.get = MagicMock(side_effect=handle_req)
+    return registry.get
 
 
 def mock_http_post(url_mapping):
@@ -71,5 +71,5 @@ def mock_http_post(url_mapping):
                 response.content = response.data
                 return response
 
-    requests.post = MagicMock(side_effect=handle_req)
-    return requests.post
\ No newline at end of file
+    registry.post = MagicMock(side_effect=handle_req)
+    return registry.post
\ No newline at end of file
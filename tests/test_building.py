@@ -0,0 +1,95 @@
+from .util import get_pow_blockchain
+from vpngate.util import building, crypto
+
+from dataclasses import FrozenInstanceError
+import pickle
+import pytest
+
+
+def get_fields(**kwargs) -> dict:
+    kwargs.setdefault('index', 1)
+    kwargs.setdefault('transactions', ['foo'])
+    kwargs.setdefault('previous_hash', 'ab' * 32)
+    kwargs.setdefault('timestamp', 1.5)
+    kwargs.setdefault('proof', 42)
+    return kwargs
+
+
+def test_slim_block_has_no_instance_dict():
+    block = building.SlimPoWBlock(**get_fields())
+    assert not hasattr(block, '__dict__')
+
+
+def test_slim_block_can_not_be_changed():
+    block = building.SlimPoWBlock(**get_fields())
+    with pytest.raises(FrozenInstanceError):
+        block.proof = 1
+
+
+def test_slim_block_has_the_same_hash_of_the_dataclass_block():
+    expected_hashsum = crypto.block_hashsum(building.PoWBlock(**get_fields()))
+    block = building.SlimPoWBlock(**get_fields())
+    assert crypto.block_hashsum(block) == expected_hashsum
+
+
+def test_slim_block_creates_the_genesis_block():
+    block = building.SlimPoWBlock.genesis()
+    assert block.to_dict() == building.PoWBlock.genesis().to_dict()
+
+
+def test_slim_block_survives_pickling():
+    block = building.SlimPoWBlock(**get_fields())
+    assert pickle.loads(pickle.dumps(block)) == block
+
+
+def test_column_block_reads_its_data_from_the_columns():
+    columns = building.BlockColumns()
+    blocks = [columns(**get_fields(index=index)) for index in range(3)]
+
+    assert len(columns) == 3
+    assert [block.index for block in blocks] == [0, 1, 2]
+    assert blocks[1] == building.SlimPoWBlock(**get_fields(index=1))
+
+
+def test_column_block_has_the_same_hash_of_the_dataclass_block():
+    expected_hashsum = crypto.block_hashsum(building.PoWBlock(**get_fields()))
+    block = building.BlockColumns()(**get_fields())
+    assert crypto.block_hashsum(block) == expected_hashsum
+
+
+@pytest.mark.parametrize('timestamp', [7, None])
+def test_column_block_keeps_non_float_timestamps(timestamp):
+    expected = building.PoWBlock(**get_fields(timestamp=timestamp))
+    block = building.BlockColumns()(**get_fields(timestamp=timestamp))
+
+    assert block.timestamp == timestamp
+    assert type(block.timestamp) is type(timestamp)
+    assert crypto.block_hashsum(block) == crypto.block_hashsum(expected)
+
+
+def test_column_block_creates_the_genesis_block():
+    block = building.ColumnBlock.genesis()
+    expected = building.PoWBlock.genesis()
+
+    assert block == building.BlockColumns().genesis()
+    assert block.to_dict() == expected.to_dict()
+    assert crypto.block_hashsum(block) == crypto.block_hashsum(expected)
+
+
+def test_block_columns_refuses_non_sha256_previous_hashes():
+    with pytest.raises(ValueError):
+        building.BlockColumns()(**get_fields(previous_hash='1'))
+
+
+@pytest.mark.parametrize('factory', [building.SlimPoWBlock,
+                                     building.BlockColumns()])
+def test_compact_blocks_are_a_drop_in_block_factory(factory, monkeypatch):
+    blockchain = get_pow_blockchain(block_factory=factory)
+    monkeypatch.setattr(blockchain, 'has_valid_proof', lambda *args: True)
+
+    first = blockchain.new_block(proof=1)
+    second = blockchain.new_block(proof=2)
+
+    assert second.index == 2
+    assert second.previous_hash == crypto.block_hashsum(first)
+    assert blockchain.last_block == second
@@ -1,3 +1,5 @@
+import pytest
+
 from .util import get_peer, get_block, assert_is_genesis_block
 from vpngate.chains import Tree
 from vpngate.util.building import Block
@@ -61,4 +63,51 @@ def test_tree_returns_true_when_peer_has_any_chains():
     chain = Tree()
     peer = get_peer()
     chain.add(peer, get_block())
-    assert chain.has(peer)
\ No newline at end of file
+    assert chain.has(peer)
+
+
+def test_tree_get_does_not_copy_the_peer_chain():
+    chain = Tree()
+    peer = get_peer()
+    chain.add(peer, get_block(index=1))
+
+    blocks = chain.get(peer)
+    chain.add(peer, get_block(index=2))
+
+    assert len(blocks) == 3
+    assert blocks[-1].index == 2
+
+
+def test_tree_get_supports_slicing():
+    chain = Tree()
+    peer = get_peer()
+    expected_blocks = [get_block(index=index) for index in range(1, 4)]
+    list(map(lambda block: chain.add(peer, block), expected_blocks))
+
+    assert chain.get(peer)[1:] == expected_blocks
+    assert chain.get(peer)[::-2] == expected_blocks[::-2]
+
+
+def test_tree_get_fails_with_index_out_of_range():
+    chain = Tree()
+    with pytest.raises(IndexError):
+        chain.get(get_peer())[1]
+
+
+def test_tree_last_returns_the_last_block_of_the_peer():
+    chain = Tree()
+    peer = get_peer()
+    expected_block = get_block()
+    chain.add(peer, expected_block)
+
+    assert chain.last(peer) == expected_block
+    assert_is_genesis_block(chain.last(get_peer()))
+
+
+def test_tree_size_counts_the_root_block():
+    chain = Tree()
+    peer = get_peer()
+    chain.add(peer, get_block())
+
+    assert chain.size(peer) == 2
+    assert chain.size(get_peer()) == 1
@@ -1,8 +1,11 @@
 from . import util
-from vpngate.util import crypto
+from vpngate.util import crypto, encoding
 
 from unittest.mock import Mock
+from dataclasses import FrozenInstanceError
+import pytest
 import hashlib
+import json
 
 
 def test_hashsum_of_similar_objects_gives_the_same_sum():
@@ -71,4 +74,75 @@ def test_key_pair_can_verify_a_signature_from_other_key():
     pair = crypto.AsymmetricKeyPair()
     signature = pair.sign(data)
 
-    assert crypto.AsymmetricKeyPair.was_signed(pair.pubkey, signature, data)
\ No newline at end of file
+    assert crypto.AsymmetricKeyPair.was_signed(pair.pubkey, signature, data)
+
+
+def test_hashsum_of_a_block_is_computed_only_once(monkeypatch):
+    block = util.get_block()
+    expected_hashsum = crypto.block_hashsum(block)
+
+    encode = Mock(side_effect=AssertionError('block was serialized again'))
+    monkeypatch.setattr(encoding, 'encode_record', encode)
+
+    assert crypto.block_hashsum(block) == expected_hashsum
+
+
+def test_block_fields_can_not_be_changed_after_hashing():
+    block = util.get_block()
+    crypto.block_hashsum(block)
+
+    with pytest.raises(FrozenInstanceError):
+        block.index = 2
+
+
+def test_hashsum_with_legacy_json_representation():
+    block = util.get_block()
+    expected_hashsum = hashlib.sha256(json.dumps(block.to_dict(),
+                                                 sort_keys=True).encode())
+
+    legacy_hashsum = crypto.block_hashsum(block, legacy=True)
+    assert legacy_hashsum == expected_hashsum.hexdigest()
+    assert legacy_hashsum != crypto.block_hashsum(block)
+
+
+def test_block_hashsum_is_verified_with_both_representations():
+    block = util.get_block()
+
+    assert crypto.is_block_hashsum(block, crypto.block_hashsum(block))
+    assert crypto.is_block_hashsum(block,
+                                   crypto.block_hashsum(block, legacy=True))
+    assert not crypto.is_block_hashsum(block, 'foo')
+
+
+def get_signed_items(count=3):
+    pair = crypto.AsymmetricKeyPair()
+    data = [f'data {index}'.encode() for index in range(count)]
+    return [(pair.pubkey, pair.sign(item), item) for item in data]
+
+
+def test_batch_verification_gives_a_result_for_each_signature():
+    items = get_signed_items()
+    key, signature, _ = items[1]
+    items[1] = (key, signature, b'tampered data')
+
+    results = crypto.verify_batch(items, chunk_size=2)
+    assert results == [True, False, True]
+
+
+def test_batch_verification_with_raw_public_keys():
+    items = [(crypto.AsymmetricVerifier(key).public_to_bytes(), sig, data)
+             for key, sig, data in get_signed_items()]
+    items.append((b'not a key', items[0][1], items[0][2]))
+
+    results = crypto.verify_batch(items)
+    assert results == [True, True, True, False]
+
+
+def test_batch_verification_with_processes():
+    items = get_signed_items()
+    assert crypto.verify_batch(items, workers=2, processes=True) == [True] * 3
+
+
+def test_raw_public_keys_are_loaded_only_once():
+    raw = crypto.AsymmetricKeyPair().public_to_bytes()
+    assert crypto.load_public_key(raw) is crypto.load_public_key(raw)
@@ -0,0 +1,160 @@
+from .util import get_peer, get_pow_blockchain
+from vpngate.chains import Tree, RootNode
+from vpngate.util import building, disk
+
+import os
+import pytest
+
+
+def get_log(tmp_path, **kwargs) -> disk.SegmentLog:
+    return disk.SegmentLog(str(tmp_path / 'chain'), **kwargs)
+
+
+def test_log_reads_any_appended_record(tmp_path):
+    log = get_log(tmp_path)
+    payloads = [f'record {index}'.encode() for index in range(10)]
+    positions = list(map(log.append, payloads))
+
+    assert positions == list(range(10))
+    assert [log.read(position) for position in [9, 0, 4]] == \
+        [payloads[9], payloads[0], payloads[4]]
+
+
+def test_log_fails_reading_out_of_range(tmp_path):
+    log = get_log(tmp_path)
+    with pytest.raises(IndexError):
+        log.read(0)
+
+
+def test_log_is_reopened_with_its_records(tmp_path):
+    log = get_log(tmp_path)
+    log.append(b'foo')
+    log.close()
+
+    log = get_log(tmp_path)
+    assert len(log) == 1
+    assert log.read(0) == b'foo'
+
+
+def test_log_syncs_after_some_appends(tmp_path):
+    log = get_log(tmp_path, sync_every=3)
+    log.append(b'foo')
+    log.append(b'bar')
+    assert log.pending == 2
+
+    log.append(b'baz')
+    assert log.pending == 0
+
+
+def test_log_recovery_truncates_torn_records(tmp_path):
+    log = get_log(tmp_path)
+    log.append(b'foo')
+    log.append(b'bar')
+    log.close()
+
+    with open(tmp_path / 'chain.log', 'ab') as writer:
+        # a record header without its payload
+        writer.write(b'\x00\x00\x00\x09\x00')
+    with open(tmp_path / 'chain.idx', 'ab') as writer:
+        writer.write(b'\x00\x00\x00')
+
+    log = get_log(tmp_path)
+    assert len(log) == 2
+    assert log.append(b'baz') == 2
+    assert log.read(2) == b'baz'
+
+
+def test_log_recovery_indexes_records_missing_from_the_index(tmp_path):
+    log = get_log(tmp_path)
+    log.append(b'foo')
+    log.append(b'bar')
+    log.close()
+
+    with open(tmp_path / 'chain.idx', 'r+b') as writer:
+        writer.truncate(8)
+
+    log = get_log(tmp_path)
+    assert len(log) == 2
+    assert log.read(1) == b'bar'
+
+
+def test_log_truncate_removes_the_last_records(tmp_path):
+    log = get_log(tmp_path)
+    list(map(log.append, [b'foo', b'bar', b'baz']))
+    log.truncate(1)
+
+    assert len(log) == 1
+    assert log.append(b'qux') == 1
+    assert log.read(1) == b'qux'
+
+
+def test_tree_with_stored_chains_reads_blocks_from_disk(tmp_path,
+                                                        monkeypatch):
+    store = disk.BlockStore(str(tmp_path))
+    root = RootNode(block=building.PoWBlock.genesis())
+    blockchain = get_pow_blockchain(chain=Tree(root=root,
+                                               chain_factory=store.chain))
+    monkeypatch.setattr(blockchain, 'has_valid_proof', lambda *args: True)
+
+    blocks = [blockchain.new_block(proof=proof) for proof in range(3)]
+    store.close()
+
+    store = disk.BlockStore(str(tmp_path))
+    tree = Tree(root=RootNode(block=root.block), chain_factory=store.chain)
+    tree.open(blockchain.peer)
+
+    assert tree.get(blockchain.peer)[1:] == blocks
+    assert tree.last(blockchain.peer) == blocks[-1]
+
+
+def test_blocks_are_appended_after_the_stored_ones_on_restart(tmp_path,
+                                                              monkeypatch):
+    store = disk.BlockStore(str(tmp_path))
+    root = RootNode(block=building.PoWBlock.genesis())
+    blockchain = get_pow_blockchain(chain=Tree(root=root,
+                                               chain_factory=store.chain))
+    monkeypatch.setattr(blockchain, 'has_valid_proof', lambda *args: True)
+    for proof in range(3):
+        blockchain.new_block(proof=proof)
+    store.close()
+
+    store = disk.BlockStore(str(tmp_path))
+    tree = Tree(root=RootNode(block=root.block),
+                chain_factory=store.chain,
+                chain_exists=store.exists)
+    blockchain.chain = tree
+
+    assert tree.has(blockchain.peer)
+    assert blockchain.last_block.index == 3
+    blockchain.new_block(proof=3)
+    assert [block.index for block in tree.get(blockchain.peer)] == \
+        [0, 1, 2, 3, 4]
+
+
+def test_lookups_of_unknown_peers_do_not_create_stored_chains(tmp_path):
+    store = disk.BlockStore(str(tmp_path))
+    tree = Tree(chain_factory=store.chain, chain_exists=store.exists)
+    peer = get_peer()
+
+    assert not tree.has(peer)
+    assert tree.size(peer) == 1
+    assert tree.last(peer) == tree.root.block
+    assert list(tree.get(peer)) == [tree.root.block]
+
+    assert tree.length == 0
+    assert store.chains == {}
+    assert os.listdir(tmp_path) == []
+
+
+def test_stored_chain_replaces_its_last_blocks(tmp_path):
+    store = disk.BlockStore(str(tmp_path))
+    peer = get_peer()
+    chain = store.chain(peer)
+    blocks = [building.PoWBlock.genesis(index=index) for index in range(3)]
+    chain.extend(blocks)
+
+    chain[1:] = blocks[:1]
+
+    assert list(chain) == [blocks[0], blocks[0]]
+    with pytest.raises(TypeError):
+        chain[0] = blocks[0]
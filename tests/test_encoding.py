@@ -0,0 +1,53 @@
+from . import util
+from vpngate.util import building, encoding
+
+import pytest
+
+
+def test_values_are_decoded_as_they_were_encoded():
+    value = [None, True, False, 0, -1, 2 ** 70, 1.5, 'ção', b'\x00',
+             dict(foo=[1, 2], bar={3: 'baz'})]
+    assert encoding.loads(encoding.dumps(value)) == value
+
+
+def test_integers_and_floats_are_not_mixed_up():
+    assert encoding.loads(encoding.dumps(1)) is not True
+    assert encoding.dumps(1) != encoding.dumps(1.0)
+    assert isinstance(encoding.loads(encoding.dumps(1.0)), float)
+
+
+def test_dicts_with_unsorted_keys_give_the_same_bytes():
+    foo = dict(something=True, another='baz')
+    bar = dict(another='baz', something=True)
+    assert encoding.dumps(foo) == encoding.dumps(bar)
+
+
+def test_unsupported_types_can_not_be_encoded():
+    with pytest.raises(TypeError):
+        encoding.dumps(object())
+
+
+def test_truncated_data_can_not_be_decoded():
+    data = encoding.dumps(['foo', 'bar'])
+    with pytest.raises(encoding.DecodeError):
+        encoding.loads(data[:-1])
+
+
+def test_records_of_another_version_can_not_be_decoded():
+    data = encoding.encode_record((1, 2))
+    with pytest.raises(encoding.DecodeError):
+        encoding.decode_record(bytes((encoding.VERSION + 1,)) + data[1:])
+
+
+def test_block_is_decoded_as_it_was_encoded():
+    block = util.get_block(transactions=['foo', dict(bar=1)], timestamp=1.5)
+    assert building.from_bytes(building.to_bytes(block)) == block
+
+
+def test_pow_block_is_decoded_with_the_given_factory():
+    block = building.PoWBlock.genesis(proof=7)
+    data = building.to_bytes(block)
+
+    slim_block = building.from_bytes(data, factory=building.SlimPoWBlock)
+    assert building.from_bytes(data) == block
+    assert slim_block.to_dict() == block.to_dict()
@@ -0,0 +1,75 @@
+import pytest
+
+from .util import get_pow_blockchain
+from vpngate.util import mining
+
+
+def test_search_returns_the_first_valid_proof():
+    proof = mining.search(2, 100, 'foo')
+    assert mining.is_valid_proof(2, proof, 100, 'foo')
+    assert not any(mining.is_valid_proof(2, p, 100, 'foo')
+                   for p in range(proof))
+
+
+def test_search_returns_none_when_range_has_no_valid_proof():
+    proof = mining.search(2, 100, 'foo')
+    assert mining.search(2, 100, 'foo', start=0, stop=proof) is None
+
+
+def test_deterministic_parallel_search_matches_serial_search():
+    expected_proof = mining.search(3, 100, 'foo')
+    proof = mining.parallel_search(3, 100, 'foo', workers=2, chunk_size=64)
+    assert proof == expected_proof
+
+
+def test_non_deterministic_parallel_search_returns_a_valid_proof():
+    proof = mining.parallel_search(3, 100, 'foo',
+                                   workers=2,
+                                   deterministic=False,
+                                   chunk_size=64)
+    assert mining.is_valid_proof(3, proof, 100, 'foo')
+
+
+def test_pow_blockchain_with_workers_gives_the_serial_proof():
+    blockchain = get_pow_blockchain(difficulty=2)
+    expected_proof = blockchain.proof_of_work()
+
+    assert blockchain.proof_of_work(workers=2) == expected_proof
+
+
+def test_proof_engine_accepts_the_same_proofs_as_is_valid_proof():
+    for difficulty in [-1, 0, 1, 2, 3, 63, 64, 65]:
+        engine = mining.ProofEngine(difficulty, 100, 'foo')
+        for proof in list(range(0, 2000)) + ['bar', -5]:
+            expected = mining.is_valid_proof(difficulty, proof, 100, 'foo')
+            assert engine.is_valid(proof) == expected
+
+
+def test_proof_engine_search_finds_every_valid_proof_in_order():
+    expected_proofs = [proof for proof in range(5000)
+                       if mining.is_valid_proof(2, proof, 'bar', 'baz')]
+
+    engine = mining.ProofEngine(2, 'bar', 'baz')
+    proofs = []
+    proof = engine.search(0, 5000)
+    while proof is not None:
+        proofs.append(proof)
+        proof = engine.search(proof + 1, 5000)
+
+    assert proofs == expected_proofs
+
+
+def test_proof_engine_search_respects_the_range_bounds():
+    engine = mining.ProofEngine(1, 100, 'foo')
+    proof = engine.search(150)
+
+    assert proof >= 150
+    assert engine.search(150, proof) is None
+
+
+def test_proof_engine_refuses_to_search_an_impossible_difficulty():
+    engine = mining.ProofEngine(0, 100, 'foo')
+
+    assert engine.search(0, 100) is None
+    with pytest.raises(ValueError):
+        engine.search()
@@ -1,6 +1,9 @@
 from .util import get_peer
 from vpngate.util import crypto
 
+from unittest.mock import Mock
+import pytest
+
 
 def test_peer_recognizes_itself_using_its_identifier():
     me = get_peer()
@@ -52,3 +55,22 @@ def test_peer_identifier_can_be_used_to_verify_a_signature():
 def test_peer_comparison_against_non_peers_returns_false():
     peer = get_peer()
     assert peer != 'foo' 
+
+
+def test_peer_comparison_serializes_the_public_key_once():
+    public_key = Mock()
+    public_key.public_bytes.return_value = get_peer().keys.public_to_bytes()
+    keys = crypto.AsymmetricVerifier(public_key)
+    peer = get_peer(keys=keys)
+    other_peer = get_peer(keys=keys)
+
+    assert peer == other_peer
+    assert hash(peer) == hash(other_peer)
+    assert peer.identifier == other_peer.identifier
+    assert public_key.public_bytes.call_count == 1
+
+
+def test_public_key_can_not_be_replaced():
+    keys = get_peer().keys
+    with pytest.raises(AttributeError):
+        keys.pubkey = Mock()
@@ -0,0 +1,132 @@
+from . import util
+from vpngate import serializers
+from vpngate.chains import Tree
+from vpngate.util import building, disk, encoding
+from vpngate.util.crypto import AsymmetricVerifier
+
+import pytest
+
+
+def get_tree() -> Tree:
+    tree = Tree()
+    parent = util.get_peer(address='http://parent')
+    for number in range(3):
+        peer = util.get_peer(address=f'http://{number}', parent=parent)
+        for index in range(1, 5):
+            tree.add(peer, building.PoWBlock(index=index,
+                                             transactions=[f'tx{index}'],
+                                             previous_hash='abc',
+                                             proof=index))
+    return tree
+
+
+@pytest.mark.parametrize('name', ['binary', 'pickle'])
+def test_tree_is_loaded_as_it_was_dumped(name):
+    serializer = serializers.get_serializer(name)
+    tree = get_tree()
+
+    loaded = serializer.loads(serializer.dumps(tree))
+    assert loaded == tree
+    for peer, chain in loaded.items():
+        assert peer.parent.address == 'http://parent'
+        assert all(isinstance(block, building.PoWBlock) for block in chain)
+
+
+@pytest.mark.parametrize('name', ['binary', 'pickle'])
+def test_private_keys_are_left_out_by_default(name):
+    peer = util.get_peer()
+    serializer = serializers.get_serializer(name)
+
+    loaded = serializer.loads(serializer.dumps(peer))
+    assert loaded == peer
+    assert type(loaded.keys) is AsymmetricVerifier
+    assert b'PRIVATE' not in serializer.dumps(peer)
+
+
+def test_pickle_keeps_private_keys_when_asked_for():
+    peer = util.get_peer()
+    serializer = serializers.PickleSerializer(include_private_keys=True)
+
+    loaded = serializer.loads(serializer.dumps(peer))
+    assert loaded == peer
+    assert peer.keys.was_signed_by_me(loaded.keys.sign(b'foo'), b'foo')
+
+
+def test_peer_keeps_its_keys():
+    serializer = serializers.BinarySerializer(include_private_keys=True)
+    peer = util.get_peer()
+    remote = util.get_peer(keys=AsymmetricVerifier(peer.keys.pubkey))
+
+    peer.children.add(util.get_peer(parent=peer))
+    peer.siblings.add(remote)
+
+    loaded = serializer.loads(serializer.dumps(peer))
+    assert loaded == peer
+    assert loaded.children == peer.children
+    assert loaded.siblings == {remote}
+    assert peer.keys.was_signed_by_me(loaded.keys.sign(b'foo'), b'foo')
+
+    loaded = serializer.loads(serializer.dumps(remote))
+    assert type(loaded.keys) is AsymmetricVerifier
+
+
+@pytest.mark.parametrize('block', [
+    building.Block.genesis(),
+    building.PoWBlock.genesis(proof=7),
+    building.SlimBlock.genesis(),
+    building.SlimPoWBlock.genesis(proof=7),
+])
+def test_blocks_keep_their_class(block):
+    serializer = serializers.BinarySerializer()
+    loaded = serializer.loads(serializer.dumps([block]))
+    assert loaded == [block]
+    assert type(loaded[0]) is type(block)
+
+
+def test_tree_is_loaded_into_the_chain_factory(tmp_path):
+    store = disk.BlockStore(str(tmp_path), factory=building.PoWBlock)
+    serializer = serializers.BinarySerializer(chain_factory=store.chain)
+    tree = get_tree()
+
+    loaded = serializer.loads(serializer.dumps(tree))
+    for peer, chain in tree.items():
+        assert isinstance(loaded.open(peer), disk.StoredChain)
+        assert loaded.get(peer) == tree.get(peer)
+    store.close()
+
+
+def test_tree_loaded_twice_into_the_chain_factory_is_not_duplicated(tmp_path):
+    store = disk.BlockStore(str(tmp_path), factory=building.PoWBlock)
+    serializer = serializers.BinarySerializer(chain_factory=store.chain)
+    tree = get_tree()
+    data = serializer.dumps(tree)
+
+    serializer.loads(data)
+    loaded = serializer.loads(data)
+    for peer, chain in tree.items():
+        assert loaded.get(peer) == tree.get(peer)
+    store.close()
+
+
+def test_files_are_saved_with_the_serializer(tmp_path):
+    path = str(tmp_path / 'tree')
+    serializer = serializers.get_serializer('binary')
+    tree = get_tree()
+    disk.to_file(tree, path, serializer=serializer)
+
+    with open(path, 'rb') as reader:
+        assert serializers.detect_serializer(reader.read()) is serializer
+    assert disk.from_file(path, serializer=serializer) == tree
+
+
+def test_unknown_data_can_not_be_loaded():
+    with pytest.raises(encoding.DecodeError):
+        serializers.BinarySerializer().loads(b'foo')
+
+    with pytest.raises(ValueError):
+        serializers.get_serializer('foo')
+
+
+def test_serializer_must_implement_dumps_and_loads():
+    with pytest.raises(TypeError):
+        serializers.Serializer()
@@ -0,0 +1,116 @@
+from .util import get_pow_blockchain
+from vpngate.validation import ChainValidator
+from vpngate.util import building
+
+from unittest.mock import Mock
+import copy
+
+
+def mine(blockchain, count):
+    for _ in range(count):
+        blockchain.new_block(proof=blockchain.proof_of_work())
+
+
+def get_validator(monkeypatch, **kwargs) -> ChainValidator:
+    kwargs.setdefault('difficulty', 1)
+    validator = ChainValidator(**kwargs)
+
+    # spy on the checked links
+    spy = Mock(wraps=validator.is_valid_link)
+    monkeypatch.setattr(validator, 'is_valid_link', spy)
+    return validator
+
+
+def test_validator_accepts_a_mined_chain(monkeypatch):
+    blockchain = get_pow_blockchain(difficulty=1)
+    mine(blockchain, 3)
+
+    validator = get_validator(monkeypatch)
+    assert validator.validate(blockchain.chain, blockchain.peer)
+    assert validator.is_valid_link.call_count == 3
+
+
+def test_validator_rejects_a_block_with_wrong_previous_hash(monkeypatch):
+    blockchain = get_pow_blockchain(difficulty=1)
+    mine(blockchain, 2)
+
+    wrong_block = building.PoWBlock(index=3,
+                                    transactions=[],
+                                    previous_hash='foo',
+                                    proof=1)
+    blockchain.chain.add(blockchain.peer, wrong_block)
+
+    validator = get_validator(monkeypatch)
+    assert not validator.validate(blockchain.chain, blockchain.peer)
+
+
+def test_validator_only_checks_blocks_after_the_checkpoint(monkeypatch):
+    blockchain = get_pow_blockchain(difficulty=1)
+    mine(blockchain, 3)
+
+    validator = get_validator(monkeypatch)
+    validator.validate(blockchain.chain, blockchain.peer)
+    validator.is_valid_link.reset_mock()
+
+    mine(blockchain, 2)
+    assert validator.validate(blockchain.chain, blockchain.peer)
+    assert validator.is_valid_link.call_count == 2
+
+
+def test_validator_accepts_a_longer_chain_checking_new_blocks(monkeypatch):
+    blockchain = get_pow_blockchain(difficulty=1)
+    mine(blockchain, 3)
+
+    remote = copy.deepcopy(blockchain)
+    mine(remote, 2)
+
+    validator = get_validator(monkeypatch)
+    validator.validate(blockchain.chain, blockchain.peer)
+    validator.is_valid_link.reset_mock()
+
+    remote_chain = remote.chain.get(remote.peer)
+    assert validator.accept(blockchain.chain, blockchain.peer, remote_chain)
+    assert validator.is_valid_link.call_count == 2
+    assert blockchain.chain.get(blockchain.peer) == remote_chain
+
+
+def test_validator_rechecks_from_the_fork_point(monkeypatch):
+    blockchain = get_pow_blockchain(difficulty=1)
+    mine(blockchain, 2)
+
+    remote = copy.deepcopy(blockchain)
+    mine(blockchain, 1)
+    remote.new_transaction('foo')
+    mine(remote, 3)
+
+    validator = get_validator(monkeypatch)
+    validator.validate(blockchain.chain, blockchain.peer)
+    validator.is_valid_link.reset_mock()
+
+    remote_chain = remote.chain.get(remote.peer)
+    assert validator.fork_point(blockchain.chain.get(blockchain.peer),
+                                remote_chain) == 3
+    assert validator.accept(blockchain.chain, blockchain.peer, remote_chain)
+    assert validator.is_valid_link.call_count == 3
+    assert blockchain.last_block == remote_chain[-1]
+
+
+def test_validator_refuses_shorter_or_invalid_chains(monkeypatch):
+    blockchain = get_pow_blockchain(difficulty=1)
+    mine(blockchain, 2)
+
+    remote = copy.deepcopy(blockchain)
+    mine(remote, 1)
+    remote_chain = list(remote.chain.get(remote.peer))
+    remote_chain.append(building.PoWBlock(index=4,
+                                          transactions=[],
+                                          previous_hash='foo'))
+
+    validator = get_validator(monkeypatch)
+    assert not validator.accept(blockchain.chain,
+                                blockchain.peer,
+                                remote_chain[:2])
+    assert not validator.accept(blockchain.chain,
+                                blockchain.peer,
+                                remote_chain)
+    assert blockchain.chain.size(blockchain.peer) == 3
@@ -1,10 +1,9 @@
-from .util import crypto, building, exceptions
+from .util import crypto, building, exceptions, mining
 from .chains import Tree, RootNode
 from .p2p import Peer
 
 from typing import Tuple
 from dataclasses import dataclass, field
-import hashlib
 
 
 @dataclass
@@ -30,7 +29,7 @@ class BlocksManager:
         :return: <dict>
         """
 
-        return self.chain.get(self.peer)[-1]
+        return self.chain.last(self.peer)
 
     @property
     def next_index(self) -> int:
@@ -84,6 +83,7 @@ def pow_chain() -> Tree:
 @dataclass
 class PoWBlockChain(BlocksManager):
     difficulty: int = field(default=3)
+    workers: int = field(default=1)
 
     block_factory: building.Block = field(default=building.PoWBlock)
     chain: Tree = field(default_factory=pow_chain)
@@ -95,7 +95,7 @@ class PoWBlockChain(BlocksManager):
 
         proof = kwargs.get('proof')
 
-        if not proof:
+        if proof is None:
             raise TypeError('Missing "proof" argument to create a new block!')
         if not self.has_valid_proof(proof):
             raise exceptions.InvalidProofOfWork(proof)
@@ -114,27 +114,36 @@ class PoWBlockChain(BlocksManager):
         last_block_sum = crypto.block_hashsum(last_block)
         return last_block.proof, last_block_sum
 
-    def proof_of_work(self, last_block: building.PoWBlock = None) -> int:
+    def proof_of_work(self,
+                      last_block: building.PoWBlock = None,
+                      workers: int = None,
+                      deterministic: bool = True) -> int:
         """
         Simple Proof of Work Algorithm:
 
          - Find a number p' such that hash(pp') contains leading 4 zeroes
          - Where p is the previous proof, and p' is the new proof
 
+        The search runs on mining.ProofEngine, and with more than one
+        worker it is split across processes, see mining.parallel_search().
+
         :param last_block: last Block
+        :param workers: Number of processes, defaults to self.workers
+        :param deterministic: Wheter to return the smallest valid proof
         :return: A valid proof of work
         """
 
         last_proof, last_hash = self.get_info(block=last_block)
+        workers = workers or self.workers
 
-        proof = 0
-        while not PoWBlockChain.is_valid_proof(self.difficulty,
-                                               proof,
-                                               last_proof,
-                                               last_hash):
-            proof += 1
+        if workers > 1:
+            return mining.parallel_search(self.difficulty,
+                                          last_proof,
+                                          last_hash,
+                                          workers=workers,
+                                          deterministic=deterministic)
 
-        return proof
+        return mining.search(self.difficulty, last_proof, last_hash)
 
     @staticmethod
     def is_valid_proof(difficulty: int,
@@ -150,10 +159,7 @@ class PoWBlockChain(BlocksManager):
         :return: <bool>
         """
 
-        guess = f'{last_proof}{proof}{last_hash}'.encode()
-        guess_hash = hashlib.sha256(guess).hexdigest()
-
-        return guess_hash[-difficulty:] == "0" * difficulty
+        return mining.is_valid_proof(difficulty, proof, last_proof, last_hash)
 
     def has_valid_proof(self, proof: int) -> bool:
         """
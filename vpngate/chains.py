@@ -1,8 +1,9 @@
 from .util import building
 from .p2p import Peer
 
-from typing import Dict, List
+from typing import Callable, Dict, List, MutableSequence, Optional, Sequence
 from dataclasses import dataclass, field
+from collections import abc
 
 
 @dataclass
@@ -19,9 +20,62 @@ class RootNode:
     chains: Dict[Peer, List[building.Block]] = field(default_factory=dict)
 
 
+class ChainView(abc.Sequence):
+    """
+    Read-only view of the root block followed by the blocks of a peer
+    chain. Nothing is copied, so blocks appended to the peer chain are
+    seen by the view as well. Slicing returns a list with only the
+    selected blocks.
+    """
+
+    __slots__ = ('root', 'blocks')
+
+    def __init__(self, root: building.Block, blocks: Sequence):
+        self.root = root
+        self.blocks = blocks
+
+    def __len__(self) -> int:
+        return len(self.blocks) + 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('chain index out of range')
+
+        if index == 0:
+            return self.root
+        return self.blocks[index - 1]
+
+    def __iter__(self):
+        yield self.root
+        yield from self.blocks
+
+    def __eq__(self, another_obj) -> bool:
+        if isinstance(another_obj, (ChainView, list, tuple)):
+            return len(self) == len(another_obj) and \
+                all(a == b for a, b in zip(self, another_obj))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({list(self)!r})'
+
+
+def memory_chain(peer: Peer) -> list:
+    """Create a peer chain kept in memory, the default of Tree."""
+
+    return []
+
+
 @dataclass
 class Tree:
     root: RootNode = field(default_factory=RootNode)
+    chain_factory: Callable[[Peer], MutableSequence] = field(
+        default=memory_chain)
+    chain_exists: Optional[Callable[[Peer], bool]] = None
 
     @property
     def length(self) -> int:
@@ -43,27 +97,86 @@ class Tree:
         :param block: The next block with data
         """
 
-        if not self.has(peer):
-            self.root.chains[peer] = []
-
-        chain = self.root.chains[peer]
+        chain = self.open(peer)
         chain.append(block)
 
-    def get(self, peer: Peer) -> list:
+    def open(self, peer: Peer) -> MutableSequence:
+        """
+        Return the chain of the peer, creating it with the chain factory
+        when the peer has none. Chains kept elsewhere, like on disk, are
+        opened this way.
+
+        :param peer: The peer of the chain
+        """
+
+        if peer not in self.root.chains:
+            self.root.chains[peer] = self.chain_factory(peer)
+        return self.root.chains[peer]
+
+    def splice(self, peer: Peer, position: int, blocks: Sequence):
+        """
+        Replace the blocks of the peer full chain from the position on,
+        keeping the blocks before it.
+
+        :param peer: A peer responsable of the blocks
+        :param position: Position in the full chain, the root block is 0
+        :param blocks: The new blocks
         """
-        Return the full chain of the given peer
+
+        if position < 1:
+            raise IndexError('the root block can not be replaced')
+
+        self.open(peer)[position - 1:] = blocks
+
+    def get(self, peer: Peer) -> ChainView:
+        """
+        Return a view of the full chain of the given peer, without copying
+        it.
 
         :param peer: The peer of the chains
         """
 
-        stock_chain = self.root.chains.get(peer, [])
-        return [self.root.block] + stock_chain
+        return ChainView(self.root.block, self._chain(peer))
+
+    def last(self, peer: Peer) -> building.Block:
+        """
+        Return the last block of the full chain of the given peer.
+
+        :param peer: The peer of the chains
+        """
+
+        stock_chain = self._chain(peer)
+        return stock_chain[-1] if len(stock_chain) else self.root.block
+
+    def size(self, peer: Peer) -> int:
+        """
+        Return the number of blocks in the full chain of the given peer,
+        including the root block.
+
+        :param peer: The peer of the chains
+        """
+
+        return len(self._chain(peer)) + 1
 
     def has(self, peer: Peer) -> bool:
         """
-        Determine wheter the peer already has a chain registered.
+        Determine wheter the peer already has a chain registered, either
+        at the tree or kept elsewhere, like on disk.
 
         :param peer: The peer to check against
         """
 
-        return peer in self.root.chains
+        return peer in self.root.chains or self._exists(peer)
+
+    def _exists(self, peer: Peer) -> bool:
+        return self.chain_exists is not None and self.chain_exists(peer)
+
+    def _chain(self, peer: Peer) -> Sequence:
+        if peer in self.root.chains:
+            return self.root.chains[peer]
+        # chains kept elsewhere outlive the tree, like on disk after a
+        # restart, so existing ones are opened on their first lookup,
+        # and lookups never create a chain
+        if self._exists(peer):
+            return self.open(peer)
+        return ()
@@ -29,13 +29,15 @@ class Peer:
     def __eq__(self, another_obj) -> bool:
         """
         Determines wheter the given peer equals the local peer.
-        The peers identifier is used to make such comparison.
+        The peers public key bytes, from which the identifier comes, are
+        used to make such comparison.
 
         :param another_obj: Some object to compare
         """
 
         if isinstance(another_obj, Peer):
-            return self.identifier == another_obj.identifier
+            return self.keys.public_to_bytes() == \
+                another_obj.keys.public_to_bytes()
         return False
 
     def __hash__(self) -> int:
@@ -0,0 +1,248 @@
+from .util import building, encoding
+from .util.crypto import (AsymmetricVerifier, AsymmetricKeyPair,
+                          load_public_key)
+from .chains import Tree, RootNode
+from .p2p import Peer
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, MutableSequence, Optional
+import copyreg
+import pickle   # nosec
+import io
+
+
+# Written first by the binary serializer, followed by the layout version
+MAGIC = b'VPNS'
+VERSION = 1
+
+# One byte before each block tells its class
+_BLOCK_CODES = {
+    building.Block: b'B',
+    building.PoWBlock: b'P',
+    building.SlimBlock: b'b',
+    building.SlimPoWBlock: b'p',
+}
+_BLOCK_TYPES = {code[0]: cls for cls, code in _BLOCK_CODES.items()}
+
+
+def _reduce_private_keys(keys: AsymmetricKeyPair):
+    return AsymmetricKeyPair.from_pem_private_bytes, (keys.private_to_pem(),)
+
+
+class Serializer(ABC):
+    """
+    Turns chain objects into bytes and back, so snapshots may be saved
+    with any of the serializers, see get_serializer().
+    """
+
+    name = ''
+
+    @abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        """Serialize the object."""
+
+    @abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """Load an object serialized with dumps()."""
+
+
+class PickleSerializer(Serializer):
+    """
+    Serialize any Python object with pickle. It is the default of
+    vpngate.util.disk and the fastest way of saving snapshots read only by
+    Python. Only load trusted data.
+
+    Just like with BinarySerializer, private keys are left out unless
+    asked for, and then written in plain PEM.
+    """
+
+    name = 'pickle'
+
+    def __init__(self, include_private_keys: bool = False):
+        """
+        :param include_private_keys: Wheter to write the private keys of
+                                     the peers having them
+        """
+
+        self.include_private_keys = include_private_keys
+
+    def dumps(self, obj: Any) -> bytes:
+        if not self.include_private_keys:
+            return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+        buffer = io.BytesIO()
+        pickler = pickle.Pickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+        # the table is looked up before the __reduce__ of the keys
+        pickler.dispatch_table = copyreg.dispatch_table.copy()
+        pickler.dispatch_table[AsymmetricKeyPair] = _reduce_private_keys
+        pickler.dump(obj)
+        return buffer.getvalue()
+
+    def loads(self, data: bytes) -> Any:
+        return pickle.loads(data)   # nosec
+
+
+class BinarySerializer(Serializer):
+    """
+    Serialize blocks, peers and trees with the versioned binary encoding
+    of vpngate.util.encoding, which other languages may implement, for
+    snapshots shared with peers not written in Python. Blocks are written
+    with the same bytes they are hashed with, so saving blocks already
+    hashed costs almost nothing, but blocks never hashed are slower to
+    save than with pickle, and snapshots are slightly larger.
+
+    Peers keep their address, public key and the addresses and public keys
+    of their relatives. Private keys are left out unless asked for, and
+    then written in plain PEM.
+
+    Usage:
+        >>> serializer = BinarySerializer()
+        >>> data = serializer.dumps(tree)
+        >>> serializer.loads(data) == tree
+        True
+    """
+
+    name = 'binary'
+
+    def __init__(self,
+                 chain_factory: Optional[Callable[[Peer],
+                                                  MutableSequence]] = None,
+                 include_private_keys: bool = False):
+        """
+        :param chain_factory: Creates the peer chains of loaded trees, by
+                              default they are kept in memory
+        :param include_private_keys: Wheter to write the private keys of
+                                     the peers having them
+        """
+
+        self.chain_factory = chain_factory
+        self.include_private_keys = include_private_keys
+
+    def dumps(self, obj: Any) -> bytes:
+        if isinstance(obj, Tree):
+            payload = ['tree', self._dump_tree(obj)]
+        elif isinstance(obj, Peer):
+            payload = ['peer', self._dump_peer(obj)]
+        elif isinstance(obj, (building.Block, building.SlottedBlock)):
+            payload = ['block', self._dump_block(obj)]
+        elif isinstance(obj, (list, tuple)):
+            payload = ['blocks', [self._dump_block(block) for block in obj]]
+        else:
+            raise TypeError(f'Can not serialize object of type: {type(obj)}')
+
+        return MAGIC + bytes((VERSION,)) + encoding.dumps(payload)
+
+    def loads(self, data: bytes) -> Any:
+        header = len(MAGIC) + 1
+        if data[:len(MAGIC)] != MAGIC or data[len(MAGIC):header] != \
+                bytes((VERSION,)):
+            raise encoding.DecodeError('Not a supported binary snapshot')
+
+        kind, value = encoding.loads(memoryview(data)[header:])
+        if kind == 'tree':
+            return self._load_tree(value)
+        if kind == 'peer':
+            return self._load_peer(value)
+        if kind == 'block':
+            return self._load_block(value)
+        if kind == 'blocks':
+            return [self._load_block(item) for item in value]
+        raise encoding.DecodeError(f'Unknown snapshot kind: {kind}')
+
+    @staticmethod
+    def _dump_block(block) -> bytes:
+        try:
+            code = _BLOCK_CODES[type(block)]
+        except KeyError:
+            raise TypeError(f'Can not serialize block of type: {type(block)}')
+        return code + block.canonical
+
+    @staticmethod
+    def _load_block(data: bytes):
+        try:
+            factory = _BLOCK_TYPES[data[0]]
+        except (KeyError, IndexError):
+            raise encoding.DecodeError('Unknown block type')
+        return building.from_bytes(data[1:], factory)
+
+    def _dump_peer(self, peer: Peer, shallow: bool = False) -> list:
+        private = None
+        if self.include_private_keys and \
+                isinstance(peer.keys, AsymmetricKeyPair):
+            private = peer.keys.private_to_pem()
+
+        if shallow:
+            return [peer.address, peer.keys.public_to_bytes(), private]
+
+        relatives = [
+            [self._dump_peer(child, True) for child in peer.children],
+            [self._dump_peer(sibling, True) for sibling in peer.siblings],
+            self._dump_peer(peer.parent, True) if peer.parent else None,
+        ]
+        return [peer.address, peer.keys.public_to_bytes(), private,
+                *relatives]
+
+    def _load_peer(self, values: list) -> Peer:
+        address, public, private = values[:3]
+        if private is not None:
+            keys = AsymmetricKeyPair.from_pem_private_bytes(private)
+        else:
+            keys = AsymmetricVerifier(load_public_key(public))
+
+        peer = Peer(address=address, keys=keys)
+        if len(values) > 3:
+            children, siblings, parent = values[3:]
+            peer.children = {self._load_peer(child) for child in children}
+            peer.siblings = {self._load_peer(item) for item in siblings}
+            peer.parent = self._load_peer(parent) if parent else None
+        return peer
+
+    def _dump_tree(self, tree: Tree) -> list:
+        chains = [[self._dump_peer(peer),
+                   [self._dump_block(block) for block in chain]]
+                  for peer, chain in tree.items()]
+        return [self._dump_block(tree.root.block), chains]
+
+    def _load_tree(self, values: list) -> Tree:
+        root, chains = values
+        tree = Tree(root=RootNode(block=self._load_block(root)))
+        if self.chain_factory is not None:
+            tree.chain_factory = self.chain_factory
+
+        for peer_values, blocks in chains:
+            # stored chains may already have blocks, like when loading
+            # the same snapshot again, so they are replaced
+            chain = tree.open(self._load_peer(peer_values))
+            chain[:] = (self._load_block(block) for block in blocks)
+        return tree
+
+
+SERIALIZERS = {
+    PickleSerializer.name: PickleSerializer(),
+    BinarySerializer.name: BinarySerializer(),
+}
+
+
+def get_serializer(name: str) -> Serializer:
+    """
+    Get one of the available serializers by its name.
+
+    :param name: 'binary' or 'pickle'
+    """
+
+    try:
+        return SERIALIZERS[name]
+    except KeyError:
+        raise ValueError(f'Unknown serializer: {name}')
+
+
+def detect_serializer(data: bytes) -> Serializer:
+    """
+    Tell which serializer wrote the data.
+
+    :param data: A serialized object
+    """
+
+    if data[:len(MAGIC)] == MAGIC:
+        return SERIALIZERS[BinarySerializer.name]
+    return SERIALIZERS[PickleSerializer.name]
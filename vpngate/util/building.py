@@ -1,8 +1,68 @@
-from dataclasses import dataclass, field, asdict
+from . import encoding
+
+from dataclasses import (dataclass, field, fields, asdict,
+                         FrozenInstanceError)
+from functools import cached_property
+from array import array
+import hashlib
+import copy
+import json
 import time
 
 
-@dataclass
+# Used to tell when the timestamp of a block was not given
+_MISSING = object()
+
+
+def block_values(block) -> tuple:
+    """Return the values of the block fields, in the constructor order."""
+
+    if isinstance(block, SlottedBlock):
+        return block.values()
+    return tuple(getattr(block, item.name) for item in fields(block))
+
+
+def to_bytes(block) -> bytes:
+    """
+    Encode the block with the versioned binary layout. The same bytes are
+    used when hashing, sending and saving the block.
+    """
+
+    return encoding.encode_record(block_values(block))
+
+
+def from_bytes(data: bytes, factory=None):
+    """
+    Decode a block encoded with to_bytes().
+
+    :param data: The encoded block
+    :param factory: Block class, by default Block or PoWBlock
+    """
+
+    values = encoding.decode_record(data)
+    if factory is None:
+        factory = PoWBlock if len(values) == len(fields(PoWBlock)) else Block
+    return factory(*values)
+
+
+def canonical_bytes(block) -> bytes:
+    """Return the bytes representing a block when hashing it."""
+
+    return to_bytes(block)
+
+
+def legacy_canonical_bytes(block) -> bytes:
+    """
+    Return the bytes representing a block when it was hashed from its
+    JSON representation. Only used to verify chains hashed that way.
+    """
+
+    # We must make sure that the Dictionary is Ordered, or we'll have
+    # inconsistent hashes
+    return json.dumps(block.to_dict(), sort_keys=True).encode()
+
+
+@dataclass(frozen=True)
 class Block:
     """
     This class represents each component in the chain. It holds data
@@ -11,6 +71,9 @@ class Block:
         - hash of the last block in chain
         - the actual content in the transactions
         - when the block was assigned
+
+    Blocks are frozen, so their canonical representation and hash are
+    computed only once. The transactions must not be changed either.
     """
 
     index: int
@@ -36,7 +99,254 @@ class Block:
 
         return asdict(self)
 
+    @cached_property
+    def canonical(self) -> bytes:
+        """The bytes representing this block when hashing it."""
+
+        return canonical_bytes(self)
+
+    @cached_property
+    def hashsum(self) -> str:
+        """The SHA-256 hash of the canonical representation."""
+
+        return hashlib.sha256(self.canonical).hexdigest()
+
 
-@dataclass
+@dataclass(frozen=True)
 class PoWBlock(Block):
     proof: int = field(default=100)
+
+
+class SlottedBlock:
+    """
+    Base of the blocks without a per-instance __dict__. Subclasses tell
+    their data fields, in the constructor order, at the fields attribute.
+    Instances are immutable, so the canonical representation and the hash
+    are computed only once, just like frozen Block objects.
+    """
+
+    __slots__ = ('_canonical', '_hashsum')
+
+    fields = ()
+
+    genesis = classmethod(Block.genesis.__func__)
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f'cannot assign to field {name!r}')
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f'cannot delete field {name!r}')
+
+    def __eq__(self, another_obj) -> bool:
+        if isinstance(another_obj, SlottedBlock) and \
+                self.fields == another_obj.fields:
+            return self.values() == another_obj.values()
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        values = ', '.join(f'{name}={getattr(self, name)!r}'
+                           for name in self.fields)
+        return f'{self.__class__.__name__}({values})'
+
+    def __reduce__(self):
+        return SlimBlock.from_values, (self.fields, self.values())
+
+    def values(self) -> tuple:
+        """Return the values of the block fields, in order."""
+
+        return tuple(getattr(self, name) for name in self.fields)
+
+    def to_dict(self) -> dict:
+        """Return a dict representing this block."""
+
+        return {name: copy.deepcopy(getattr(self, name))
+                for name in self.fields}
+
+    @property
+    def canonical(self) -> bytes:
+        """The bytes representing this block when hashing it."""
+
+        try:
+            return self._canonical
+        except AttributeError:
+            object.__setattr__(self, '_canonical', canonical_bytes(self))
+            return self._canonical
+
+    @property
+    def hashsum(self) -> str:
+        """The SHA-256 hash of the canonical representation."""
+
+        try:
+            return self._hashsum
+        except AttributeError:
+            hashsum = hashlib.sha256(self.canonical).hexdigest()
+            object.__setattr__(self, '_hashsum', hashsum)
+            return hashsum
+
+
+class SlimBlock(SlottedBlock):
+    """
+    Compact and immutable version of Block, which may be used as the
+    BlocksManager.block_factory. Similar blocks share the same hash.
+    """
+
+    __slots__ = ('index', 'transactions', 'previous_hash', 'timestamp')
+
+    fields = ('index', 'transactions', 'previous_hash', 'timestamp')
+
+    def __init__(self,
+                 index: int,
+                 transactions: list,
+                 previous_hash: str,
+                 timestamp: float = _MISSING,
+                 **kwargs):
+        if timestamp is _MISSING:
+            timestamp = time.time()
+
+        values = dict(kwargs,
+                      index=index,
+                      transactions=transactions,
+                      previous_hash=previous_hash,
+                      timestamp=timestamp)
+
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    @staticmethod
+    def from_values(fields: tuple, values: tuple) -> SlottedBlock:
+        """
+        Instantiate the slim block with the given fields.
+
+        :param fields: Names of the fields
+        :param values: Values of the fields, in the same order
+        """
+
+        factory = SlimPoWBlock if 'proof' in fields else SlimBlock
+        return factory(**dict(zip(fields, values)))
+
+
+class SlimPoWBlock(SlimBlock):
+    """Compact and immutable version of PoWBlock."""
+
+    __slots__ = ('proof',)
+
+    fields = SlimBlock.fields + ('proof',)
+
+    def __init__(self,
+                 index: int,
+                 transactions: list,
+                 previous_hash: str,
+                 timestamp: float = _MISSING,
+                 proof: int = 100):
+        super().__init__(index,
+                         transactions,
+                         previous_hash,
+                         timestamp,
+                         proof=proof)
+
+
+class BlockColumns:
+    """
+    Columnar store of proof of work blocks. The index, timestamp, proof and
+    the previous hash are packed into arrays, so each block only costs
+    its own small view object. The store is called exactly as a block
+    class, thus it may be used as the BlocksManager.block_factory.
+
+    Only integer proofs and SHA-256 hex previous hashes can be stored.
+    Timestamps which are not floats, like None or the integer of the
+    genesis block, are kept aside by position, so they keep their type
+    and the block its hash.
+
+    Usage:
+        >>> columns = BlockColumns()
+        >>> block = columns(index=1, transactions=[], previous_hash='ab' * 32)
+        >>> block.proof
+        100
+    """
+
+    def __init__(self):
+        self.indexes = array('q')
+        self.timestamps = array('d')
+        self.other_timestamps = dict()
+        self.proofs = array('q')
+        self.previous_hashes = bytearray()
+        self.transactions = []
+
+    def __len__(self) -> int:
+        return len(self.indexes)
+
+    def __call__(self,
+                 index: int,
+                 transactions: list,
+                 previous_hash: str,
+                 timestamp: float = _MISSING,
+                 proof: int = 100) -> 'ColumnBlock':
+        if timestamp is _MISSING:
+            timestamp = time.time()
+
+        previous_digest = bytes.fromhex(previous_hash)
+        if len(previous_digest) != hashlib.sha256().digest_size:
+            raise ValueError(f'Not a SHA-256 hash: {previous_hash}')
+
+        position = len(self)
+
+        self.indexes.append(index)
+        if type(timestamp) is float:
+            self.timestamps.append(timestamp)
+        else:
+            self.timestamps.append(0.0)
+            self.other_timestamps[position] = timestamp
+        self.proofs.append(proof)
+        self.previous_hashes += previous_digest
+        self.transactions.append(transactions)
+
+        return ColumnBlock(self, position)
+
+    @staticmethod
+    def genesis(**kwargs) -> SlottedBlock:
+        """
+        Create the default first block in the chain. Its previous hash is
+        not a SHA-256 hash, so it is a SlimPoWBlock, equal to and with the
+        same hash of the one the columns would hold.
+        """
+
+        return SlimPoWBlock.genesis(**kwargs)
+
+
+class ColumnBlock(SlottedBlock):
+    """A proof of work block which reads its data from BlockColumns."""
+
+    __slots__ = ('_columns', '_position')
+
+    fields = SlimPoWBlock.fields
+
+    genesis = BlockColumns.genesis
+
+    def __init__(self, columns: BlockColumns, position: int):
+        object.__setattr__(self, '_columns', columns)
+        object.__setattr__(self, '_position', position)
+
+    @property
+    def index(self) -> int:
+        return self._columns.indexes[self._position]
+
+    @property
+    def transactions(self) -> list:
+        return self._columns.transactions[self._position]
+
+    @property
+    def previous_hash(self) -> str:
+        size = hashlib.sha256().digest_size
+        start = self._position * size
+        return self._columns.previous_hashes[start:start + size].hex()
+
+    @property
+    def timestamp(self) -> float:
+        other_timestamps = self._columns.other_timestamps
+        if other_timestamps and self._position in other_timestamps:
+            return other_timestamps[self._position]
+        return self._columns.timestamps[self._position]
+
+    @property
+    def proof(self) -> int:
+        return self._columns.proofs[self._position]
@@ -4,13 +4,39 @@ from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric import ed25519
 from cryptography.exceptions import InvalidSignature
 
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Iterable, List, Tuple, Union
+import functools
 import json
 import hashlib
 import base64
 
 
-def block_hashsum(block: building.Block, impl=hashlib.sha256):
-    """Calculates the hash from the string representation of the object."""
+# How many loaded public keys are kept in memory
+PUBLIC_KEYS_CACHE_SIZE = 2 ** 12
+
+# Amount of signatures each worker verifies at once
+DEFAULT_BATCH_CHUNK_SIZE = 2 ** 8
+
+PublicKey = Union[ed25519.Ed25519PublicKey, bytes]
+
+
+def block_hashsum(block: building.Block,
+                  impl=hashlib.sha256,
+                  legacy: bool = False):
+    """
+    Calculates the hash from the binary representation of the block. The
+    SHA-256 hash of blocks is cached on the block itself.
+
+    :param legacy: Hash the JSON representation, as the old chains did
+    """
+
+    if isinstance(block, (building.Block, building.SlottedBlock)):
+        if legacy:
+            return impl(building.legacy_canonical_bytes(block)).hexdigest()
+        if impl is hashlib.sha256:
+            return block.hashsum
+        return impl(block.canonical).hexdigest()
 
     # We must make sure that the Dictionary is Ordered, or we'll have
     # inconsistent hashes
@@ -20,6 +46,86 @@ def block_hashsum(block: building.Block, impl=hashlib.sha256):
     return hashsum.hexdigest()
 
 
+def is_block_hashsum(block: building.Block, hashsum: str) -> bool:
+    """
+    Determine wheter the hash belongs to the block. Hashes of the JSON
+    representation are accepted too, so chains hashed that way are still
+    valid.
+
+    :param block: The hashed block
+    :param hashsum: The expected SHA-256 hash
+    """
+
+    return block_hashsum(block) == hashsum or \
+        block_hashsum(block, legacy=True) == hashsum
+
+
+@functools.lru_cache(maxsize=PUBLIC_KEYS_CACHE_SIZE)
+def load_public_key(public_bytes: bytes) -> ed25519.Ed25519PublicKey:
+    """
+    Load the public key from its raw bytes, reusing keys loaded earlier.
+
+    :param public_bytes: The raw public key
+    """
+
+    return ed25519.Ed25519PublicKey.from_public_bytes(public_bytes)
+
+
+def _raw_public_key(public_key: PublicKey) -> bytes:
+    if isinstance(public_key, bytes):
+        return public_key
+    return AsymmetricVerifier(public_key).public_to_bytes()
+
+
+def _verify_chunk(items: List[Tuple[PublicKey, bytes, bytes]]) -> List[bool]:
+    results = []
+    for public_key, signature, data in items:
+        if isinstance(public_key, bytes):
+            try:
+                public_key = load_public_key(public_key)
+            except ValueError:
+                results.append(False)
+                continue
+        results.append(AsymmetricVerifier.was_signed(public_key,
+                                                     signature,
+                                                     data))
+    return results
+
+
+def verify_batch(items: Iterable[Tuple[PublicKey, bytes, bytes]],
+                 workers: int = None,
+                 processes: bool = False,
+                 chunk_size: int = DEFAULT_BATCH_CHUNK_SIZE) -> List[bool]:
+    """
+    Verify many signatures at once, splitting them in chunks across a pool
+    of threads, or processes. Public keys may be given as key objects or as
+    raw bytes, which are loaded only once.
+
+    :param items: Triples of (public key, signature, data)
+    :param workers: Size of the pool, defaults to the executor default
+    :param processes: Wheter to use processes instead of threads
+    :param chunk_size: Amount of signatures each task verifies
+    :return: Wheter each signature is valid, in the same order
+    """
+
+    items = list(items)
+
+    if processes:
+        # key objects can not be sent to another process
+        items = [(_raw_public_key(key), signature, data)
+                 for key, signature, data in items]
+
+    chunks = [items[start:start + chunk_size]
+              for start in range(0, len(items), chunk_size)]
+
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        results = []
+        for chunk_results in executor.map(_verify_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+
+
 class AsymmetricVerifier:
     """
     Holds a the asymmetric public key, used to verify signatures. It also
@@ -34,7 +140,30 @@ class AsymmetricVerifier:
     """
 
     def __init__(self, pubkey: ed25519.Ed25519PublicKey):
-        self.pubkey = pubkey
+        self._pubkey = pubkey
+
+    def __reduce__(self):
+        # the cryptography keys can not be pickled, their bytes are
+        return self.__class__.from_public_b64, (self.public_to_b64(),)
+
+    @property
+    def pubkey(self) -> ed25519.Ed25519PublicKey:
+        """
+        The public key, read-only as its encodings are kept.
+        """
+
+        return self._pubkey
+
+    @functools.cached_property
+    def _public_bytes(self) -> bytes:
+        # the encodings are used often to compare peers, so keep them
+        return self._pubkey.public_bytes(
+            encoding=serialization.Encoding.Raw,
+            format=serialization.PublicFormat.Raw)
+
+    @functools.cached_property
+    def _public_b64(self) -> bytes:
+        return base64.b64encode(self._public_bytes)
 
     @classmethod
     def from_public_b64(cls, public_b64: bytes):
@@ -49,8 +178,7 @@ class AsymmetricVerifier:
         Get the public key as UTF-8 bytes.
         """
 
-        return self.pubkey.public_bytes(encoding=serialization.Encoding.Raw,
-                                        format=serialization.PublicFormat.Raw)
+        return self._public_bytes
 
     def public_to_b64(self) -> bytes:
         """
@@ -58,7 +186,7 @@ class AsymmetricVerifier:
         using text format, or sending over the network.
         """
 
-        return base64.b64encode(self.public_to_bytes())
+        return self._public_b64
 
     @staticmethod
     def b64_to_public_key(data: bytes) -> ed25519.Ed25519PublicKey:
@@ -121,6 +249,11 @@ class AsymmetricKeyPair(AsymmetricVerifier):
         # the public key is always generated from the private key
         super().__init__(self.__privkey.public_key())
 
+    def __reduce__(self):
+        # the private key is never pickled by default, only the public
+        # one, see PickleSerializer to keep it
+        return AsymmetricVerifier.from_public_b64, (self.public_to_b64(),)
+
     @classmethod
     def from_pem_private_bytes(cls, private: bytes):
         """
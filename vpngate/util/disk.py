@@ -1,11 +1,323 @@
+from . import building
+
+from collections import abc
+from typing import Optional
+import binascii
+import struct
 import pickle   # nosec
+import mmap
+import os
+
+
+# How many appends are written before the files are synced to disk
+DEFAULT_SYNC_EVERY = 64
+
+_HEADER = struct.Struct('>II')
+_OFFSET = struct.Struct('>Q')
+
 
+def to_file(obj, path, serializer=None):
+    """
+    Save the object at the file, with pickle unless another serializer is
+    given, see vpngate.serializers.
+    """
 
-def to_file(obj, path):
     with open(path, 'wb') as writer:
-        pickle.dump(obj, writer)    # nosec
+        if serializer is None:
+            pickle.dump(obj, writer)    # nosec
+        else:
+            writer.write(serializer.dumps(obj))
 
 
-def from_file(path):
+def from_file(path, serializer=None):
+    """Load an object saved with to_file() using the same serializer."""
+
     with open(path, 'rb') as reader:
-        return pickle.load(reader)  # nosec
+        if serializer is None:
+            return pickle.load(reader)  # nosec
+        return serializer.loads(reader.read())
+
+
+class SegmentLog:
+    """
+    Append-only log of records. Each record is prefixed with its length
+    and CRC32, and the offset of each record is kept at an index file, so
+    any record is read with a single seek. Files are synced to disk after
+    some appends, instead of on every one.
+
+    When opened, records torn by a crash are truncated away and records
+    missing from the index are indexed again.
+
+    Usage:
+        >>> log = SegmentLog('/tmp/chain')
+        >>> log.append(b'foo')
+        0
+        >>> log.read(0)
+        b'foo'
+    """
+
+    def __init__(self, path: str, sync_every: int = DEFAULT_SYNC_EVERY):
+        self.path = path
+        self.sync_every = sync_every
+        self.pending = 0
+
+        self._log = open(f'{path}.log', 'a+b', buffering=0)
+        self._index = open(f'{path}.idx', 'a+b', buffering=0)
+        self._map = None
+
+        self.recover()
+
+    def __len__(self) -> int:
+        return self._size(self._index) // _OFFSET.size
+
+    def append(self, payload: bytes) -> int:
+        """
+        Write a new record at the end of the log.
+
+        :param payload: Content of the record
+        :return: The position of the record
+        """
+
+        position = len(self)
+        offset = self._size(self._log)
+
+        header = _HEADER.pack(len(payload), binascii.crc32(payload))
+        self._log.write(header + payload)
+        self._index.write(_OFFSET.pack(offset))
+
+        self.pending += 1
+        if self.pending >= self.sync_every:
+            self.sync()
+
+        return position
+
+    def read(self, position: int) -> bytes:
+        """
+        Read the content of the record at the position.
+
+        :param position: The position of the record
+        """
+
+        if not 0 <= position < len(self):
+            raise IndexError('log position out of range')
+
+        self._index.seek(position * _OFFSET.size)
+        offset, = _OFFSET.unpack(self._index.read(_OFFSET.size))
+
+        view = self._view(offset + _HEADER.size)
+        length, _ = _HEADER.unpack_from(view, offset)
+        start = offset + _HEADER.size
+        return bytes(self._view(start + length)[start:start + length])
+
+    def truncate(self, length: int):
+        """
+        Remove the records from the position on.
+
+        :param length: How many records are kept
+        """
+
+        if length >= len(self):
+            return
+
+        self._index.seek(length * _OFFSET.size)
+        offset, = _OFFSET.unpack(self._index.read(_OFFSET.size))
+
+        self._unmap()
+        self._log.truncate(offset)
+        self._index.truncate(length * _OFFSET.size)
+        self.sync()
+
+    def sync(self):
+        """Write the appended records to the disk."""
+
+        os.fsync(self._log.fileno())
+        os.fsync(self._index.fileno())
+        self.pending = 0
+
+    def close(self):
+        """Sync and close the files."""
+
+        self.sync()
+        self._unmap()
+        self._log.close()
+        self._index.close()
+
+    def recover(self):
+        """
+        Bring the log and the index back to a consistent state, dropping
+        records only partially written.
+        """
+
+        self._unmap()
+
+        # torn offsets at the index
+        length = len(self)
+        self._index.truncate(length * _OFFSET.size)
+
+        # offsets of records torn at the log
+        offset = 0
+        while length:
+            self._index.seek((length - 1) * _OFFSET.size)
+            last_offset, = _OFFSET.unpack(self._index.read(_OFFSET.size))
+            end = self._record_end(last_offset)
+            if end is not None:
+                offset = end
+                break
+            length -= 1
+        self._index.truncate(length * _OFFSET.size)
+
+        # records written to the log but not to the index
+        end = self._record_end(offset)
+        while end is not None:
+            self._index.write(_OFFSET.pack(offset))
+            offset = end
+            end = self._record_end(offset)
+
+        self._log.truncate(offset)
+        self.sync()
+
+    def _record_end(self, offset: int) -> Optional[int]:
+        self._log.seek(offset)
+        header = self._log.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            return None
+
+        length, checksum = _HEADER.unpack(header)
+        payload = self._log.read(length)
+        if len(payload) < length or binascii.crc32(payload) != checksum:
+            return None
+        return offset + _HEADER.size + length
+
+    def _view(self, end: int) -> mmap.mmap:
+        # the log grows, so map it again when reading past the mapping
+        if self._map is None or len(self._map) < end:
+            self._unmap()
+            self._map = mmap.mmap(self._log.fileno(),
+                                  0,
+                                  access=mmap.ACCESS_READ)
+        return self._map
+
+    def _unmap(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+    @staticmethod
+    def _size(file) -> int:
+        return os.fstat(file.fileno()).st_size
+
+
+class StoredChain(abc.MutableSequence):
+    """
+    A peer chain which reads its blocks on demand from a SegmentLog. Only
+    appending blocks and replacing the blocks from some position until the
+    end are supported, as the log is append-only.
+    """
+
+    def __init__(self, log: SegmentLog, factory=None):
+        self.log = log
+        self.factory = factory
+        self._last = None
+
+    def __len__(self) -> int:
+        return len(self.log)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+
+        if index == len(self) - 1 and self._last is not None:
+            return self._last
+
+        return building.from_bytes(self.log.read(index), self.factory)
+
+    def __setitem__(self, index, blocks):
+        if not isinstance(index, slice) or index.stop is not None or \
+                index.step is not None:
+            raise TypeError('only the end of a stored chain can be replaced')
+
+        start, _, _ = index.indices(len(self))
+        self.log.truncate(start)
+        self._last = None
+        self.extend(blocks)
+
+    def __delitem__(self, index):
+        self[index] = []
+
+    def insert(self, index: int, block: building.Block):
+        if index < len(self):
+            raise TypeError('blocks can only be appended to a stored chain')
+        self.append(block)
+
+    def append(self, block: building.Block):
+        self.log.append(building.to_bytes(block))
+        self._last = block
+
+
+class BlockStore:
+    """
+    Keeps the peer chains at append-only segment logs inside a directory.
+    Each peer has its own log, named after its public key.
+
+    Usage:
+        >>> store = BlockStore('/tmp/blocks')
+        >>> tree = Tree(chain_factory=store.chain, chain_exists=store.exists)
+    """
+
+    def __init__(self,
+                 directory: str,
+                 sync_every: int = DEFAULT_SYNC_EVERY,
+                 factory=None):
+        self.directory = directory
+        self.sync_every = sync_every
+        self.factory = factory
+        self.chains = {}
+
+        os.makedirs(directory, exist_ok=True)
+
+    def chain(self, peer) -> StoredChain:
+        """
+        Open the stored chain of the peer, creating it when needed.
+
+        :param peer: The peer of the chain
+        """
+
+        name = self._name(peer)
+        if name not in self.chains:
+            log = SegmentLog(self._path(name), sync_every=self.sync_every)
+            self.chains[name] = StoredChain(log, factory=self.factory)
+        return self.chains[name]
+
+    def exists(self, peer) -> bool:
+        """
+        Determine wheter the peer has a stored chain, without opening or
+        creating it.
+
+        :param peer: The peer of the chain
+        """
+
+        name = self._name(peer)
+        return name in self.chains or \
+            os.path.exists(f'{self._path(name)}.log')
+
+    def sync(self):
+        """Write the appended blocks of every chain to the disk."""
+
+        for chain in self.chains.values():
+            chain.log.sync()
+
+    def close(self):
+        """Sync and close every chain."""
+
+        for chain in self.chains.values():
+            chain.log.close()
+        self.chains.clear()
+
+    def _name(self, peer) -> str:
+        return peer.keys.public_to_bytes().hex()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
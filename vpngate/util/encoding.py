@@ -0,0 +1,221 @@
+from typing import Any, Tuple
+import struct
+
+
+# Version of the record layout, written as the first byte of each record
+VERSION = 1
+
+_LENGTH = struct.Struct('>I')
+_FLOAT = struct.Struct('>d')
+
+_NONE = b'N'
+_TRUE = b'T'
+_FALSE = b'F'
+_INT = b'i'
+_FLOAT_TAG = b'f'
+_STR = b's'
+_BYTES = b'b'
+_LIST = b'l'
+_DICT = b'd'
+
+_NONE_CODE, _TRUE_CODE, _FALSE_CODE = _NONE[0], _TRUE[0], _FALSE[0]
+_INT_CODE, _FLOAT_CODE, _STR_CODE = _INT[0], _FLOAT_TAG[0], _STR[0]
+_BYTES_CODE, _LIST_CODE, _DICT_CODE = _BYTES[0], _LIST[0], _DICT[0]
+
+
+class DecodeError(ValueError):
+    """Raised when the given bytes are not a valid encoding."""
+
+
+def _encode_none(value, parts: list):
+    parts.append(_NONE)
+
+
+def _encode_bool(value: bool, parts: list):
+    parts.append(_TRUE if value else _FALSE)
+
+
+def _encode_int(value: int, parts: list):
+    raw = value.to_bytes((value.bit_length() + 8) // 8, 'big', signed=True)
+    parts += (_INT, _LENGTH.pack(len(raw)), raw)
+
+
+def _encode_float(value: float, parts: list):
+    parts += (_FLOAT_TAG, _FLOAT.pack(value))
+
+
+def _encode_str(value: str, parts: list):
+    raw = value.encode('utf-8')
+    parts += (_STR, _LENGTH.pack(len(raw)), raw)
+
+
+def _encode_bytes(value, parts: list):
+    parts += (_BYTES, _LENGTH.pack(len(value)), bytes(value))
+
+
+def _encode_list(value, parts: list):
+    parts += (_LIST, _LENGTH.pack(len(value)))
+    for item in value:
+        _encode(item, parts)
+
+
+def _encode_dict(value: dict, parts: list):
+    # items are ordered by their encoded keys, for consistent bytes
+    items = sorted((dumps(key), item) for key, item in value.items())
+    parts += (_DICT, _LENGTH.pack(len(items)))
+    for key, item in items:
+        parts.append(key)
+        _encode(item, parts)
+
+
+# Encoders by type. Subclasses are encoded as their closest base found
+# here, so bool is never encoded as an int
+_ENCODERS = {
+    type(None): _encode_none,
+    bool: _encode_bool,
+    int: _encode_int,
+    float: _encode_float,
+    str: _encode_str,
+    bytes: _encode_bytes,
+    bytearray: _encode_bytes,
+    list: _encode_list,
+    tuple: _encode_list,
+    dict: _encode_dict,
+}
+
+
+def _encode(value: Any, parts: list):
+    encoder = _ENCODERS.get(type(value))
+    if encoder is None:
+        encoder = next((_ENCODERS[base] for base in type(value).__mro__
+                        if base in _ENCODERS), None)
+        if encoder is None:
+            raise TypeError(f'Can not encode object of type: {type(value)}')
+    encoder(value, parts)
+
+
+def _decode_length(data: memoryview, offset: int) -> Tuple[int, int]:
+    length, = _LENGTH.unpack_from(data, offset)
+    return length, offset + _LENGTH.size
+
+
+def _decode_raw(data: memoryview, offset: int) -> Tuple[memoryview, int]:
+    length, offset = _decode_length(data, offset)
+    end = offset + length
+    if end > len(data):
+        raise DecodeError('Unexpected end of data')
+    return data[offset:end], end
+
+
+def _decode_float(data: memoryview, offset: int) -> Tuple[float, int]:
+    return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+
+
+def _decode_int(data: memoryview, offset: int) -> Tuple[int, int]:
+    raw, offset = _decode_raw(data, offset)
+    return int.from_bytes(raw, 'big', signed=True), offset
+
+
+def _decode_str(data: memoryview, offset: int) -> Tuple[str, int]:
+    raw, offset = _decode_raw(data, offset)
+    return str(raw, 'utf-8'), offset
+
+
+def _decode_bytes(data: memoryview, offset: int) -> Tuple[bytes, int]:
+    raw, offset = _decode_raw(data, offset)
+    return bytes(raw), offset
+
+
+def _decode_list(data: memoryview, offset: int) -> Tuple[list, int]:
+    length, offset = _decode_length(data, offset)
+    items = []
+    for _ in range(length):
+        item, offset = _decode(data, offset)
+        items.append(item)
+    return items, offset
+
+
+def _decode_dict(data: memoryview, offset: int) -> Tuple[dict, int]:
+    length, offset = _decode_length(data, offset)
+    items = {}
+    for _ in range(length):
+        key, offset = _decode(data, offset)
+        items[key], offset = _decode(data, offset)
+    return items, offset
+
+
+# Decoders by tag, each gets the offset after the tag
+_DECODERS = {
+    _NONE_CODE: lambda data, offset: (None, offset),
+    _TRUE_CODE: lambda data, offset: (True, offset),
+    _FALSE_CODE: lambda data, offset: (False, offset),
+    _INT_CODE: _decode_int,
+    _FLOAT_CODE: _decode_float,
+    _STR_CODE: _decode_str,
+    _BYTES_CODE: _decode_bytes,
+    _LIST_CODE: _decode_list,
+    _DICT_CODE: _decode_dict,
+}
+
+
+def _decode(data: memoryview, offset: int) -> Tuple[Any, int]:
+    try:
+        # indexing a memoryview gives the tag as an int, without copying
+        tag = data[offset]
+        decoder = _DECODERS.get(tag)
+        if decoder is None:
+            raise DecodeError(f'Unknown tag: {bytes((tag,))}')
+        return decoder(data, offset + 1)
+    except (struct.error, UnicodeDecodeError, TypeError, IndexError) as exc:
+        raise DecodeError(str(exc)) from exc
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode the value as length-prefixed, type tagged bytes. The encoding
+    is deterministic: equal values always give the same bytes.
+
+    Supported types: None, bool, int, float, str, bytes, list, tuple and
+    dict. Tuples are decoded as lists.
+
+    :param value: The value to encode
+    """
+
+    parts = []
+    _encode(value, parts)
+    return b''.join(parts)
+
+
+def loads(data: bytes) -> Any:
+    """
+    Decode a value encoded with dumps().
+
+    :param data: The encoded value
+    """
+
+    value, offset = _decode(memoryview(data), 0)
+    if offset != len(data):
+        raise DecodeError('Extra data after the encoded value')
+    return value
+
+
+def encode_record(values: tuple) -> bytes:
+    """
+    Encode the values of a record, prefixed by the version of the layout.
+
+    :param values: Values of the record fields
+    """
+
+    return bytes((VERSION,)) + dumps(list(values))
+
+
+def decode_record(data: bytes) -> tuple:
+    """
+    Decode the values of a record encoded with encode_record().
+
+    :param data: The encoded record
+    """
+
+    if not data or data[0] != VERSION:
+        raise DecodeError(f'Unsupported record version: {data[:1]}')
+    return tuple(loads(memoryview(data)[1:]))
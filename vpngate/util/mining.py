@@ -0,0 +1,279 @@
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Optional
+import multiprocessing
+import hashlib
+import os
+
+
+# Amount of proofs a worker searches at once
+DEFAULT_CHUNK_SIZE = 2 ** 16
+
+# Sentinel meaning that no worker has found a valid proof yet
+NOT_FOUND = 2 ** 63 - 1
+
+# How many proofs a worker tries before checking whether it should stop
+STOP_CHECK_INTERVAL = 2 ** 10
+
+# Proofs are hashed as a head followed by one of the precomputed tails with
+# this many decimal digits
+TAIL_DIGITS = 2
+TAIL_SPAN = 10 ** TAIL_DIGITS
+
+# Shared lowest proof found so far, inherited by each worker process
+_found = None
+
+
+def is_valid_proof(difficulty: int,
+                   proof: int,
+                   last_proof: int,
+                   last_hash: str) -> bool:
+    """
+    Determine wheter the proof of work is valid
+
+    :param difficulty: How many zeroes the hash must end with
+    :param proof: Current Proof
+    :param last_proof: Previous Proof
+    :param last_hash: The hash of the Previous Block
+    :return: <bool>
+    """
+
+    guess = f'{last_proof}{proof}{last_hash}'.encode()
+    guess_hash = hashlib.sha256(guess).hexdigest()
+
+    return guess_hash[-difficulty:] == "0" * difficulty
+
+
+class ProofEngine:
+    """
+    Fast search of proofs of work for a fixed previous block. It accepts
+    and rejects exactly the same proofs as is_valid_proof().
+
+    The hash state after the previous proof is computed once and copied
+    for each guess. Proofs are split into a head and the last TAIL_DIGITS
+    digits, so the head is hashed once for every TAIL_SPAN guesses and the
+    tails, already followed by the previous hash, are precomputed. The
+    digest bytes are compared directly, without building its hex string.
+
+    Usage:
+        >>> engine = ProofEngine(3, 100, 'foo')
+        >>> proof = engine.search()
+        >>> is_valid_proof(3, proof, 100, 'foo')
+        True
+    """
+
+    def __init__(self,
+                 difficulty: int,
+                 last_proof: int,
+                 last_hash: str,
+                 impl=None):
+        impl = impl or hashlib.sha256
+        suffix = f'{last_hash}'.encode()
+
+        self.difficulty = difficulty
+        self.prefix = impl(f'{last_proof}'.encode())
+        self.suffix = suffix
+        self.tails = [b'%0*d' % (TAIL_DIGITS, tail) + suffix
+                      for tail in range(TAIL_SPAN)]
+
+        # each hex character is half a byte of the digest
+        self.zeroes = bytes(max(difficulty, 0) // 2)
+        self.odd_nibble = difficulty % 2 == 1
+        self.possible = 0 < difficulty <= 64
+
+    def matches(self, digest: bytes) -> bool:
+        """
+        Determine wheter the digest ends with the required zeroes.
+
+        :param digest: Raw digest of some guess
+        """
+
+        if not self.possible or not digest.endswith(self.zeroes):
+            return False
+        if self.odd_nibble:
+            return digest[-len(self.zeroes) - 1] & 0x0f == 0
+        return True
+
+    def is_valid(self, proof: int) -> bool:
+        """
+        Determine wheter the proof of work is valid.
+
+        :param proof: Current Proof
+        """
+
+        guess = self.prefix.copy()
+        guess.update(f'{proof}'.encode())
+        guess.update(self.suffix)
+        return self.matches(guess.digest())
+
+    def search(self, start: int = 0, stop: int = None) -> Optional[int]:
+        """
+        Walk the proofs from start until stop, returning the first valid one.
+
+        :param start: First proof to try
+        :param stop: Stop before this proof, when None search forever
+        :return: The smallest valid proof in the range or None
+        """
+
+        if not self.possible:
+            if stop is None:
+                raise ValueError(f'No proof exists for: {self.difficulty}')
+            return None
+
+        proof = start
+
+        # these proofs are shorter than a tail, so they are hashed whole
+        while proof < TAIL_SPAN and (stop is None or proof < stop):
+            if self.is_valid(proof):
+                return proof
+            proof += 1
+
+        zeroes = self.zeroes
+        offset = -len(zeroes) - 1
+        odd_nibble = self.odd_nibble
+        tails = self.tails
+
+        head, first = divmod(proof, TAIL_SPAN)
+        while stop is None or proof < stop:
+            last = TAIL_SPAN
+            if stop is not None:
+                last = min(TAIL_SPAN, first + stop - proof)
+
+            state = self.prefix.copy()
+            state.update(b'%d' % head)
+
+            for tail in range(first, last):
+                guess = state.copy()
+                guess.update(tails[tail])
+                digest = guess.digest()
+
+                if digest.endswith(zeroes) and \
+                        (not odd_nibble or digest[offset] & 0x0f == 0):
+                    return head * TAIL_SPAN + tail
+
+            proof += last - first
+            head += 1
+            first = 0
+
+        return None
+
+
+def search(difficulty: int,
+           last_proof: int,
+           last_hash: str,
+           start: int = 0,
+           stop: int = None) -> Optional[int]:
+    """
+    Walk the proofs from start until stop, returning the first valid one.
+
+    :param start: First proof to try
+    :param stop: Stop before this proof, when None search forever
+    :return: The smallest valid proof in the range or None
+    """
+
+    engine = ProofEngine(difficulty, last_proof, last_hash)
+    return engine.search(start, stop)
+
+
+def _init_worker(found):
+    global _found
+    _found = found
+
+
+def _search_chunk(difficulty: int,
+                  last_proof: int,
+                  last_hash: str,
+                  start: int,
+                  stop: int,
+                  deterministic: bool) -> Optional[int]:
+    """
+    Search a chunk of proofs inside a worker process. The search gives up
+    as soon as it can not produce a better result than some other worker.
+    """
+
+    engine = ProofEngine(difficulty, last_proof, last_hash)
+
+    proof = start
+    while proof < stop:
+        found = _found.value
+        if found != NOT_FOUND and (not deterministic or found < start):
+            return None
+
+        step_stop = min(proof + STOP_CHECK_INTERVAL, stop)
+        result = engine.search(proof, step_stop)
+
+        if result is not None:
+            with _found.get_lock():
+                if result < _found.value:
+                    _found.value = result
+            return result
+
+        proof = step_stop
+
+    return None
+
+
+def parallel_search(difficulty: int,
+                    last_proof: int,
+                    last_hash: str,
+                    workers: int = None,
+                    deterministic: bool = True,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Search a valid proof splitting the proofs in chunks across a pool of
+    processes. Every worker stops as soon as a valid proof is found.
+
+    When deterministic, chunks before the first hit are still searched to
+    the end, so the result is the same smallest proof the serial search
+    would return. Otherwise the first proof found by any worker wins.
+
+    :param workers: Number of processes, defaults to the CPU count
+    :param deterministic: Wheter to return the smallest valid proof
+    :param chunk_size: Amount of proofs each task searches
+    :return: A valid proof of work
+    """
+
+    workers = workers or os.cpu_count() or 1
+    found = multiprocessing.Value('q', NOT_FOUND)
+
+    hits = []
+    pending = set()
+    next_start = 0
+
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(found,)) as executor:
+
+        def submit():
+            nonlocal next_start
+            future = executor.submit(_search_chunk,
+                                     difficulty,
+                                     last_proof,
+                                     last_hash,
+                                     next_start,
+                                     next_start + chunk_size,
+                                     deterministic)
+            pending.add(future)
+            next_start += chunk_size
+
+        # keep every worker busy with one chunk waiting in the queue
+        for _ in range(workers * 2):
+            submit()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            pending.difference_update(done)
+
+            for future in done:
+                proof = future.result()
+                if proof is not None:
+                    hits.append(proof)
+
+            if not hits:
+                for _ in done:
+                    submit()
+            elif not deterministic:
+                for future in pending:
+                    future.cancel()
+                break
+
+    return min(hits)
@@ -0,0 +1,159 @@
+from .util import building, crypto, mining
+from .chains import Tree
+from .p2p import Peer
+
+from typing import Dict, Sequence
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class Checkpoint:
+    """
+    The last block of a chain known to be valid, by its index and hash.
+    """
+
+    index: int
+    hashsum: str
+
+
+@dataclass
+class ChainValidator:
+    """
+    Validates the peer chains of a Tree incrementally. After a chain is
+    validated, a checkpoint with its last block is kept for the peer, so
+    later validations only check the blocks appended after it. Replacement
+    chains are only checked from the block where they fork from ours.
+
+    Usage:
+        >>> validator = ChainValidator(difficulty=3)
+        >>> validator.validate(tree, peer)
+        True
+        >>> validator.accept(tree, peer, remote_chain)
+        False
+    """
+
+    difficulty: int = field(default=3)
+    checkpoints: Dict[Peer, Checkpoint] = field(default_factory=dict)
+
+    def is_valid_link(self,
+                      last_block: building.Block,
+                      block: building.Block) -> bool:
+        """
+        Determine wheter the block may follow the last block in a chain.
+
+        :param last_block: The previous block
+        :param block: The block that follows it
+        """
+
+        if block.index != last_block.index + 1:
+            return False
+
+        if not crypto.is_block_hashsum(last_block, block.previous_hash):
+            return False
+
+        if hasattr(block, 'proof'):
+            return mining.is_valid_proof(self.difficulty,
+                                         block.proof,
+                                         last_block.proof,
+                                         block.previous_hash)
+        return True
+
+    def validated_length(self, peer: Peer, chain: Sequence) -> int:
+        """
+        Get how many blocks at the start of the chain were already
+        validated for the peer.
+
+        :param peer: The peer of the chain
+        :param chain: The full chain, starting with the root block
+        """
+
+        checkpoint = self.checkpoints.get(peer)
+        if checkpoint is None or checkpoint.index >= len(chain):
+            return 1
+
+        block = chain[checkpoint.index]
+        if crypto.block_hashsum(block) != checkpoint.hashsum:
+            return 1
+        return checkpoint.index + 1
+
+    def validate(self, tree: Tree, peer: Peer) -> bool:
+        """
+        Determine wheter the peer chain is valid, checking only the blocks
+        after its checkpoint.
+
+        :param tree: The tree holding the chain
+        :param peer: The peer of the chain
+        """
+
+        chain = tree.get(peer)
+        start = self.validated_length(peer, chain)
+
+        if not self._is_valid_from(chain, start):
+            return False
+
+        self._save_checkpoint(peer, chain)
+        return True
+
+    def accept(self, tree: Tree, peer: Peer, remote_chain: Sequence) -> bool:
+        """
+        Replace the peer chain with the remote chain when it is longer and
+        valid. Only the blocks after the fork point are checked, as long as
+        our chain is known to be valid until there.
+
+        :param tree: The tree holding the chain
+        :param peer: The peer of the chain
+        :param remote_chain: The full chain, starting with the root block
+        :return: Wheter our chain was replaced
+        """
+
+        chain = tree.get(peer)
+        if len(remote_chain) <= len(chain):
+            return False
+
+        fork = self.fork_point(chain, remote_chain)
+        if fork == 0:
+            # chains with another root block can not be accepted
+            return False
+
+        start = min(fork, self.validated_length(peer, chain))
+        if not self._is_valid_from(remote_chain, start):
+            return False
+
+        tree.splice(peer, fork, remote_chain[fork:])
+        self._save_checkpoint(peer, tree.get(peer))
+        return True
+
+    @staticmethod
+    def fork_point(chain: Sequence, remote_chain: Sequence) -> int:
+        """
+        Find the position of the first block that differs between the
+        chains. As each block holds the hash of the previous one, blocks
+        with the same hash have the same blocks before them, so the fork
+        point is found by bisection.
+
+        :return: The length of the common prefix
+        """
+
+        low, high = 0, min(len(chain), len(remote_chain))
+        while low < high:
+            middle = (low + high) // 2
+            if crypto.block_hashsum(chain[middle]) == \
+                    crypto.block_hashsum(remote_chain[middle]):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _is_valid_from(self, chain: Sequence, start: int) -> bool:
+        last_block = chain[start - 1]
+        for position in range(start, len(chain)):
+            block = chain[position]
+            if not self.is_valid_link(last_block, block):
+                return False
+            last_block = block
+        return True
+
+    def _save_checkpoint(self, peer: Peer, chain: Sequence):
+        last_hashsum = crypto.block_hashsum(chain[-1])
+        self.checkpoints[peer] = Checkpoint(index=len(chain) - 1,
+                                            hashsum=last_hashsum)